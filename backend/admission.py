@@ -0,0 +1,273 @@
+# backend/admission.py
+# Admission control - per-route-class concurrency limits with bounded queues
+#
+# Every request is put in a route class (read, order, write, upload, export)
+# before the app sees it. Each class has its own concurrency limit, a bounded
+# wait queue and a queue-time deadline, and all classes share one overall
+# limit. When a slot frees up, the highest-priority class with waiters is
+# admitted first, so storefront reads never queue behind a burst of uploads.
+# Requests that can't be admitted get 503 + Retry-After from the middleware,
+# before the app has read (let alone parsed) a multipart body.
+
+import asyncio
+import json
+import math
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    name: str
+    limit: int  # requests in flight
+    queue_size: int  # requests allowed to wait for a slot
+    queue_timeout: float  # seconds a request may wait before it is shed
+    priority: int  # lower goes first when slots free up
+
+
+# Reads get most of the capacity and go first; heavy classes are kept small
+DEFAULT_CLASSES = (
+    RouteClass("read", limit=48, queue_size=512, queue_timeout=2.0, priority=0),
+    RouteClass("order", limit=8, queue_size=64, queue_timeout=5.0, priority=1),
+    RouteClass("write", limit=8, queue_size=32, queue_timeout=5.0, priority=2),
+    RouteClass("upload", limit=2, queue_size=8, queue_timeout=10.0, priority=3),
+    RouteClass("export", limit=1, queue_size=2, queue_timeout=1.0, priority=4),
+)
+
+# (methods or None for any, path pattern, class name or None to bypass admission); first match wins
+DEFAULT_RULES = (
+    (("GET", "HEAD"), r"^/(health|metrics)$", None),
+    (("OPTIONS",), r"", None),  # CORS preflight
+    (("POST",), r"^/api/products/upload$", "upload"),
+    (("POST", "PUT"), r"^/api/categories/", "upload"),  # multipart, may carry an image
+    (("POST",), r"^/api/uploads/", "upload"),
+    (("GET",), r"^/api/admin/export/", "export"),
+    (("POST",), r"^/api/(orders|reservations)/$", "order"),
+    (("POST",), r"^/api/(quote|designs/validate)$", "read"),  # read-only, just too big for a query string
+    (("GET", "HEAD"), r"", "read"),
+    (None, r"", "write"),
+)
+
+SERVICE_TIME_ALPHA = 0.2  # EWMA weight of the latest request when estimating Retry-After
+
+
+def parse_class_limits(spec: Optional[str], classes: Sequence[RouteClass] = DEFAULT_CLASSES) -> Tuple[RouteClass, ...]:
+    """Override limits from "upload=2:8:10,read=64" (limit[:queue_size[:queue_timeout]])"""
+    by_name = {route_class.name: route_class for route_class in classes}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        name, _, values = part.partition("=")
+        name = name.strip()
+        if name not in by_name:
+            raise ValueError(f"Unknown route class '{name}' in admission limits")
+        fields = values.split(":")
+        current = by_name[name]
+        by_name[name] = RouteClass(
+            name,
+            limit=int(fields[0]),
+            queue_size=int(fields[1]) if len(fields) > 1 else current.queue_size,
+            queue_timeout=float(fields[2]) if len(fields) > 2 else current.queue_timeout,
+            priority=current.priority,
+        )
+    return tuple(by_name.values())
+
+
+class Rejected(Exception):
+    def __init__(self, route_class: str, reason: str, retry_after: int):
+        self.route_class = route_class
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"{route_class} requests are over capacity ({reason})")
+
+
+class _ClassState:
+    __slots__ = ("spec", "active", "waiters", "admitted", "rejected", "wait_sum", "service_time")
+
+    def __init__(self, spec: RouteClass):
+        self.spec = spec
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = {"queue_full": 0, "timeout": 0}
+        self.wait_sum = 0.0
+        self.service_time = 0.0  # EWMA seconds, for Retry-After
+
+
+class AdmissionController:
+    """Priority admission across route classes; one per worker event loop
+
+    Not thread-safe by design: acquire/release only run on the event loop.
+    """
+
+    def __init__(
+        self,
+        classes: Iterable[RouteClass] = DEFAULT_CLASSES,
+        max_concurrency: int = 64,
+        rules: Sequence[Tuple[Optional[Tuple[str, ...]], str, Optional[str]]] = DEFAULT_RULES,
+    ):
+        self.max_concurrency = max_concurrency
+        self._classes: Dict[str, _ClassState] = {spec.name: _ClassState(spec) for spec in classes}
+        self._by_priority = sorted(self._classes.values(), key=lambda state: state.spec.priority)
+        self._rules = [(methods, re.compile(pattern), name) for methods, pattern, name in rules]
+        self._active = 0
+
+    def classify(self, method: str, path: str) -> Optional[str]:
+        for methods, pattern, name in self._rules:
+            if (methods is None or method in methods) and pattern.search(path):
+                return name if name in self._classes else None
+        return None
+
+    def _retry_after(self, state: _ClassState) -> int:
+        # Time for the current queue to drain at the observed service rate
+        backlog = (len(state.waiters) + state.active + 1) / max(1, state.spec.limit)
+        estimate = backlog * (state.service_time or state.spec.queue_timeout)
+        return max(1, min(60, math.ceil(estimate)))
+
+    def _can_run(self, state: _ClassState) -> bool:
+        return state.active < state.spec.limit and self._active < self.max_concurrency
+
+    async def acquire(self, name: str) -> float:
+        """Wait for a slot; returns seconds queued or raises Rejected"""
+        state = self._classes[name]
+        # Don't jump ahead of higher-priority waiters that only wait on the shared limit
+        if self._can_run(state) and not state.waiters and not any(
+            other.waiters and other.active < other.spec.limit
+            for other in self._by_priority if other.spec.priority < state.spec.priority
+        ):
+            self._start(state)
+            return 0.0
+        if len(state.waiters) >= state.spec.queue_size:
+            state.rejected["queue_full"] += 1
+            raise Rejected(name, "queue_full", self._retry_after(state))
+
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), state.spec.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                pass  # admitted just as the deadline hit; take the slot
+            else:
+                waiter.cancel()
+                state.waiters.remove(waiter)
+                state.rejected["timeout"] += 1
+                raise Rejected(name, "timeout", self._retry_after(state))
+        except asyncio.CancelledError:
+            # Client went away while queued; hand over the slot if we were just given one
+            if waiter.done() and not waiter.cancelled():
+                self.release(name, 0.0)
+            else:
+                waiter.cancel()
+                state.waiters.remove(waiter)
+            raise
+        waited = time.perf_counter() - queued_at
+        state.wait_sum += waited
+        return waited
+
+    def _start(self, state: _ClassState) -> None:
+        state.active += 1
+        state.admitted += 1
+        self._active += 1
+
+    def release(self, name: str, service_time: float) -> None:
+        state = self._classes[name]
+        state.active -= 1
+        self._active -= 1
+        if service_time:
+            state.service_time += SERVICE_TIME_ALPHA * (service_time - state.service_time)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiters, highest priority first"""
+        for state in self._by_priority:
+            while state.waiters and self._can_run(state):
+                waiter = state.waiters.popleft()
+                if waiter.done():
+                    continue  # timed out or cancelled
+                self._start(state)
+                waiter.set_result(None)
+            if self._active >= self.max_concurrency:
+                return
+
+    def render_metrics(self) -> str:
+        lines = [
+            "# HELP printcraft_admission_in_flight Requests running per route class",
+            "# TYPE printcraft_admission_in_flight gauge",
+        ]
+        lines += [f'printcraft_admission_in_flight{{class="{name}"}} {state.active}' for name, state in self._classes.items()]
+        lines += [
+            "# HELP printcraft_admission_queue_depth Requests waiting for a slot per route class",
+            "# TYPE printcraft_admission_queue_depth gauge",
+        ]
+        lines += [f'printcraft_admission_queue_depth{{class="{name}"}} {len(state.waiters)}' for name, state in self._classes.items()]
+        lines += [
+            "# HELP printcraft_admission_admitted_total Requests admitted per route class",
+            "# TYPE printcraft_admission_admitted_total counter",
+        ]
+        lines += [f'printcraft_admission_admitted_total{{class="{name}"}} {state.admitted}' for name, state in self._classes.items()]
+        lines += [
+            "# HELP printcraft_admission_rejected_total Requests shed with 503 per route class and reason",
+            "# TYPE printcraft_admission_rejected_total counter",
+        ]
+        lines += [
+            f'printcraft_admission_rejected_total{{class="{name}",reason="{reason}"}} {count}'
+            for name, state in self._classes.items() for reason, count in state.rejected.items()
+        ]
+        lines += [
+            "# HELP printcraft_admission_queue_seconds_total Time admitted requests spent queued",
+            "# TYPE printcraft_admission_queue_seconds_total counter",
+        ]
+        lines += [f'printcraft_admission_queue_seconds_total{{class="{name}"}} {state.wait_sum:.6f}' for name, state in self._classes.items()]
+        return "\n".join(lines) + "\n"
+
+
+# =============================================================================
+# ASGI MIDDLEWARE
+# =============================================================================
+
+class AdmissionMiddleware:
+    """Admits each HTTP request through the controller before calling the app
+
+    The slot is held until the response is complete, so a streaming export
+    counts against its class for as long as it streams.
+    """
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        name = self.controller.classify(scope["method"], scope["path"])
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controller.acquire(name)
+        except Rejected as e:
+            body = json.dumps({"detail": "Server busy, retry later", "class": e.route_class, "reason": e.reason}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(e.retry_after).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(name, time.perf_counter() - started)
@@ -0,0 +1,281 @@
+# backend/archive.py
+# Hot/cold partitioning - move finished orders and retired catalog rows out
+# of the tables every request scans
+#
+# A periodic job (tasks.archive_cold_rows, or `python manage.py archive`)
+# moves, in batches of one transaction each:
+#   - DELIVERED / CANCELLED orders untouched for ARCHIVE_AFTER_DAYS, with
+#     their items (design payloads included) and stock reservations
+#   - inactive products untouched for as long, with their variants, once no
+#     open order or live stock hold refers to them
+#   - inactive categories with no products left in the hot tables
+# into the archived_* tables (models.ARCHIVE_TABLES), keeping their ids.
+#
+# Reads by id fall back to the archive (archived_product, archived_order, ...)
+# and reactivating a product or editing a category moves it back first
+# (restore_product, restore_category), so the API looks the same either way.
+# Admin exports include archived rows (see exports.py); listings and stats
+# only see the hot tables.
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, Table, delete, exists, func, insert, literal, select
+
+from models import (
+    ARCHIVE_TABLES, Category, Order, OrderItem, OrderStatus, Product, ProductVariant,
+    ReservationStatus, StockReservation,
+)
+
+logger = logging.getLogger("printcraft.archive")
+
+COLD_ORDER_STATUSES = (OrderStatus.DELIVERED, OrderStatus.CANCELLED)
+
+categories, products, variants = Category.__table__, Product.__table__, ProductVariant.__table__
+orders, order_items, reservations = Order.__table__, OrderItem.__table__, StockReservation.__table__
+HOT_TABLES = (categories, products, variants, orders, order_items, reservations)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _archived(table: Table) -> Table:
+    return ARCHIVE_TABLES[table.name]
+
+
+def _copy(db, source: Table, target: Table, where, archived_at: Optional[datetime] = None) -> None:
+    """INSERT INTO target SELECT the columns they share FROM source WHERE ..."""
+    names = [column.name for column in target.columns if column.name in source.c]
+    columns = [source.c[name] for name in names]
+    if archived_at is not None:
+        names.append("archived_at")
+        columns.append(literal(archived_at, DateTime))
+    db.execute(insert(target).from_select(names, select(*columns).where(where)))
+
+
+def _move(db, source: Table, target: Table, where, archived_at: Optional[datetime] = None) -> int:
+    _copy(db, source, target, where, archived_at)
+    return db.execute(delete(source).where(where)).rowcount
+
+
+# =============================================================================
+# ARCHIVING
+# =============================================================================
+
+def _archive_batch(db, table: Table, cold, children: Sequence[Tuple[Table, str]], batch_size: int) -> List[int]:
+    """Archive up to batch_size rows of `table` matching `cold`, with their children; caller commits"""
+    archive = _archived(table)
+    candidates = select(table.c.id).where(cold).order_by(table.c.id).limit(batch_size)
+    if db.get_bind().dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+    ids = db.scalars(candidates).all()
+    if not ids:
+        return []
+
+    # Copy the parents first, re-checking they are still cold: it is the
+    # transaction's first write, so (on SQLite too) nothing changes them after
+    now = _utcnow()
+    _copy(db, table, archive, table.c.id.in_(ids) & cold, now)
+    ids = db.scalars(select(archive.c.id).where(archive.c.id.in_(ids)).order_by(archive.c.id)).all()
+    if not ids:
+        return []
+    for child, column in children:
+        _move(db, child, _archived(child), child.c[column].in_(ids), now)
+    db.execute(delete(table).where(table.c.id.in_(ids)))
+    return list(ids)
+
+
+def archive_orders(db, cutoff: datetime, batch_size: int) -> List[int]:
+    """Finished orders last changed before cutoff, with items and reservations"""
+    cold = orders.c.status.in_(COLD_ORDER_STATUSES) & (func.coalesce(orders.c.updated_at, orders.c.created_at) < cutoff)
+    return _archive_batch(db, orders, cold, ((order_items, "order_id"), (reservations, "order_id")), batch_size)
+
+
+def archive_products(db, cutoff: datetime, batch_size: int) -> List[int]:
+    """Inactive products last changed before cutoff that no open order or live hold refers to"""
+    cold = (
+        (products.c.is_active == False)  # noqa: E712
+        & (func.coalesce(products.c.updated_at, products.c.created_at) < cutoff)
+        & ~exists().where(order_items.c.product_id == products.c.id)
+        & ~exists().where(reservations.c.product_id == products.c.id, reservations.c.status == ReservationStatus.HELD)
+    )
+    # Released / expired holds go with the product (committed ones left with their orders)
+    return _archive_batch(db, products, cold, ((reservations, "product_id"), (variants, "product_id")), batch_size)
+
+
+def archive_categories(db, cutoff: datetime, batch_size: int) -> List[int]:
+    """Inactive (deleted) categories with no products left in the hot table"""
+    cold = (categories.c.is_active == False) & ~exists().where(products.c.category_id == categories.c.id)  # noqa: E712
+    return _archive_batch(db, categories, cold, (), batch_size)
+
+
+# Orders first: archiving them is what frees products, and products free categories
+ARCHIVERS = (("orders", archive_orders), ("products", archive_products), ("categories", archive_categories))
+
+
+def run_archival(
+    database,
+    older_than_days: float,
+    batch_size: int = 500,
+    on_batch: Optional[Callable[[str, List[int]], None]] = None,
+) -> Dict[str, int]:
+    """Archive every cold row, one committed transaction per batch; returns counts by kind
+
+    on_batch(kind, ids) runs after each commit (e.g. to invalidate caches).
+    """
+    cutoff = _utcnow() - timedelta(days=older_than_days)
+    counts = {}
+    for kind, archiver in ARCHIVERS:
+        counts[kind] = 0
+        while True:
+            db = database.session()
+            try:
+                ids = archiver(db, cutoff, batch_size)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            if ids:
+                counts[kind] += len(ids)
+                logger.info("Archived %d %s", len(ids), kind)
+                if on_batch:
+                    on_batch(kind, ids)
+            if len(ids) < batch_size:
+                break
+    return counts
+
+
+# =============================================================================
+# READING ARCHIVED ROWS
+# =============================================================================
+
+def _row(db, table: Table, row_id: int):
+    return db.execute(select(table).where(table.c.id == row_id)).first()
+
+
+def _hot_or_archived(db, table: Table, row_id: int) -> Optional[Dict[str, Any]]:
+    row = _row(db, table, row_id) or _row(db, _archived(table), row_id)
+    return dict(row._mapping) if row else None
+
+
+def archived_category(db, category_id: int) -> Optional[Dict[str, Any]]:
+    """An archived category's columns, or None"""
+    row = _row(db, _archived(categories), category_id)
+    return dict(row._mapping) if row else None
+
+
+def archived_products(db, product_ids) -> Dict[int, Dict[str, Any]]:
+    """Archived products by id, shaped like the ORM ones: columns, variants and category"""
+    product_ids = list(product_ids)
+    if not product_ids:
+        return {}
+    archive, archived_variants = _archived(products), _archived(variants)
+    found = {row["id"]: dict(row, variants=[]) for row in db.execute(
+        select(archive).where(archive.c.id.in_(product_ids))
+    ).mappings()}
+    if not found:
+        return {}
+    for variant in db.execute(
+        select(archived_variants).where(archived_variants.c.product_id.in_(found)).order_by(archived_variants.c.id)
+    ).mappings():
+        found[variant["product_id"]]["variants"].append(dict(variant))
+    category_by_id = {}
+    for product in found.values():
+        category_id = product["category_id"]
+        if category_id not in category_by_id:
+            category_by_id[category_id] = _hot_or_archived(db, categories, category_id)
+        product["category"] = category_by_id[category_id]
+    return found
+
+
+def archived_product(db, product_id: int) -> Optional[Dict[str, Any]]:
+    """An archived product shaped like the ORM one, or None"""
+    return archived_products(db, [product_id]).get(product_id)
+
+
+def archived_variants_by_sku(db, skus) -> Dict[str, Tuple[int, int]]:
+    """sku -> (variant id, product id) of archived variants; SKUs aren't unique, so the oldest wins"""
+    skus = set(skus)
+    if not skus:
+        return {}
+    archive = _archived(variants)
+    rows = db.execute(
+        select(archive.c.sku, archive.c.id, archive.c.product_id).where(archive.c.sku.in_(skus)).order_by(archive.c.id.desc())
+    ).all()
+    return {sku: (variant_id, product_id) for sku, variant_id, product_id in rows}
+
+
+def archived_order(db, order_id: int):
+    """An archived order row (attribute access, like the ORM object), or None"""
+    return _row(db, _archived(orders), order_id)
+
+
+def archived_order_items(db, order_id: int) -> List[Tuple[int, int, Any, Any]]:
+    """(item id, product id, design data, product print areas) for an archived order"""
+    items = _archived(order_items)
+    rows = db.execute(
+        select(items.c.id, items.c.product_id, items.c.design_data).where(items.c.order_id == order_id).order_by(items.c.id)
+    ).all()
+    product_ids = {product_id for _, product_id, _ in rows}
+    print_areas = {}
+    for table in (products, _archived(products)):
+        missing = product_ids - print_areas.keys()
+        if missing:
+            print_areas.update(db.execute(select(table.c.id, table.c.print_areas).where(table.c.id.in_(missing))).all())
+    return [(item_id, product_id, design_data, print_areas.get(product_id)) for item_id, product_id, design_data in rows]
+
+
+# =============================================================================
+# RESTORING
+# =============================================================================
+# Restores put rows back under their old ids; the caller commits, and gets an
+# IntegrityError if a newer row has taken a restored row's slug or name since.
+
+def restore_category(db, category_id: int) -> bool:
+    """Move an archived category back to the hot table; False if it isn't archived"""
+    archive = _archived(categories)
+    return bool(_move(db, archive, categories, archive.c.id == category_id))
+
+
+def restore_product(db, product_id: int) -> bool:
+    """Move an archived product and its variants back (and its category, if archived)"""
+    archive = _archived(products)
+    row = db.execute(select(archive.c.category_id).where(archive.c.id == product_id)).first()
+    if row is None:
+        return False
+    restore_category(db, row.category_id)
+    _move(db, archive, products, archive.c.id == product_id)
+    archived_variants = _archived(variants)
+    _move(db, archived_variants, variants, archived_variants.c.product_id == product_id)
+    return True
+
+
+def restore_order(db, order_id: int) -> bool:
+    """Move an archived order, its items and reservations back (and any archived products they reference)"""
+    archive = _archived(orders)
+    if _row(db, archive, order_id) is None:
+        return False
+    items, archived_reservations = _archived(order_items), _archived(reservations)
+    product_ids = set(db.scalars(select(items.c.product_id).where(items.c.order_id == order_id)))
+    product_ids |= set(db.scalars(select(archived_reservations.c.product_id).where(archived_reservations.c.order_id == order_id)))
+    for product_id in sorted(product_ids):
+        restore_product(db, product_id)
+    _move(db, archive, orders, archive.c.id == order_id)
+    _move(db, items, order_items, items.c.order_id == order_id)
+    _move(db, archived_reservations, reservations, archived_reservations.c.order_id == order_id)
+    return True
+
+
+def archive_counts(db) -> Dict[str, Tuple[int, int]]:
+    """(hot rows, archived rows) per table"""
+    return {
+        table.name: (
+            db.scalar(select(func.count()).select_from(table)),
+            db.scalar(select(func.count()).select_from(_archived(table))),
+        )
+        for table in HOT_TABLES
+    }
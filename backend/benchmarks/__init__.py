@@ -0,0 +1,15 @@
+# backend/benchmarks/__init__.py
+# PrintCraft load and benchmark suite
+#
+# Usage (from the backend directory):
+#   python -m benchmarks --products 5000 --variants 6 --orders 2000
+#   python -m benchmarks --compare benchmarks/results/<previous>.json
+#   python -m benchmarks.startup
+
+import sys
+from pathlib import Path
+
+# The backend is a flat set of modules (main, models, database, ...), not a package
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
@@ -0,0 +1,134 @@
+# backend/benchmarks/__main__.py
+# CLI: generate a synthetic catalog, run the load mix, save/compare JSON results
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .app import BACKEND_DIR, load_app
+from .catalog import CatalogSpec, generate_catalog
+from .runner import run_load
+
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def compare_results(current: dict, baseline: dict, threshold_pct: float) -> int:
+    """Print per-endpoint deltas; returns the number of regressions over threshold"""
+    regressions = 0
+    print(f"\n{'endpoint':<36} {'p95 base':>10} {'p95 now':>10} {'delta':>8} {'rps base':>10} {'rps now':>10}")
+    for name, now in current["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(name)
+        if not base:
+            print(f"{name:<36} {'-':>10} {now['p95_ms']:>10.2f} {'new':>8}")
+            continue
+        delta = (now["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100 if base["p95_ms"] else 0.0
+        flag = ""
+        if delta > threshold_pct:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(
+            f"{name:<36} {base['p95_ms']:>10.2f} {now['p95_ms']:>10.2f} {delta:>+7.1f}% "
+            f"{base['throughput_rps']:>10.1f} {now['throughput_rps']:>10.1f}{flag}"
+        )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="PrintCraft load benchmark")
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--variants", type=int, default=6, help="variants per product")
+    parser.add_argument("--blob-size", type=int, default=2048, help="approx JSON bytes per product")
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--items-per-order", type=int, default=3)
+    parser.add_argument("--design-objects", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--workdir", help="scratch directory for the database and uploads")
+    parser.add_argument("--output", help="results JSON path (default: benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="p95 regression threshold in percent")
+    args = parser.parse_args(argv)
+
+    output = Path(args.output) if args.output else None
+    compare = Path(args.compare) if args.compare else None
+
+    spec = CatalogSpec(
+        categories=args.categories,
+        products=args.products,
+        variants_per_product=args.variants,
+        blob_size=args.blob_size,
+        orders=args.orders,
+        items_per_order=args.items_per_order,
+        design_objects=args.design_objects,
+        seed=args.seed,
+    )
+
+    app, workdir = load_app(args.workdir)
+    print(f"Generating catalog in {workdir} ...")
+    started = time.perf_counter()
+    db = app.state.database.session()
+    try:
+        ids = generate_catalog(db, spec)
+    finally:
+        db.close()
+    print(f"Catalog ready in {time.perf_counter() - started:.2f}s")
+
+    print(f"Running {args.requests} requests at concurrency {args.concurrency} ...")
+    results = asyncio.run(run_load(
+        app,
+        ids,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        warmup=args.warmup,
+        seed=args.seed,
+    ))
+    commit = _git_commit()
+    results["meta"] = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "spec": spec.to_dict(),
+    }
+
+    overall = results["overall"]
+    print(f"\n{overall['requests']} requests, {overall['errors']} errors, {overall['throughput_rps']} req/s")
+    print(f"{'endpoint':<36} {'count':>7} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in results["endpoints"].items():
+        print(
+            f"{name:<36} {stats['count']:>7} {stats['throughput_rps']:>9.1f} "
+            f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}"
+        )
+
+    output = output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults saved to {output}")
+
+    if compare:
+        baseline = json.loads(compare.read_text())
+        if compare_results(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
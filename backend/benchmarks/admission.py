@@ -0,0 +1,87 @@
+# backend/benchmarks/admission.py
+# Admission benchmark - storefront read latency during an upload burst,
+# with load shedding on and off
+#
+#   python -m benchmarks.admission --requests 1500 --concurrency 48 --upload-share 0.3
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from . import BACKEND_DIR
+from .app import load_app
+from .catalog import CatalogSpec, generate_catalog
+from .runner import Scenario, _get_product, _list_categories, _list_products, _upload_product, run_load
+
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+READ_SCENARIOS = ("GET /api/products/", "GET /api/products/{id}", "GET /api/categories/")
+
+
+def run_mode(spec: CatalogSpec, args, admission_enabled: bool) -> dict:
+    app, workdir = load_app(None, admission_enabled=admission_enabled, admission_limits=args.limits)
+    db = app.state.database.session()
+    try:
+        ids = generate_catalog(db, spec)
+    finally:
+        db.close()
+
+    upload_weight = args.upload_share / (1 - args.upload_share) * 100
+    scenarios = [
+        Scenario("GET /api/products/", 40, _list_products),
+        Scenario("GET /api/products/{id}", 45, _get_product),
+        Scenario("GET /api/categories/", 15, _list_categories),
+        Scenario("POST /api/products/upload", upload_weight, _upload_product),
+    ]
+    results = asyncio.run(run_load(app, ids, scenarios, requests=args.requests, concurrency=args.concurrency, warmup=20))
+
+    # Report the worst read endpoint, which is what a storefront page waits on
+    reads = [results["endpoints"][name] for name in READ_SCENARIOS if name in results["endpoints"]]
+    upload = results["endpoints"].get("POST /api/products/upload", {})
+    summary = {
+        "read_requests": sum(r["count"] for r in reads),
+        "read_errors": sum(r["errors"] for r in reads),
+        "read_p99_ms": max((r["p99_ms"] for r in reads), default=0.0),
+        "read_p50_ms": max((r["p50_ms"] for r in reads), default=0.0),
+        "uploads": upload.get("count", 0),
+        "uploads_shed": upload.get("errors", 0),
+        "upload_p99_ms": upload.get("p99_ms", 0.0),
+        "wall_time_s": results["overall"]["wall_time_s"],
+    }
+    if app.state.admission:
+        summary["metrics"] = [line for line in app.state.admission.render_metrics().splitlines()
+                              if line.startswith("printcraft_admission_rejected_total") and not line.endswith(" 0")]
+    return {"summary": summary, "results": results}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.admission", description="Admission control benchmark")
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=1500)
+    parser.add_argument("--concurrency", type=int, default=48)
+    parser.add_argument("--upload-share", type=float, default=0.3, help="fraction of requests that are uploads")
+    parser.add_argument("--limits", help="ADMISSION_LIMITS override, e.g. upload=2:8:10")
+    parser.add_argument("--output", help="results JSON path")
+    args = parser.parse_args(argv)
+
+    spec = CatalogSpec(products=args.products, orders=50)
+    results = {"meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0], **vars(args)}}
+    for mode, enabled in (("off", False), ("on", True)):
+        print(f"Admission {mode}: {args.requests} requests at concurrency {args.concurrency} ...")
+        results[mode] = run_mode(spec, args, enabled)
+        summary = results[mode]["summary"]
+        print(f"  reads: p50 {summary['read_p50_ms']:.1f}ms p99 {summary['read_p99_ms']:.1f}ms "
+              f"({summary['read_errors']} errors); uploads: {summary['uploads']} sent, "
+              f"{summary['uploads_shed']} shed, p99 {summary['upload_p99_ms']:.1f}ms")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"admission-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+# backend/benchmarks/app.py
+# Builds the real PrintCraft app against a throwaway database
+
+import tempfile
+from pathlib import Path
+
+from . import BACKEND_DIR  # noqa: F401 - also puts the backend on sys.path
+
+
+def load_app(workdir: str = None, **settings_overrides):
+    """create_app() against a fresh SQLite file and upload folder inside workdir
+
+    The schema is created here, once, the same way `manage.py init-db` would.
+    Extra keyword arguments are passed through to Settings. Returns (app, workdir).
+    """
+    from main import create_app
+    from settings import Settings
+
+    workdir = str(Path(workdir).resolve()) if workdir else tempfile.mkdtemp(prefix="printcraft-bench-")
+    Path(workdir).mkdir(parents=True, exist_ok=True)
+    db_path = Path(workdir) / "bench.db"
+    if db_path.exists():
+        db_path.unlink()
+
+    settings = Settings(
+        database_url=f"sqlite:///{db_path}",
+        upload_dir=str(Path(workdir) / "uploads"),
+        **settings_overrides,
+    )
+    app = create_app(settings)
+    app.state.database.create_schema()
+    return app, workdir
@@ -0,0 +1,93 @@
+# backend/benchmarks/batch.py
+# Batch lookup benchmark - a 30-item cart resolved one GET per product vs one
+# GET /api/products/batch, with a cold and a warm catalog cache
+#
+#   python -m benchmarks.batch --items 30 --products 500
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+from . import BACKEND_DIR
+from .app import load_app
+from .catalog import CatalogSpec, generate_catalog
+
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+
+async def time_lookups(app, product_ids, runs: int):
+    """Median ms per cart for each (mode, cache) combination"""
+    transport = httpx.ASGITransport(app=app)
+    ids = ",".join(map(str, product_ids))
+
+    async def one_by_one(client):
+        for product_id in product_ids:
+            (await client.get(f"/api/products/{product_id}")).raise_for_status()
+
+    async def batch(client):
+        response = await client.get(f"/api/products/batch?ids={ids}")
+        response.raise_for_status()
+        assert not response.json()["missing"]
+
+    results = {}
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://printcraft.bench") as client:
+        for mode, lookup in (("individual", one_by_one), ("batch", batch)):
+            for cache in ("cold", "warm"):
+                timings = []
+                for _ in range(runs):
+                    if cache == "cold":
+                        app.state.catalog_cache.clear()
+                    started = time.perf_counter()
+                    await lookup(client)
+                    timings.append(time.perf_counter() - started)
+                results[f"{mode}_{cache}_ms"] = round(statistics.median(timings) * 1000, 3)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.batch", description="Batch product lookup benchmark")
+    parser.add_argument("--items", type=int, default=30)
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results JSON path")
+    args = parser.parse_args(argv)
+
+    from models import Product
+
+    app, workdir = load_app()
+    db = app.state.database.session()
+    try:
+        generate_catalog(db, CatalogSpec(products=args.products, orders=0, seed=args.seed))
+        all_ids = [product_id for (product_id,) in db.query(Product.id).all()]
+    finally:
+        db.close()
+    product_ids = random.Random(args.seed).sample(all_ids, args.items)
+
+    timings = asyncio.run(time_lookups(app, product_ids, args.runs))
+    results = {
+        "meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0], **vars(args)},
+        **timings,
+    }
+    print(f"{args.items}-item cart: individual GETs {timings['individual_cold_ms']:.1f}ms cold / "
+          f"{timings['individual_warm_ms']:.1f}ms warm, batch {timings['batch_cold_ms']:.1f}ms cold / "
+          f"{timings['batch_warm_ms']:.1f}ms warm")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"batch-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
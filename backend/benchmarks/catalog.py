@@ -0,0 +1,228 @@
+# backend/benchmarks/catalog.py
+# Synthetic catalog generator - deterministic, bulk-inserted test data
+
+import random
+import uuid
+from dataclasses import dataclass, asdict, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from models import Category, Product, ProductVariant, Order, OrderItem, OrderStatus
+
+SIZES = ["XS", "S", "M", "L", "XL", "XXL", "3XL"]
+COLORS = ["Black", "White", "Navy", "Red", "Forest", "Heather Grey", "Sand", "Royal Blue"]
+MATERIALS = ["Cotton", "Polyester", "Tri-blend", "Ceramic", "Stainless Steel", "Canvas"]
+PRINT_METHODS = ["screen_print", "digital", "embroidery", "sublimation"]
+
+INSERT_BATCH_SIZE = 2000
+
+
+@dataclass
+class CatalogSpec:
+    """Shape of the synthetic catalog"""
+    categories: int = 20
+    products: int = 1000
+    variants_per_product: int = 6
+    blob_size: int = 2048  # approx bytes of print_areas + customization_options JSON per product
+    orders: int = 500
+    items_per_order: int = 3
+    design_objects: int = 8  # Fabric.js objects per order item design
+    seed: int = 42
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class CatalogIds:
+    """Primary keys of the generated rows, used to build request mixes"""
+    category_ids: List[int] = field(default_factory=list)
+    product_ids: List[int] = field(default_factory=list)
+    variant_ids: List[int] = field(default_factory=list)
+    variants_by_product: Dict[int, List[int]] = field(default_factory=dict)
+    order_ids: List[int] = field(default_factory=list)
+
+
+def _print_areas(rng: random.Random, blob_size: int) -> List[Dict[str, Any]]:
+    """Print areas sized so the serialized list is roughly blob_size / 2 bytes"""
+    names = ["front", "back", "left_sleeve", "right_sleeve", "pocket", "wrap", "label"]
+    count = max(1, (blob_size // 2) // 160)
+    areas = []
+    for i in range(count):
+        areas.append({
+            "name": f"{names[i % len(names)]}_{i}",
+            "x": rng.randint(0, 200),
+            "y": rng.randint(0, 200),
+            "width": rng.randint(100, 400),
+            "height": rng.randint(100, 500),
+            "width_in": round(rng.uniform(2, 14), 2),
+            "height_in": round(rng.uniform(2, 16), 2),
+            "min_dpi": 150,
+        })
+    return areas
+
+
+def _customization_options(rng: random.Random, blob_size: int) -> Dict[str, Any]:
+    """Customization options padded to roughly blob_size / 2 bytes"""
+    fonts_needed = max(1, (blob_size // 2) // 24)
+    return {
+        "text": True,
+        "images": True,
+        "max_colors": rng.choice([1, 2, 4, 6, 12]),
+        "print_methods": rng.sample(PRINT_METHODS, k=rng.randint(1, len(PRINT_METHODS))),
+        "fonts": [f"Font Family {i:05d}" for i in range(fonts_needed)],
+    }
+
+
+def _design_data(rng: random.Random, objects: int) -> Dict[str, Any]:
+    """Fabric.js canvas JSON with a mix of text and image objects"""
+    canvas_objects = []
+    for i in range(objects):
+        base = {
+            "left": round(rng.uniform(0, 300), 2),
+            "top": round(rng.uniform(0, 400), 2),
+            "width": round(rng.uniform(20, 250), 2),
+            "height": round(rng.uniform(20, 250), 2),
+            "scaleX": round(rng.uniform(0.25, 2.0), 3),
+            "scaleY": round(rng.uniform(0.25, 2.0), 3),
+            "angle": round(rng.choice([0, 0, 0, rng.uniform(-45, 45)]), 2),
+            "originX": rng.choice(["left", "center"]),
+            "originY": rng.choice(["top", "center"]),
+        }
+        if i % 3 == 0:
+            base.update({"type": "image", "src": f"uploads/designs/{uuid.UUID(int=rng.getrandbits(128)).hex}.png"})
+        else:
+            base.update({"type": "textbox", "text": f"Custom text {i}", "fontSize": rng.randint(12, 72), "fill": "#222222"})
+        canvas_objects.append(base)
+    return {"version": "5.3.0", "objects": canvas_objects}
+
+
+def _insert(db, table, rows: List[Dict[str, Any]]) -> None:
+    """Executemany insert in fixed-size batches"""
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.execute(table.insert(), rows[start:start + INSERT_BATCH_SIZE])
+
+
+def generate_catalog(db, spec: CatalogSpec) -> CatalogIds:
+    """Populate an empty database with a synthetic catalog and order history
+
+    Primary keys are assigned explicitly (1..N) so runs with the same spec
+    produce identical databases.
+    """
+    rng = random.Random(spec.seed)
+    ids = CatalogIds()
+    now = datetime.now()
+
+    # Categories
+    category_rows = []
+    for i in range(1, spec.categories + 1):
+        category_rows.append({
+            "id": i,
+            "name": f"Category {i:04d}",
+            "slug": f"category-{i:04d}",
+            "description": f"Synthetic category {i}",
+            "is_active": True,
+            "created_at": now,
+        })
+        ids.category_ids.append(i)
+    _insert(db, Category.__table__, category_rows)
+
+    # Products and variants
+    product_rows = []
+    variant_rows = []
+    variant_prices = {}
+    variant_id = 0
+    for i in range(1, spec.products + 1):
+        base_price = round(rng.uniform(4.0, 60.0), 2)
+        product_rows.append({
+            "id": i,
+            "name": f"Product {i:06d}",
+            "slug": f"product-{i:06d}",
+            "description": "Synthetic product " * 8,
+            "base_price": base_price,
+            "min_order_quantity": rng.choice([1, 1, 1, 6, 12, 24]),
+            "category_id": ids.category_ids[(i - 1) % len(ids.category_ids)],
+            "sizes": rng.sample(SIZES, k=rng.randint(1, len(SIZES))),
+            "colors": rng.sample(COLORS, k=rng.randint(1, len(COLORS))),
+            "materials": rng.sample(MATERIALS, k=rng.randint(1, 3)),
+            "main_image_url": f"products/synthetic_{i}.png",
+            "gallery_images": [f"products/synthetic_{i}_{g}.png" for g in range(rng.randint(0, 4))],
+            "mockup_templates": {"front": f"mockups/synthetic_{i}_front.png"},
+            "print_areas": _print_areas(rng, spec.blob_size),
+            "customization_options": _customization_options(rng, spec.blob_size),
+            "is_active": rng.random() > 0.05,
+            "is_featured": rng.random() < 0.1,
+            "created_at": now,
+        })
+        ids.product_ids.append(i)
+
+        for v in range(spec.variants_per_product):
+            variant_id += 1
+            price = round(base_price + rng.choice([0, 0, 1.5, 2.5, 4.0]), 2)
+            variant_rows.append({
+                "id": variant_id,
+                "product_id": i,
+                "color": COLORS[v % len(COLORS)],
+                "size": SIZES[v % len(SIZES)],
+                "material": rng.choice(MATERIALS),
+                "price": price,
+                "stock": rng.randint(50, 500),
+                "sku": f"SKU-{i:06d}-{v:03d}",
+            })
+            variant_prices[variant_id] = (i, price)
+            ids.variant_ids.append(variant_id)
+            ids.variants_by_product.setdefault(i, []).append(variant_id)
+    _insert(db, Product.__table__, product_rows)
+    _insert(db, ProductVariant.__table__, variant_rows)
+
+    # Orders with custom designs
+    order_rows = []
+    item_rows = []
+    item_id = 0
+    for i in range(1, spec.orders + 1):
+        subtotal = 0.0
+        for _ in range(spec.items_per_order):
+            item_id += 1
+            if ids.variant_ids:
+                vid = rng.choice(ids.variant_ids)
+                product_id, unit_price = variant_prices[vid]
+            else:
+                vid, product_id, unit_price = None, rng.choice(ids.product_ids), 10.0
+            quantity = rng.choice([1, 1, 2, 5, 12, 50])
+            subtotal += quantity * unit_price
+            item_rows.append({
+                "id": item_id,
+                "order_id": i,
+                "product_id": product_id,
+                "variant_id": vid,
+                "quantity": quantity,
+                "unit_price": unit_price,
+                "total_price": quantity * unit_price,
+                "design_data": _design_data(rng, spec.design_objects),
+                "design_preview_url": f"designs/preview_{item_id}.png",
+            })
+        tax_amount = subtotal * 0.08
+        shipping_cost = 15.0 if subtotal < 50 else 0.0
+        created = now - timedelta(days=rng.randint(0, 365))
+        order_rows.append({
+            "id": i,
+            "order_number": f"PCBENCH{i:08d}",
+            "customer_email": f"customer{i}@example.com",
+            "customer_name": f"Customer {i}",
+            "status": rng.choice(list(OrderStatus)),
+            "subtotal": subtotal,
+            "tax_amount": tax_amount,
+            "shipping_cost": shipping_cost,
+            "total_amount": subtotal + tax_amount + shipping_cost,
+            "shipping_address": {"line1": f"{i} Synthetic Way", "city": "Nairobi", "country": "KE"},
+            "billing_address": {"line1": f"{i} Synthetic Way", "city": "Nairobi", "country": "KE"},
+            "design_approved": rng.random() < 0.6,
+            "estimated_delivery": created + timedelta(days=10),
+            "created_at": created,
+        })
+        ids.order_ids.append(i)
+    _insert(db, Order.__table__, order_rows)
+    _insert(db, OrderItem.__table__, item_rows)
+
+    db.commit()
+    return ids
@@ -0,0 +1,68 @@
+# backend/benchmarks/designs.py
+# Design validation benchmark - time to check every item of a large order
+#
+#   python -m benchmarks.designs --items 500 --objects 20
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from . import BACKEND_DIR
+from .catalog import _design_data, _print_areas
+
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.designs", description="Design validation benchmark")
+    parser.add_argument("--items", type=int, default=500, help="order items per batch")
+    parser.add_argument("--objects", type=int, default=20, help="Fabric.js objects per design")
+    parser.add_argument("--products", type=int, default=20, help="distinct products in the order")
+    parser.add_argument("--blob-size", type=int, default=2048, help="controls print areas per product")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results JSON path")
+    args = parser.parse_args(argv)
+
+    from design_validation import validate_designs
+
+    rng = random.Random(args.seed)
+    product_areas = [_print_areas(rng, args.blob_size) for _ in range(args.products)]
+    items = [(_design_data(rng, args.objects), rng.choice(product_areas)) for _ in range(args.items)]
+
+    validate_designs(items)  # warm up
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        reports = validate_designs(items)
+        timings.append(time.perf_counter() - started)
+
+    objects = args.items * args.objects
+    median = statistics.median(timings)
+    results = {
+        "meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0], **vars(args)},
+        "median_ms": round(median * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+        "objects_per_s": round(objects / median),
+        "failing_items": sum(not report["ok"] for report in reports),
+        "issues": sum(len(report["issues"]) for report in reports),
+    }
+
+    print(f"{args.items} items x {args.objects} objects: median {results['median_ms']:.2f}ms "
+          f"(min {results['min_ms']:.2f}ms, {results['objects_per_s']} objects/s), "
+          f"{results['failing_items']} failing items, {results['issues']} issues")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"designs-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
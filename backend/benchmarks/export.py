@@ -0,0 +1,134 @@
+# backend/benchmarks/export.py
+# Export benchmark - rows/s and memory growth while streaming a large export
+#
+#   python -m benchmarks.export --orders 100000 --items-per-order 4 --format csv
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from . import BACKEND_DIR
+from .app import load_app
+from .catalog import CatalogSpec, generate_catalog
+
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+ADMIN_TOKEN = "bench-export"
+
+
+def _rss_bytes() -> int:
+    """Current resident set size (Linux); 0 where /proc isn't available"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+async def run_export(app, entity: str, format: str, include: str = None):
+    """Drive the ASGI app directly so chunks are consumed as they are sent
+
+    (httpx's ASGI transport buffers the whole body, which would hide both
+    time to first byte and the streaming memory profile.)
+    """
+    query = f"format={format}" + (f"&include={include}" if include else "")
+    path = f"/api/admin/export/{entity}"
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "client": ("127.0.0.1", 50000), "server": ("export.bench", 80),
+        "headers": [(b"host", b"export.bench"), (b"x-admin-token", ADMIN_TOKEN.encode())],
+    }
+    disconnected = asyncio.Event()
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    stats = {"status": None, "bytes": 0, "chunks": 0, "first_byte": None}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            stats["status"] = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            if stats["first_byte"] is None:
+                stats["first_byte"] = time.perf_counter() - started
+            stats["bytes"] += len(message["body"])
+            stats["chunks"] += 1
+            stats["peak"] = max(stats["peak"], _rss_bytes())
+
+    async with app.router.lifespan_context(app):
+        baseline = stats["peak"] = _rss_bytes()
+        started = time.perf_counter()
+        await app(scope, receive, send)
+        elapsed = time.perf_counter() - started
+        disconnected.set()
+    if stats["status"] != 200:
+        raise RuntimeError(f"Export failed with HTTP {stats['status']}")
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "first_byte_ms": round((stats["first_byte"] or 0) * 1000, 2),
+        "bytes": stats["bytes"],
+        "chunks": stats["chunks"],
+        "rss_growth_mb": round((stats["peak"] - baseline) / 2**20, 1),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.export", description="Streaming export benchmark")
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--items-per-order", type=int, default=4)
+    parser.add_argument("--design-objects", type=int, default=2)
+    parser.add_argument("--entity", default="orders", choices=["orders", "products", "categories"])
+    parser.add_argument("--format", default="csv", choices=["csv", "ndjson", "parquet"])
+    parser.add_argument("--include", help="optional columns, e.g. design_data")
+    parser.add_argument("--workdir")
+    parser.add_argument("--output", help="results JSON path")
+    args = parser.parse_args(argv)
+
+    from sqlalchemy import func
+    from models import Category, OrderItem, ProductVariant
+
+    app, workdir = load_app(args.workdir)
+    app.state.settings.admin_token = ADMIN_TOKEN
+    spec = CatalogSpec(orders=args.orders, items_per_order=args.items_per_order, design_objects=args.design_objects)
+    print(f"Generating {args.orders} orders x {args.items_per_order} items in {workdir} ...")
+    db = app.state.database.session()
+    try:
+        generate_catalog(db, spec)
+        expected = {
+            "orders": lambda: db.query(func.count(OrderItem.id)).scalar(),
+            "products": lambda: db.query(func.count(ProductVariant.id)).scalar(),
+            "categories": lambda: db.query(func.count(Category.id)).scalar(),
+        }[args.entity]()
+    finally:
+        db.close()
+
+    print(f"Exporting {expected} {args.entity} rows as {args.format} ...")
+    results = asyncio.run(run_export(app, args.entity, args.format, args.include))
+    results["rows"] = expected
+    results["rows_per_s"] = round(expected / results["elapsed_s"])
+    results["meta"] = {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0], **vars(args)}
+
+    print(f"{expected} rows, {results['bytes'] / 2**20:.1f} MiB in {results['elapsed_s']}s "
+          f"({results['rows_per_s']} rows/s), first byte {results['first_byte_ms']}ms, "
+          f"RSS growth {results['rss_growth_mb']} MiB")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"export-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
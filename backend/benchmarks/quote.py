@@ -0,0 +1,102 @@
+# backend/benchmarks/quote.py
+# Quote benchmark - latency of POST /api/quote for a large corporate order
+#
+#   python -m benchmarks.quote --lines 200 --products 500
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+from . import BACKEND_DIR
+from .app import load_app
+from .catalog import CatalogSpec, generate_catalog
+from .runner import percentile
+
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+
+async def time_quotes(app, lines, runs: int):
+    """Endpoint timings (the first run loads the price tables), then the engine alone"""
+    from main import load_price_tables
+    from pricing import quote
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://printcraft.bench") as client:
+        timings = []
+        for _ in range(runs + 1):
+            started = time.perf_counter()
+            response = await client.post("/api/quote", json={"lines": lines})
+            timings.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+        db = app.state.database.session()
+        try:
+            tables = load_price_tables(db, app.state.catalog_cache, [line["product_id"] for line in lines])
+        finally:
+            db.close()
+        engine_timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            quote(lines, tables)
+            engine_timings.append(time.perf_counter() - started)
+    return timings, engine_timings, response.json()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.quote", description="Quote engine benchmark")
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results JSON path")
+    args = parser.parse_args(argv)
+
+    from models import ProductVariant
+
+    app, workdir = load_app()
+    db = app.state.database.session()
+    try:
+        generate_catalog(db, CatalogSpec(products=args.products, orders=0, seed=args.seed))
+        variants = db.query(ProductVariant.id, ProductVariant.product_id).all()
+    finally:
+        db.close()
+
+    rng = random.Random(args.seed)
+    lines = []
+    for _ in range(args.lines):
+        variant_id, product_id = rng.choice(variants)
+        lines.append({"product_id": product_id, "variant_id": variant_id, "quantity": rng.randint(1, 300), "colors": rng.randint(1, 3)})
+
+    timings, engine_timings, result = asyncio.run(time_quotes(app, lines, args.runs))
+
+    results = {
+        "meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0], **vars(args)},
+        "cold_ms": round(timings[0] * 1000, 3),
+        "median_ms": round(statistics.median(timings[1:]) * 1000, 3),
+        "p99_ms": round(percentile(sorted(timings[1:]), 99) * 1000, 3),
+        "engine_median_ms": round(statistics.median(engine_timings) * 1000, 3),
+        "priced_lines": sum(line["unit_price"] is not None for line in result["lines"]),
+        "total": result["total"],
+    }
+    print(f"{args.lines} lines: POST /api/quote median {results['median_ms']:.2f}ms (p99 {results['p99_ms']:.2f}ms, "
+          f"cold {results['cold_ms']:.1f}ms), engine {results['engine_median_ms']:.2f}ms, "
+          f"{results['priced_lines']} lines priced")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"quote-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
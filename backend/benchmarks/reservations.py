@@ -0,0 +1,155 @@
+# backend/benchmarks/reservations.py
+# Flash-sale contention benchmark - many concurrent checkouts on one SKU
+#
+#   python -m benchmarks.reservations --stock 100 --checkouts 500 --concurrency 64
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+from sqlalchemy import func
+
+from . import BACKEND_DIR
+from .app import load_app
+from .catalog import CatalogSpec, generate_catalog
+from .runner import percentile
+
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+
+def _latency_stats(samples):
+    samples = sorted(samples)
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+
+async def run_checkouts(app, product_id: int, variant_id: int, checkouts: int, concurrency: int, direct: bool):
+    """Each checkout wants one unit; returns latencies and outcome counts"""
+    hold_latencies, order_latencies = [], []
+    outcomes = {"ordered": 0, "sold_out": 0, "errors": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+    order = {
+        "customer_email": "flash@example.com",
+        "customer_name": "Flash Buyer",
+        "shipping_address": {"line1": "1 Sale St"},
+        "billing_address": {"line1": "1 Sale St"},
+        "items": [{"product_id": product_id, "variant_id": variant_id, "quantity": 1, "unit_price": 10.0}],
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://flash.bench", timeout=120.0) as client:
+
+        async def checkout():
+            async with semaphore:
+                token = None
+                if not direct:
+                    started = time.perf_counter()
+                    response = await client.post("/api/reservations/", json={"items": [{"variant_id": variant_id, "quantity": 1}]})
+                    hold_latencies.append(time.perf_counter() - started)
+                    if response.status_code == 409:
+                        outcomes["sold_out"] += 1
+                        return
+                    if response.status_code != 200:
+                        outcomes["errors"] += 1
+                        return
+                    token = response.json()["reservation_token"]
+
+                started = time.perf_counter()
+                response = await client.post("/api/orders/", json={**order, "reservation_token": token})
+                order_latencies.append(time.perf_counter() - started)
+                if response.status_code == 200:
+                    outcomes["ordered"] += 1
+                elif response.status_code == 409:
+                    outcomes["sold_out"] += 1
+                else:
+                    outcomes["errors"] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(checkout() for _ in range(checkouts)))
+        wall_time = time.perf_counter() - started
+
+    return {
+        "wall_time_s": round(wall_time, 3),
+        "checkouts_per_s": round(checkouts / wall_time, 2),
+        "outcomes": outcomes,
+        "hold": _latency_stats(hold_latencies),
+        "order": _latency_stats(order_latencies),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.reservations", description="Stock contention benchmark")
+    parser.add_argument("--stock", type=int, default=100)
+    parser.add_argument("--checkouts", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--direct", action="store_true", help="skip holds; create orders straight away")
+    parser.add_argument("--output", help="results JSON path")
+    args = parser.parse_args(argv)
+
+    from models import OrderItem, ProductVariant, ReservationStatus, StockReservation
+
+    app, workdir = load_app()
+    database = app.state.database
+    db = database.session()
+    try:
+        generate_catalog(db, CatalogSpec(categories=1, products=1, variants_per_product=1, orders=0))
+        variant = db.query(ProductVariant).first()
+        variant.stock = args.stock
+        db.commit()
+        product_id, variant_id = variant.product_id, variant.id
+    finally:
+        db.close()
+
+    results = asyncio.run(run_checkouts(app, product_id, variant_id, args.checkouts, args.concurrency, args.direct))
+
+    db = database.session()
+    try:
+        final_stock = db.query(ProductVariant.stock).filter(ProductVariant.id == variant_id).scalar()
+        units_sold = db.query(func.coalesce(func.sum(OrderItem.quantity), 0)).filter(OrderItem.variant_id == variant_id).scalar()
+        committed = db.query(func.count(StockReservation.id)).filter(
+            StockReservation.status == ReservationStatus.COMMITTED
+        ).scalar()
+    finally:
+        db.close()
+
+    oversold = units_sold > args.stock or final_stock < 0 or final_stock + units_sold != args.stock
+    results.update({
+        "meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0], **vars(args)},
+        "final_stock": final_stock,
+        "units_sold": units_sold,
+        "committed_holds": committed,
+        "consistent": not oversold,
+    })
+
+    outcomes = results["outcomes"]
+    print(f"{args.checkouts} checkouts on stock {args.stock} at concurrency {args.concurrency}: "
+          f"{outcomes['ordered']} ordered, {outcomes['sold_out']} sold out, {outcomes['errors']} errors "
+          f"in {results['wall_time_s']}s ({results['checkouts_per_s']}/s)")
+    for phase in ("hold", "order"):
+        stats = results[phase]
+        if stats["count"]:
+            print(f"  {phase:<6} p50 {stats['p50_ms']:.2f}ms  p95 {stats['p95_ms']:.2f}ms  p99 {stats['p99_ms']:.2f}ms")
+    print(f"  final stock {final_stock}, units sold {units_sold} -> {'OK' if not oversold else 'OVERSOLD / INCONSISTENT'}")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"reservations-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, default=str))
+    print(f"\nResults saved to {output}")
+    return 1 if oversold else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+# backend/benchmarks/runner.py
+# In-process ASGI load driver - runs weighted request mixes against the app
+
+import asyncio
+import math
+import random
+import struct
+import time
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from .catalog import CatalogIds
+
+
+def _solid_png(width: int, height: int) -> bytes:
+    """A valid single-colour PNG, built without Pillow"""
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    pixels = zlib.compress((b"\x00" + b"\xff\x00\x00" * width) * height)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", pixels) + chunk(b"IEND", b"")
+
+
+TINY_PNG = _solid_png(1, 1)
+MOCKUP_PNG = _solid_png(320, 320)  # large enough to contain the upload scenario's print area
+
+
+@dataclass
+class Scenario:
+    """One endpoint in the request mix"""
+    name: str
+    weight: float
+    send: Callable[[httpx.AsyncClient, random.Random, "ScenarioContext"], Any]
+
+
+@dataclass
+class ScenarioContext:
+    """Ids available to scenarios; grows as orders are created during the run"""
+    ids: CatalogIds
+    created_order_ids: List[int] = field(default_factory=list)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+# =============================================================================
+# SCENARIOS
+# =============================================================================
+
+async def _list_products(client, rng, ctx):
+    return await client.get("/api/products/", params={"skip": rng.randint(0, max(0, len(ctx.ids.product_ids) - 20)), "limit": 20})
+
+
+async def _list_products_by_category(client, rng, ctx):
+    return await client.get("/api/products/", params={"category_id": rng.choice(ctx.ids.category_ids), "limit": 50})
+
+
+async def _get_product(client, rng, ctx):
+    return await client.get(f"/api/products/{rng.choice(ctx.ids.product_ids)}")
+
+
+async def _list_categories(client, rng, ctx):
+    return await client.get("/api/categories/")
+
+
+async def _get_category(client, rng, ctx):
+    return await client.get(f"/api/categories/{rng.choice(ctx.ids.category_ids)}")
+
+
+async def _get_stats(client, rng, ctx):
+    return await client.get("/api/stats")
+
+
+async def _upload_product(client, rng, ctx):
+    data = {
+        "name": f"Bench Upload {uuid.uuid4().hex[:12]}",
+        "description": "Uploaded by the benchmark suite",
+        "base_price": "19.99",
+        "category_id": str(rng.choice(ctx.ids.category_ids)),
+        "sizes": '["S", "M", "L"]',
+        "colors": '["Black", "White"]',
+        "print_areas": '[{"name": "front", "x": 10, "y": 10, "width": 200, "height": 250}]',
+        "variants": '[{"color": "Black", "size": "M", "price": 19.99, "stock": 25}]',
+    }
+    files = {
+        "main_image": ("main.png", TINY_PNG, "image/png"),
+        "mockup_front": ("front.png", MOCKUP_PNG, "image/png"),
+    }
+    return await client.post("/api/products/upload", data=data, files=files)
+
+
+async def _create_order(client, rng, ctx):
+    items = []
+    for _ in range(rng.randint(1, 4)):
+        # A variant of the chosen product, as a real cart would have
+        product_id = rng.choice(ctx.ids.product_ids)
+        variant_ids = ctx.ids.variants_by_product.get(product_id)
+        items.append({
+            "product_id": product_id,
+            "variant_id": rng.choice(variant_ids) if variant_ids else None,
+            "quantity": rng.choice([1, 2, 12]),
+            "unit_price": 14.5,
+            "design_data": {"version": "5.3.0", "objects": [{"type": "textbox", "text": "Bench", "left": 10, "top": 10, "width": 100, "height": 40}]},
+        })
+    response = await client.post("/api/orders/", json={
+        "customer_email": "bench@example.com",
+        "customer_name": "Bench Runner",
+        "shipping_address": {"line1": "1 Bench Rd", "city": "Nairobi"},
+        "billing_address": {"line1": "1 Bench Rd", "city": "Nairobi"},
+        "items": items,
+    })
+    if response.status_code == 200:
+        ctx.created_order_ids.append(response.json()["order_id"])
+    return response
+
+
+async def _order_tracking(client, rng, ctx):
+    order_ids = ctx.ids.order_ids or ctx.created_order_ids
+    if not order_ids:
+        return None
+    return await client.get(f"/api/orders/{rng.choice(order_ids)}/tracking")
+
+
+DEFAULT_SCENARIOS = [
+    Scenario("GET /api/products/", 30, _list_products),
+    Scenario("GET /api/products/?category_id", 10, _list_products_by_category),
+    Scenario("GET /api/products/{id}", 25, _get_product),
+    Scenario("GET /api/categories/", 8, _list_categories),
+    Scenario("GET /api/categories/{id}", 4, _get_category),
+    Scenario("GET /api/stats", 3, _get_stats),
+    Scenario("POST /api/products/upload", 2, _upload_product),
+    Scenario("POST /api/orders/", 10, _create_order),
+    Scenario("GET /api/orders/{id}/tracking", 8, _order_tracking),
+]
+
+
+# =============================================================================
+# LOAD LOOP
+# =============================================================================
+
+async def run_load(
+    app,
+    ids: CatalogIds,
+    scenarios: Optional[List[Scenario]] = None,
+    requests: int = 2000,
+    concurrency: int = 16,
+    warmup: int = 50,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    """Drive the ASGI app with a weighted request mix and collect latencies
+
+    `requests` is split across `concurrency` virtual clients; each records
+    per-scenario wall time including request body encoding and response
+    parsing, as a real client would see it.
+    """
+    scenarios = scenarios or DEFAULT_SCENARIOS
+    ctx = ScenarioContext(ids=ids)
+    weights = [s.weight for s in scenarios]
+    latencies: Dict[str, List[float]] = {s.name: [] for s in scenarios}
+    errors: Dict[str, int] = {s.name: 0 for s in scenarios}
+    remaining = [requests]
+
+    # ASGITransport doesn't send lifespan events, so run startup/shutdown ourselves
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://printcraft.bench", timeout=60.0) as client:
+        warm_rng = random.Random(seed - 1)
+        for _ in range(warmup):
+            scenario = warm_rng.choices(scenarios, weights=weights)[0]
+            await scenario.send(client, warm_rng, ctx)
+
+        async def worker(worker_id: int):
+            rng = random.Random(seed * 1000 + worker_id)
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                scenario = rng.choices(scenarios, weights=weights)[0]
+                started = time.perf_counter()
+                response = await scenario.send(client, rng, ctx)
+                elapsed = time.perf_counter() - started
+                if response is None:
+                    continue
+                latencies[scenario.name].append(elapsed)
+                if response.status_code >= 400:
+                    errors[scenario.name] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        wall_time = time.perf_counter() - started
+
+    endpoints = {}
+    total = 0
+    for name, samples in latencies.items():
+        if not samples:
+            continue
+        samples.sort()
+        total += len(samples)
+        endpoints[name] = {
+            "count": len(samples),
+            "errors": errors[name],
+            "throughput_rps": round(len(samples) / wall_time, 2),
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+            "p50_ms": round(percentile(samples, 50) * 1000, 3),
+            "p95_ms": round(percentile(samples, 95) * 1000, 3),
+            "p99_ms": round(percentile(samples, 99) * 1000, 3),
+            "max_ms": round(samples[-1] * 1000, 3),
+        }
+
+    return {
+        "overall": {
+            "requests": total,
+            "errors": sum(errors.values()),
+            "wall_time_s": round(wall_time, 3),
+            "throughput_rps": round(total / wall_time, 2) if wall_time else 0.0,
+            "concurrency": concurrency,
+        },
+        "endpoints": endpoints,
+    }
@@ -0,0 +1,93 @@
+# backend/benchmarks/startup.py
+# Worker startup benchmark - import time and time to first request
+#
+#   python -m benchmarks.startup --runs 10
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from . import BACKEND_DIR
+
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+# Runs in a fresh interpreter, like a newly forked worker
+PROBE = r"""
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import main
+t1 = time.perf_counter()
+
+async def first_request():
+    import httpx
+    app = main.app
+    async with app.router.lifespan_context(app):
+        t2 = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup.bench") as client:
+            response = await client.get("/api/categories/")
+            response.raise_for_status()
+        return t2, time.perf_counter()
+
+t2, t3 = asyncio.run(first_request())
+print(json.dumps({"import_s": t1 - t0, "startup_s": t2 - t1, "first_request_s": t3 - t2, "ready_s": t3 - t0}))
+"""
+
+
+def _run_probe(env: dict) -> dict:
+    output = subprocess.check_output([sys.executable, "-c", PROBE, str(BACKEND_DIR)], env=env)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def _summarize(values):
+    return {
+        "median_ms": round(statistics.median(values) * 1000, 2),
+        "min_ms": round(min(values) * 1000, 2),
+        "max_ms": round(max(values) * 1000, 2),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description="Worker startup benchmark")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", help="results JSON path")
+    args = parser.parse_args(argv)
+
+    import os
+    from database import Database
+
+    workdir = tempfile.mkdtemp(prefix="printcraft-startup-")
+    database_url = f"sqlite:///{Path(workdir) / 'startup.db'}"
+    # Schema exists before workers start, as after `manage.py init-db`
+    database = Database(database_url)
+    database.create_schema()
+    database.dispose()
+
+    env = {**os.environ, "DATABASE_URL": database_url, "UPLOAD_DIR": str(Path(workdir) / "uploads")}
+    env.pop("AUTO_CREATE_SCHEMA", None)
+
+    runs = [_run_probe(env) for _ in range(args.runs)]
+    results = {
+        "meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0], "runs": args.runs},
+        "startup": {key: _summarize([run[key] for run in runs]) for key in ("import_s", "startup_s", "first_request_s", "ready_s")},
+    }
+
+    print(f"{'phase':<18} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for key, stats in results["startup"].items():
+        print(f"{key:<18} {stats['median_ms']:>10.2f} {stats['min_ms']:>10.2f} {stats['max_ms']:>10.2f}")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"startup-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
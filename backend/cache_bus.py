@@ -0,0 +1,331 @@
+# backend/cache_bus.py
+# Cross-process cache coherence - shared entity version table + local caches
+#
+# Every worker keeps its own in-process cache, but each entry remembers the
+# versions of the entities it was built from ("product:12", "categories", ...).
+# Writers bump those versions in a table shared by all workers on the host, and
+# readers compare versions on every lookup, so a write in one worker is seen by
+# the next read in any other worker with no messaging delay.
+
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("printcraft.cache")
+
+VERSION_SLOTS = 65536
+_SLOT = struct.Struct("<Q")
+
+
+def entity_key(kind: str, entity_id: Any = None) -> str:
+    """Version key for one entity ("product", 12) or a collection ("products")"""
+    return kind if entity_id is None else f"{kind}:{entity_id}"
+
+
+# =============================================================================
+# VERSION SOURCES
+# =============================================================================
+
+class SharedVersionTable:
+    """Fixed-size table of 64-bit counters in a memory-mapped file
+
+    Keys hash into slots; a collision only causes an extra invalidation, never
+    a stale read. Writes take an flock so increments from different processes
+    don't race; reads are lock-free aligned 8-byte loads.
+    """
+
+    kind = "shm"
+
+    def __init__(self, path: str, slots: int = VERSION_SLOTS):
+        import fcntl  # POSIX only; callers fall back when this is unavailable
+        self._fcntl = fcntl
+        self.path = path
+        self.slots = slots
+        size = _SLOT.size * slots
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self._fd).st_size < size:
+                    os.ftruncate(self._fd, size)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, size)
+        self._lock = threading.Lock()
+
+    def _slot(self, key: str) -> int:
+        return zlib.crc32(key.encode()) % self.slots
+
+    def versions(self, keys: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(_SLOT.unpack_from(self._map, self._slot(key) * _SLOT.size)[0] for key in keys)
+
+    def bump(self, *keys: str) -> None:
+        offsets = {self._slot(key) * _SLOT.size for key in keys}
+        with self._lock:
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_EX)
+            try:
+                for offset in offsets:
+                    _SLOT.pack_into(self._map, offset, _SLOT.unpack_from(self._map, offset)[0] + 1)
+            finally:
+                self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+
+class SQLiteDataVersion:
+    """Fallback for SQLite: PRAGMA data_version changes whenever any other
+    connection commits, so every key shares that one coarse version"""
+
+    kind = "sqlite"
+
+    def __init__(self, database_path: str):
+        import sqlite3
+        self._conn = sqlite3.connect(database_path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def versions(self, keys: Iterable[str]) -> Tuple[int, ...]:
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        return tuple(version for _ in keys)
+
+    def bump(self, *keys: str) -> None:
+        pass  # the writer's own commit already changed data_version
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class LocalVersionTable:
+    """In-process counters - only coherent with a single worker"""
+
+    kind = "local"
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def versions(self, keys: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self._versions.get(key, 0) for key in keys)
+
+    def bump(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+
+    def close(self) -> None:
+        pass
+
+
+def _default_bus_path(database_url: str) -> str:
+    # One table per database, shared by every worker on this host
+    digest = hashlib.sha1(database_url.encode()).hexdigest()[:16]
+    shm = Path("/dev/shm")
+    directory = shm if shm.is_dir() else Path(tempfile.gettempdir())
+    return str(directory / f"printcraft-versions-{digest}")
+
+
+def create_version_source(mode: str, database_url: str, path: Optional[str] = None):
+    """Pick the best available version source ("shm", "sqlite" or "local")"""
+    if mode == "shm":
+        try:
+            return SharedVersionTable(path or _default_bus_path(database_url))
+        except (ImportError, OSError) as e:
+            logger.warning("Shared version table unavailable (%s), falling back", e)
+            mode = "sqlite"
+    if mode == "sqlite" and database_url.startswith("sqlite:///"):
+        database_path = database_url[len("sqlite:///"):]
+        if database_path and database_path != ":memory:":
+            return SQLiteDataVersion(database_path)
+    if mode != "local":
+        logger.warning("Cache versions are process-local; caches are only coherent with one worker")
+    return LocalVersionTable()
+
+
+# =============================================================================
+# LOCAL CACHE
+# =============================================================================
+
+class VersionedCache:
+    """Per-worker LRU cache whose entries are validated against the version source"""
+
+    def __init__(self, versions, max_entries: int = 10000):
+        self.versions = versions
+        self.max_entries = max_entries
+        # key -> (deps, versions, value, expires, built from a replica read)
+        self._entries: "OrderedDict[Any, Tuple[Tuple[str, ...], Tuple[int, ...], Any, float, bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _fresh(entry, deps: Tuple[str, ...], current: Tuple[int, ...], now: float, max_age: Optional[float]) -> bool:
+        return (
+            entry is not None and entry[0] == deps and entry[1] == current and entry[3] > now
+            and (max_age is not None or not entry[4])
+        )
+
+    def get_or_load(
+        self, key: Any, deps: Tuple[str, ...], loader: Callable[[], Any], max_age: Optional[float] = None
+    ) -> Any:
+        """Return the cached value for key, rebuilding it if any dependency changed
+
+        max_age bounds how long a value may be served regardless of versions;
+        pass it for values loaded from a replica that may lag behind. Callers
+        without max_age (primary reads) never get a value loaded from a
+        replica, which may predate their own write.
+        """
+        current = self.versions.versions(deps)
+        with self._lock:
+            entry = self._entries.get(key)
+            if self._fresh(entry, deps, current, time.monotonic(), max_age):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        # Versions were read before loading, so a write racing with the load
+        # leaves this entry already stale rather than wrongly fresh
+        expires = time.monotonic() + max_age if max_age is not None else math.inf
+        value = loader()
+        with self._lock:
+            self._entries[key] = (deps, current, value, expires, max_age is not None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def get_many(
+        self,
+        deps_by_key: Dict[Any, Tuple[str, ...]],
+        load_missing: Callable[[List[Any]], Dict[Any, Any]],
+        max_age: Optional[float] = None,
+    ) -> Dict[Any, Any]:
+        """get_or_load for many keys at once; every miss is loaded in one load_missing call
+
+        Keys that load_missing leaves out are absent from the result and not cached.
+        """
+        current = {key: self.versions.versions(deps) for key, deps in deps_by_key.items()}
+        found: Dict[Any, Any] = {}
+        now = time.monotonic()
+        with self._lock:
+            for key, deps in deps_by_key.items():
+                entry = self._entries.get(key)
+                if self._fresh(entry, deps, current[key], now, max_age):
+                    self._entries.move_to_end(key)
+                    found[key] = entry[2]
+            self.hits += len(found)
+            self.misses += len(deps_by_key) - len(found)
+        missing = [key for key in deps_by_key if key not in found]
+        if not missing:
+            return found
+
+        expires = time.monotonic() + max_age if max_age is not None else math.inf
+        loaded = load_missing(missing)
+        with self._lock:
+            for key, value in loaded.items():
+                self._entries[key] = (deps_by_key[key], current[key], value, expires, max_age is not None)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        found.update(loaded)
+        return found
+
+    def invalidate(self, *keys: str) -> None:
+        """Bump entity versions after a committed write (visible to all workers)"""
+        self.versions.bump(*keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def render_metrics(self) -> str:
+        with self._lock:
+            size = len(self._entries)
+        return (
+            "# HELP printcraft_cache_hits_total Local catalog cache hits\n"
+            "# TYPE printcraft_cache_hits_total counter\n"
+            f"printcraft_cache_hits_total {self.hits}\n"
+            "# HELP printcraft_cache_misses_total Local catalog cache misses\n"
+            "# TYPE printcraft_cache_misses_total counter\n"
+            f"printcraft_cache_misses_total {self.misses}\n"
+            "# HELP printcraft_cache_entries Entries in the local catalog cache\n"
+            "# TYPE printcraft_cache_entries gauge\n"
+            f"printcraft_cache_entries {size}\n"
+        )
+
+
+# =============================================================================
+# IN-FLIGHT DEDUPLICATION
+# =============================================================================
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Collapse concurrent identical loads in one worker into a single call
+
+    The first caller for a key runs the loader; callers arriving while it
+    runs wait and get the same result (or exception). Nothing is kept once
+    the call finishes - caching is VersionedCache's job.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Any, _Flight] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Any, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.value
+
+    def render_metrics(self) -> str:
+        return (
+            "# HELP printcraft_singleflight_calls_total Loads run for batch lookups\n"
+            "# TYPE printcraft_singleflight_calls_total counter\n"
+            f"printcraft_singleflight_calls_total {self.calls}\n"
+            "# HELP printcraft_singleflight_shared_total Batch lookups served by an identical load already in flight\n"
+            "# TYPE printcraft_singleflight_shared_total counter\n"
+            f"printcraft_singleflight_shared_total {self.shared}\n"
+        )
@@ -0,0 +1,263 @@
+# backend/compression.py
+# Negotiated response compression (zstd / brotli / gzip) and precompressed snapshots
+
+import gzip
+import math
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# Server preference when the client weighs encodings equally
+ENCODING_PREFERENCE = tuple(
+    name for name, available in (("zstd", zstandard), ("br", brotli), ("gzip", True)) if available
+)
+
+# Levels for per-request compression (fast) and for snapshots (compressed once, served many times)
+DYNAMIC_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+SNAPSHOT_LEVELS = {"zstd": 12, "br": 9, "gzip": 9}
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available: Tuple[str, ...] = ENCODING_PREFERENCE) -> Optional[str]:
+    """Pick the best available content-coding for an Accept-Encoding header"""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+    best, best_q = None, 0.0
+    for name in available:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress_bytes(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """One-shot compression of a complete body"""
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=level or DYNAMIC_LEVELS["gzip"], mtime=0)
+    if encoding == "br":
+        return brotli.compress(data, quality=level or DYNAMIC_LEVELS["br"])
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level or DYNAMIC_LEVELS["zstd"]).compress(data)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class _StreamCompressor:
+    """Incremental compressor; each chunk is flushed so clients see progress"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._obj = zlib.compressobj(DYNAMIC_LEVELS["gzip"], zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._obj = brotli.Compressor(quality=DYNAMIC_LEVELS["br"])
+        elif encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=DYNAMIC_LEVELS["zstd"]).compressobj()
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "gzip":
+            return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == "br":
+            return self._obj.process(data) + self._obj.flush()
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        if self.encoding == "gzip":
+            return self._obj.flush(zlib.Z_FINISH)
+        if self.encoding == "br":
+            return self._obj.finish()
+        return self._obj.flush()
+
+
+def _is_compressible(content_type: str) -> bool:
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+# =============================================================================
+# ASGI MIDDLEWARE
+# =============================================================================
+
+class CompressionMiddleware:
+    """Compresses compressible responses above minimum_size
+
+    Whole bodies are compressed in one shot with a Content-Length; streamed
+    bodies (more_body=True) are compressed chunk by chunk. Responses that
+    already carry a Content-Encoding (e.g. precompressed snapshots) pass
+    through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        state = {"start": None, "compressor": None, "passthrough": False}
+
+        async def send_compressed(message):
+            if message["type"] == "http.response.start":
+                state["start"] = message  # wait for the first body chunk to decide
+                return
+            if message["type"] != "http.response.body" or state["passthrough"]:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if state["compressor"] is not None:
+                data = state["compressor"].chunk(body)
+                if not more_body:
+                    data += state["compressor"].finish()
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            start = state["start"]
+            headers = MutableHeaders(raw=list(start.get("headers", [])))
+            start = {**start, "headers": headers.raw}
+            compressible = _is_compressible(headers.get("content-type", "")) and "content-encoding" not in headers
+            if compressible:
+                headers.add_vary_header("Accept-Encoding")
+
+            if not compressible or (not more_body and len(body) < self.minimum_size):
+                state["passthrough"] = True
+                await send(start)
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            if not more_body:
+                data = compress_bytes(body, encoding)
+                headers["Content-Length"] = str(len(data))
+                await send(start)
+                await send({"type": "http.response.body", "body": data})
+                return
+
+            # Streaming response: length is unknown up front
+            del headers["Content-Length"]
+            state["compressor"] = _StreamCompressor(encoding)
+            await send(start)
+            await send({"type": "http.response.body", "body": state["compressor"].chunk(body), "more_body": True})
+
+        await self.app(scope, receive, send_compressed)
+
+
+# =============================================================================
+# PRECOMPRESSED SNAPSHOTS
+# =============================================================================
+
+class _Snapshot:
+    __slots__ = ("versions", "raw", "encoded", "lock", "expires", "replica")
+
+    def __init__(self, versions: Tuple[int, ...], raw: bytes, expires: float = math.inf, replica: bool = False):
+        self.versions = versions
+        self.raw = raw
+        self.expires = expires
+        self.replica = replica  # built from a replica read
+        self.encoded: Dict[str, bytes] = {}
+        self.lock = threading.Lock()
+
+    def body(self, encoding: Optional[str]) -> bytes:
+        if encoding is None:
+            return self.raw
+        with self.lock:
+            if encoding not in self.encoded:
+                self.encoded[encoding] = compress_bytes(self.raw, encoding, SNAPSHOT_LEVELS[encoding])
+            return self.encoded[encoding]
+
+
+class SnapshotCache:
+    """Serialized response bodies plus their compressed forms, rebuilt when
+    any dependency version changes (see cache_bus)
+
+    Each encoding is compressed once per catalog version at a high level,
+    then served as stored bytes.
+    """
+
+    def __init__(self, versions, max_entries: int = 64):
+        self.versions = versions
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[object, _Snapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._building: Dict[object, threading.Lock] = {}
+
+    def get(self, key, deps: Tuple[str, ...], build: Callable[[], bytes], max_age: Optional[float] = None) -> _Snapshot:
+        """max_age bounds a snapshot's life regardless of versions (replica reads)
+
+        Primary reads (max_age None) never get a snapshot built from a replica,
+        which may predate the reader's own write.
+        """
+        current = self.versions.versions(deps)
+
+        def fresh(snapshot):
+            return (
+                snapshot is not None and snapshot.versions == current and snapshot.expires > time.monotonic()
+                and (max_age is not None or not snapshot.replica)
+            )
+
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if fresh(snapshot):
+                self._entries.move_to_end(key)
+                return snapshot
+            build_lock = self._building.setdefault(key, threading.Lock())
+
+        # One thread rebuilds a given listing; the others wait and reuse it
+        with build_lock:
+            with self._lock:
+                snapshot = self._entries.get(key)
+            if fresh(snapshot):
+                return snapshot
+            expires = time.monotonic() + max_age if max_age is not None else math.inf
+            snapshot = _Snapshot(current, build(), expires, replica=max_age is not None)
+            with self._lock:
+                self._entries[key] = snapshot
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._building.pop(evicted, None)
+        return snapshot
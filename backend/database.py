@@ -0,0 +1,214 @@
+# backend/database.py
+# Engine and session lifecycle - nothing connects until first use
+#
+# Writes always go to the primary. Read-only endpoints take a session from
+# get_read_db, which is bound to the replica (when one is configured) unless
+# the client wrote something within the last few seconds (read-your-writes,
+# tracked with a cookie so it works across workers) or the replica is lagging
+# further behind than the configured limit.
+
+import logging
+import math
+import os
+import threading
+import time
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import Session, sessionmaker
+
+from instrumentation import install_query_hooks
+
+Base = declarative_base()
+logger = logging.getLogger("printcraft.database")
+
+LAST_WRITE_COOKIE = "pc_last_write"  # unix time of the client's latest write request
+LAG_CHECK_INTERVAL = 1.0  # seconds a replica lag reading is reused
+
+# Seconds the standby is behind its primary; NULL when not in recovery
+POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def _create_engine(url: str, instrument: bool = False):
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args)
+    # Per-request SQL instrumentation (only attached when requests are sampled)
+    if instrument:
+        install_query_hooks(engine, Base)
+    return engine
+
+
+def _sqlite_mtime(url: str) -> float:
+    """Last modification of a SQLite database, including its WAL"""
+    path = make_url(url).database
+    return max((os.path.getmtime(p) for p in (path, f"{path}-wal") if os.path.exists(p)), default=0.0)
+
+
+class Database:
+    """Lazily created engines plus session factories bound to them"""
+
+    def __init__(
+        self,
+        url: str,
+        replica_url: Optional[str] = None,
+        replica_max_lag: float = 5.0,
+        read_your_writes_seconds: float = 5.0,
+        instrument_queries: bool = False,
+    ):
+        self.url = url
+        self.replica_url = replica_url
+        self.replica_max_lag = replica_max_lag
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.instrument_queries = instrument_queries  # see instrumentation.install_query_hooks
+        self._engine = None
+        self._replica_engine = None
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+        self.ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+        self._lock = threading.Lock()
+        self._lag = 0.0
+        self._lag_checked = -math.inf
+        self.reads = {"replica": 0, "sticky": 0, "lagging": 0}
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = _create_engine(self.url, self.instrument_queries)
+            self.SessionLocal.configure(bind=self._engine)
+        return self._engine
+
+    @property
+    def replica_engine(self):
+        if self._replica_engine is None and self.replica_url:
+            self._replica_engine = _create_engine(self.replica_url, self.instrument_queries)
+            self.ReplicaSessionLocal.configure(bind=self._replica_engine)
+        return self._replica_engine
+
+    def session(self):
+        self.engine
+        return self.SessionLocal()
+
+    def read_session(self, last_write: Optional[float] = None) -> Session:
+        """Session for a read-only request: the replica when it is safe to use
+
+        `last_write` is when this client last wrote (see LAST_WRITE_COOKIE);
+        replica sessions record how stale they may be (see read_staleness).
+        """
+        if self.replica_engine is None:
+            return self.session()
+        if last_write is not None and time.time() - last_write < self.read_your_writes_seconds:
+            self.reads["sticky"] += 1
+            return self.session()
+        if self.replica_lag() > self.replica_max_lag:
+            self.reads["lagging"] += 1
+            return self.session()
+        self.reads["replica"] += 1
+        session = self.ReplicaSessionLocal()
+        session.info["max_staleness"] = self.replica_max_lag
+        return session
+
+    def replica_lag(self) -> float:
+        """Seconds the replica is behind the primary (inf when unreachable), re-checked once a second"""
+        now = time.monotonic()
+        if now - self._lag_checked < LAG_CHECK_INTERVAL:
+            return self._lag
+        with self._lock:
+            if now - self._lag_checked < LAG_CHECK_INTERVAL:
+                return self._lag
+            try:
+                self._lag = self._measure_lag()
+            except Exception as e:
+                if self._lag != math.inf:
+                    logger.warning("Replica lag check failed, reading from the primary: %s", e)
+                self._lag = math.inf
+            self._lag_checked = now
+        return self._lag
+
+    def _measure_lag(self) -> float:
+        dialect = self.replica_engine.dialect.name
+        if dialect == "postgresql":
+            with self.replica_engine.connect() as conn:
+                return float(conn.execute(POSTGRES_LAG_SQL).scalar() or 0.0)
+        if dialect == "sqlite":
+            # A file copy is as stale as the primary changes it hasn't picked up
+            with self.replica_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return max(0.0, _sqlite_mtime(self.url) - _sqlite_mtime(self.replica_url))
+        return 0.0
+
+    def create_schema(self) -> None:
+        """Create missing tables (run once per deploy, not per worker)"""
+        import models  # noqa: F401 - registers the tables on Base.metadata
+        Base.metadata.create_all(bind=self.engine)
+
+    def ping(self) -> None:
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        if self.replica_engine is not None:
+            self.replica_lag()
+
+    def dispose(self) -> None:
+        if self._engine is not None:
+            self._engine.dispose()
+        if self._replica_engine is not None:
+            self._replica_engine.dispose()
+
+    def render_metrics(self) -> str:
+        if not self.replica_url:
+            return ""
+        lines = [
+            "# HELP printcraft_db_reads_total Read-only sessions by where they were served",
+            "# TYPE printcraft_db_reads_total counter",
+        ]
+        routes = {"replica": "replica", "sticky": "primary_read_your_writes", "lagging": "primary_replica_lagging"}
+        lines += [f'printcraft_db_reads_total{{route="{routes[name]}"}} {count}' for name, count in self.reads.items()]
+        lines += [
+            "# HELP printcraft_db_replica_lag_seconds Last measured replica lag (+Inf when unreachable)",
+            "# TYPE printcraft_db_replica_lag_seconds gauge",
+            f"printcraft_db_replica_lag_seconds {'+Inf' if math.isinf(self._lag) else round(self._lag, 3)}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def read_staleness(session: Session) -> Optional[float]:
+    """How stale data read through session may be, or None if it came from the primary
+
+    Cached values built from a replica read must expire after this long: a
+    write still on its way to the replica has bumped the cache versions
+    already, so the version check alone can't catch it.
+    """
+    return session.info.get("max_staleness")
+
+
+# Dependency to get database session
+def get_db(request: Request, response: Response):
+    database = request.app.state.database
+    if database.replica_url and request.method not in ("GET", "HEAD", "OPTIONS"):
+        # Route this client's reads to the primary until the replica has caught up
+        response.set_cookie(
+            LAST_WRITE_COOKIE, f"{time.time():.3f}", max_age=math.ceil(database.read_your_writes_seconds),
+            httponly=True, samesite="lax"
+        )
+    db = database.session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Dependency for read-only endpoints; may be served by the replica
+def get_read_db(request: Request):
+    try:
+        last_write = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        last_write = None
+    db = request.app.state.database.read_session(last_write)
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,241 @@
+# backend/design_validation.py
+# Print-area geometry - do an order's designs fit, and at what resolution?
+#
+# Every Fabric.js object is reduced to its axis-aligned bounding box on the
+# canvas (scaleX/scaleY, rotation about the origin point, originX/originY).
+# The objects of all items in an order are stacked into one set of arrays and
+# checked against their products' print areas with NumPy broadcasting, so a
+# large order costs a handful of array operations rather than a Python loop
+# per object per area.
+#
+# Print areas are rectangles in canvas pixels ({"name", "x", "y", "width",
+# "height"}). Areas that also give their physical size ("width_in",
+# "height_in") get an effective DPI check for raster objects against
+# "min_dpi" (default DEFAULT_MIN_DPI).
+
+import json
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_MIN_DPI = 150
+BOUNDS_TOLERANCE = 0.5  # canvas px; absorbs rounding from the editor
+
+RASTER_TYPES = frozenset({"image"})
+_ORIGINS = {"left": 0.0, "top": 0.0, "center": 0.5, "right": 1.0, "bottom": 1.0}
+
+# Columns of the per-object array built by parse_objects
+_COLUMNS = ("left", "top", "width", "height", "scale_x", "scale_y", "angle", "origin_x", "origin_y")
+
+
+def _number(value: Any, default: float) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default
+    return number if math.isfinite(number) else default
+
+
+def _origin(value: Any) -> float:
+    if isinstance(value, str):
+        return _ORIGINS.get(value, 0.0)
+    return _number(value, 0.0)  # Fabric also accepts fractions
+
+
+def _load(design_data: Any) -> Any:
+    if isinstance(design_data, str):
+        try:
+            return json.loads(design_data)
+        except ValueError:
+            return None
+    return design_data
+
+
+def _canvas_objects(design_data: Any) -> List[Dict[str, Any]]:
+    """Top-level visible objects of a Fabric.js canvas (dict, list or JSON string)"""
+    design_data = _load(design_data)
+    if isinstance(design_data, dict):
+        design_data = design_data.get("objects") or []
+    if not isinstance(design_data, list):
+        return []
+    return [obj for obj in design_data if isinstance(obj, dict) and obj.get("visible", True) is not False]
+
+
+def parse_objects(design_data: Any) -> Tuple[np.ndarray, List[str]]:
+    """(N, len(_COLUMNS)) float array of object geometry, plus object types"""
+    objects = _canvas_objects(design_data)
+    geometry = np.array([
+        (
+            _number(obj.get("left"), 0.0),
+            _number(obj.get("top"), 0.0),
+            _number(obj.get("width"), 0.0) + _number(obj.get("strokeWidth"), 0.0),
+            _number(obj.get("height"), 0.0) + _number(obj.get("strokeWidth"), 0.0),
+            _number(obj.get("scaleX"), 1.0),
+            _number(obj.get("scaleY"), 1.0),
+            _number(obj.get("angle"), 0.0),
+            _origin(obj.get("originX", "left")),
+            _origin(obj.get("originY", "top")),
+        )
+        for obj in objects
+    ], dtype=np.float64).reshape(-1, len(_COLUMNS))
+    return geometry, [str(obj.get("type", "")) for obj in objects]
+
+
+def bounding_boxes(geometry: np.ndarray) -> np.ndarray:
+    """Axis-aligned (x0, y0, x1, y1) canvas boxes for rows of parse_objects output
+
+    Fabric positions an object by its origin point and rotates it about that
+    point (clockwise, y pointing down).
+    """
+    left, top, width, height, scale_x, scale_y, angle, origin_x, origin_y = geometry.T
+    w = width * np.abs(scale_x)
+    h = height * np.abs(scale_y)
+    # Corners relative to the origin point, shape (N, 4)
+    cx = np.stack([-origin_x * w, (1 - origin_x) * w, (1 - origin_x) * w, -origin_x * w], axis=1)
+    cy = np.stack([-origin_y * h, -origin_y * h, (1 - origin_y) * h, (1 - origin_y) * h], axis=1)
+    theta = np.radians(angle)[:, None]
+    cos, sin = np.cos(theta), np.sin(theta)
+    xs = left[:, None] + cx * cos - cy * sin
+    ys = top[:, None] + cx * sin + cy * cos
+    return np.stack([xs.min(axis=1), ys.min(axis=1), xs.max(axis=1), ys.max(axis=1)], axis=1)
+
+
+def _area_arrays(areas: Sequence[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Canvas rects (A, 4), inches per canvas px (A, 2; NaN if unknown), min DPI (A,)"""
+    rects, inches_per_px, min_dpi = [], [], []
+    for area in areas:
+        x, y = _number(area.get("x"), 0.0), _number(area.get("y"), 0.0)
+        width, height = _number(area.get("width"), 0.0), _number(area.get("height"), 0.0)
+        rects.append((x, y, x + width, y + height))
+        width_in, height_in = _number(area.get("width_in"), np.nan), _number(area.get("height_in"), np.nan)
+        inches_per_px.append((
+            width_in / width if width > 0 else np.nan,
+            height_in / height if height > 0 else np.nan,
+        ))
+        min_dpi.append(_number(area.get("min_dpi"), DEFAULT_MIN_DPI))
+    return (
+        np.array(rects, dtype=np.float64).reshape(-1, 4),
+        np.array(inches_per_px, dtype=np.float64).reshape(-1, 2),
+        np.array(min_dpi, dtype=np.float64),
+    )
+
+
+def validate_designs(items: Sequence[Tuple[Any, Optional[Sequence[Dict[str, Any]]]]], tolerance: float = BOUNDS_TOLERANCE) -> List[Dict[str, Any]]:
+    """Check a batch of (design_data, print_areas) pairs; one report per pair
+
+    A design may name its target area ({"print_area": "front", "objects": [...]});
+    otherwise each object may sit in any of the product's areas. Objects
+    outside every allowed area are errors, as are raster objects printed
+    below their area's min_dpi.
+    """
+    reports = [{"ok": True, "objects": 0, "min_effective_dpi": None, "issues": []} for _ in items]
+
+    # One "row" per item that has objects and print areas to check
+    row_item, row_areas, row_allowed = [], [], []
+    object_geometry, object_types, object_index, row_objects = [], [], [], []
+    for item, (design_data, areas) in enumerate(items):
+        design_data = _load(design_data)
+        geometry, types = parse_objects(design_data)
+        reports[item]["objects"] = len(types)
+        if not len(types):
+            continue
+        areas = [area for area in (areas or []) if isinstance(area, dict)]
+        if not areas:
+            reports[item]["issues"].append({
+                "level": "warning", "code": "no_print_areas", "object": None,
+                "message": "Product defines no print areas; bounds not checked",
+            })
+            continue
+        target = design_data.get("print_area") if isinstance(design_data, dict) else None
+        if target is not None and not any(area.get("name") == target for area in areas):
+            reports[item]["issues"].append({
+                "level": "warning", "code": "unknown_print_area", "object": None,
+                "message": f"Print area '{target}' not found; checked against all areas",
+            })
+            target = None
+        row_item.append(item)
+        row_areas.append(areas)
+        row_allowed.extend(target is None or area.get("name") == target for area in areas)
+        object_geometry.append(geometry)
+        object_types.extend(types)
+        object_index.extend(range(len(types)))
+        row_objects.append(len(types))
+
+    if not row_item:
+        return reports
+
+    # Print areas padded to (rows, most areas on one product); each object is
+    # compared only with its own item's areas: (N objects, max areas) cells
+    rows, width = len(row_areas), max(len(areas) for areas in row_areas)
+    slot_row = np.repeat(np.arange(rows), [len(areas) for areas in row_areas])
+    slot_col = np.concatenate([np.arange(len(areas)) for areas in row_areas])
+    flat_rects, flat_inches, flat_min_dpi = _area_arrays([area for areas in row_areas for area in areas])
+    rects = np.full((rows, width, 4), np.nan)
+    rects[slot_row, slot_col] = flat_rects
+    inches_per_px = np.full((rows, width, 2), np.nan)
+    inches_per_px[slot_row, slot_col] = flat_inches
+    min_dpi = np.full((rows, width), np.nan)
+    min_dpi[slot_row, slot_col] = flat_min_dpi
+    allowed = np.zeros((rows, width), dtype=bool)
+    allowed[slot_row, slot_col] = row_allowed
+
+    geometry = np.concatenate(object_geometry)
+    boxes = bounding_boxes(geometry)
+    object_row = np.repeat(np.arange(rows), row_objects)
+    b = boxes[:, None, :]
+    r = rects[object_row]
+    candidate = allowed[object_row]
+    with np.errstate(invalid="ignore"):
+        inside = (
+            (b[..., 0] >= r[..., 0] - tolerance) & (b[..., 1] >= r[..., 1] - tolerance)
+            & (b[..., 2] <= r[..., 2] + tolerance) & (b[..., 3] <= r[..., 3] + tolerance)
+            & candidate
+        )
+        overlap = (
+            np.clip(np.minimum(b[..., 2], r[..., 2]) - np.maximum(b[..., 0], r[..., 0]), 0, None)
+            * np.clip(np.minimum(b[..., 3], r[..., 3]) - np.maximum(b[..., 1], r[..., 1]), 0, None)
+        )
+    fits = inside.any(axis=1)
+    # The area an object belongs to: the first one containing it, else the one it overlaps most
+    assigned = np.where(fits, inside.argmax(axis=1), np.where(candidate, overlap, -1.0).argmax(axis=1))
+    assigned_rects = rects[object_row, assigned]
+    assigned_min_dpi = min_dpi[object_row, assigned]
+
+    # Raster resolution: source pixels over printed inches, worst of the two axes
+    raster = np.array([kind in RASTER_TYPES for kind in object_types])
+    printed_in = np.abs(geometry[:, [4, 5]]) * inches_per_px[object_row, assigned]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dpi = np.min(1.0 / printed_in, axis=1)
+    dpi = np.where(raster & np.isfinite(dpi), dpi, np.nan)
+    with np.errstate(invalid="ignore"):
+        low_dpi = dpi < assigned_min_dpi
+    row_dpi = np.full(rows, np.nan)
+    np.fmin.at(row_dpi, object_row, dpi)
+    for row in np.flatnonzero(~np.isnan(row_dpi)):
+        reports[row_item[row]]["min_effective_dpi"] = round(float(row_dpi[row]), 1)
+
+    for n in np.flatnonzero(~fits | low_dpi):
+        row = object_row[n]
+        report = reports[row_item[row]]
+        area = row_areas[row][assigned[n]].get("name")
+        if not fits[n]:
+            x0, y0, x1, y1 = assigned_rects[n]
+            overflow = max(x0 - boxes[n, 0], y0 - boxes[n, 1], boxes[n, 2] - x1, boxes[n, 3] - y1)
+            report["issues"].append({
+                "level": "error", "code": "out_of_bounds", "object": object_index[n],
+                "message": f"{object_types[n] or 'object'} extends {overflow:.1f}px outside print area '{area}'",
+                "print_area": area,
+                "bounds": np.round(boxes[n], 2).tolist(),
+            })
+        if low_dpi[n]:
+            report["issues"].append({
+                "level": "error", "code": "low_resolution", "object": object_index[n],
+                "message": f"Image prints at {dpi[n]:.0f} DPI in '{area}' (minimum {assigned_min_dpi[n]:.0f})",
+                "print_area": area,
+                "effective_dpi": round(float(dpi[n]), 1),
+            })
+
+    for report in reports:
+        report["ok"] = not any(issue["level"] == "error" for issue in report["issues"])
+    return reports
@@ -0,0 +1,344 @@
+# backend/exports.py
+# Streaming exports - orders, products and categories as CSV, NDJSON or Parquet
+#
+# Rows are read through a server-side cursor (stream_results + yield_per) and
+# encoded one partition at a time into byte chunks for a streaming response,
+# so memory stays flat however many rows are exported. Plain columns are
+# selected with Core (no ORM objects), and heavy JSON columns - design data,
+# addresses, print areas - are left out unless asked for by name. Archived
+# rows (see archive.py) are exported too, from a UNION ALL over the
+# archived_* copies of the same tables, unless include_archived is off.
+
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import Boolean, DateTime, Enum, Float, Integer, String, Text, case, cast, select, union_all
+
+from models import ARCHIVE_TABLES, Category, Order, OrderItem, Product, ProductVariant
+
+EXPORT_BATCH_SIZE = 5000  # rows per cursor fetch / output chunk
+PARQUET_ROW_GROUP_SIZE = 100_000
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class ExportError(ValueError):
+    """Bad export parameters (unknown entity, format or column)"""
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    name: str
+    expression: Any  # mapped attribute; read from its archived_* copy for archived rows
+    json: bool = False  # JSON column: raw text in CSV/Parquet, nested value in NDJSON
+    heavy: bool = False  # only exported when named in include
+
+
+def _enum_values(column) -> Any:
+    # Enum columns store member names; export the public values without a Python pass
+    return case({member.name: member.value for member in column.type.enum_class}, value=cast(column, String), else_=None)
+
+
+def _column(attribute, archived: bool):
+    """The table column behind a mapped attribute, or the same column of its archived_* table"""
+    column = attribute.property.columns[0]
+    return ARCHIVE_TABLES[column.table.name].c[column.name] if archived else column
+
+
+def _table(model, archived: bool):
+    return ARCHIVE_TABLES[model.__table__.name] if archived else model.__table__
+
+
+CATEGORY_COLUMNS = [
+    ExportColumn("id", Category.id),
+    ExportColumn("name", Category.name),
+    ExportColumn("slug", Category.slug),
+    ExportColumn("description", Category.description),
+    ExportColumn("image_url", Category.image_url),
+    ExportColumn("is_active", Category.is_active),
+    ExportColumn("created_at", Category.created_at),
+]
+
+# One row per variant; products without variants get a single row with empty variant columns
+PRODUCT_COLUMNS = [
+    ExportColumn("product_id", Product.id),
+    ExportColumn("name", Product.name),
+    ExportColumn("slug", Product.slug),
+    ExportColumn("category_id", Product.category_id),
+    ExportColumn("base_price", Product.base_price),
+    ExportColumn("min_order_quantity", Product.min_order_quantity),
+    ExportColumn("is_active", Product.is_active),
+    ExportColumn("is_featured", Product.is_featured),
+    ExportColumn("main_image_url", Product.main_image_url),
+    ExportColumn("design_template_url", Product.design_template_url),
+    ExportColumn("created_at", Product.created_at),
+    ExportColumn("updated_at", Product.updated_at),
+    ExportColumn("description", Product.description, heavy=True),
+    ExportColumn("sizes", Product.sizes, json=True, heavy=True),
+    ExportColumn("colors", Product.colors, json=True, heavy=True),
+    ExportColumn("materials", Product.materials, json=True, heavy=True),
+    ExportColumn("gallery_images", Product.gallery_images, json=True, heavy=True),
+    ExportColumn("mockup_templates", Product.mockup_templates, json=True, heavy=True),
+    ExportColumn("print_areas", Product.print_areas, json=True, heavy=True),
+    ExportColumn("customization_options", Product.customization_options, json=True, heavy=True),
+    ExportColumn("variant_id", ProductVariant.id),
+    ExportColumn("sku", ProductVariant.sku),
+    ExportColumn("color", ProductVariant.color),
+    ExportColumn("size", ProductVariant.size),
+    ExportColumn("material", ProductVariant.material),
+    ExportColumn("variant_price", ProductVariant.price),
+    ExportColumn("stock", ProductVariant.stock),
+]
+
+# One row per order item, order columns repeated
+ORDER_COLUMNS = [
+    ExportColumn("order_id", Order.id),
+    ExportColumn("order_number", Order.order_number),
+    ExportColumn("customer_email", Order.customer_email),
+    ExportColumn("customer_name", Order.customer_name),
+    ExportColumn("status", Order.status),
+    ExportColumn("subtotal", Order.subtotal),
+    ExportColumn("tax_amount", Order.tax_amount),
+    ExportColumn("shipping_cost", Order.shipping_cost),
+    ExportColumn("total_amount", Order.total_amount),
+    ExportColumn("shipping_method", Order.shipping_method),
+    ExportColumn("tracking_number", Order.tracking_number),
+    ExportColumn("design_approved", Order.design_approved),
+    ExportColumn("production_started", Order.production_started),
+    ExportColumn("estimated_delivery", Order.estimated_delivery),
+    ExportColumn("created_at", Order.created_at),
+    ExportColumn("shipping_address", Order.shipping_address, json=True, heavy=True),
+    ExportColumn("billing_address", Order.billing_address, json=True, heavy=True),
+    ExportColumn("item_id", OrderItem.id),
+    ExportColumn("product_id", OrderItem.product_id),
+    ExportColumn("variant_id", OrderItem.variant_id),
+    ExportColumn("quantity", OrderItem.quantity),
+    ExportColumn("unit_price", OrderItem.unit_price),
+    ExportColumn("total_price", OrderItem.total_price),
+    ExportColumn("design_preview_url", OrderItem.design_preview_url),
+    ExportColumn("quality_check_passed", OrderItem.quality_check_passed),
+    ExportColumn("production_notes", OrderItem.production_notes, heavy=True),
+    ExportColumn("design_data", OrderItem.design_data, json=True, heavy=True),
+    ExportColumn("print_files", OrderItem.print_files, json=True, heavy=True),
+]
+
+ENTITIES = {"orders": ORDER_COLUMNS, "products": PRODUCT_COLUMNS, "categories": CATEGORY_COLUMNS}
+
+
+def heavy_columns(entity: str) -> List[str]:
+    return [column.name for column in ENTITIES.get(entity, []) if column.heavy]
+
+
+def _select_expression(column: ExportColumn, format: str, archived: bool):
+    # Text formats take timestamps as the database renders them, skipping a
+    # parse-then-format round trip per value; NDJSON nests JSON values, while
+    # CSV and Parquet take the stored JSON text as-is
+    expression = _column(column.expression, archived)
+    if isinstance(expression.type, Enum):
+        return _enum_values(expression).label(column.name)
+    if column.json and format != "ndjson":
+        return cast(expression, Text).label(column.name)
+    if isinstance(expression.type, DateTime) and format != "parquet":
+        return cast(expression, Text).label(column.name)
+    return expression.label(column.name)
+
+
+def _entity_select(entity: str, columns: Sequence[ExportColumn], format: str, filters: Dict[str, Any], archived: bool):
+    """Unordered SELECT of one entity's hot rows, or of its archived ones"""
+    statement = select(*[_select_expression(column, format, archived) for column in columns])
+
+    def c(attribute):
+        return _column(attribute, archived)
+
+    if entity == "orders":
+        statement = statement.select_from(
+            _table(Order, archived).outerjoin(_table(OrderItem, archived), c(OrderItem.order_id) == c(Order.id))
+        )
+        if "status" in filters:
+            statement = statement.where(c(Order.status) == filters["status"])
+        if "created_from" in filters:
+            statement = statement.where(c(Order.created_at) >= filters["created_from"])
+        if "created_to" in filters:
+            statement = statement.where(c(Order.created_at) < filters["created_to"])
+    elif entity == "products":
+        statement = statement.select_from(
+            _table(Product, archived).outerjoin(_table(ProductVariant, archived), c(ProductVariant.product_id) == c(Product.id))
+        )
+        if "category_id" in filters:
+            statement = statement.where(c(Product.category_id) == filters["category_id"])
+        if "is_active" in filters:
+            statement = statement.where(c(Product.is_active) == filters["is_active"])
+    elif "is_active" in filters:
+        statement = statement.where(c(Category.is_active) == filters["is_active"])
+    return statement
+
+
+# Output columns an export is sorted by (never optional, so always selected)
+ORDER_BY = {"orders": ("order_id", "item_id"), "products": ("product_id", "variant_id"), "categories": ("id",)}
+
+
+def export_statement(
+    entity: str,
+    format: str,
+    include: Iterable[str] = (),
+    filters: Optional[Dict[str, Any]] = None,
+    include_archived: bool = True,
+):
+    """(columns, SELECT) for an export; raises ExportError on bad parameters
+
+    Archived rows are merged in (UNION ALL) unless include_archived is False.
+    """
+    if entity not in ENTITIES:
+        raise ExportError(f"Unknown export '{entity}'. Available: {', '.join(ENTITIES)}")
+    if format not in FORMATS:
+        raise ExportError(f"Unknown format '{format}'. Available: {', '.join(FORMATS)}")
+    include = set(include)
+    unknown = include - set(heavy_columns(entity))
+    if unknown:
+        raise ExportError(f"Unknown columns {sorted(unknown)}. Optional columns: {', '.join(heavy_columns(entity))}")
+
+    columns = [column for column in ENTITIES[entity] if not column.heavy or column.name in include]
+    filters = {key: value for key, value in (filters or {}).items() if value is not None}
+
+    statement = _entity_select(entity, columns, format, filters, archived=False)
+    if include_archived:
+        # Archiving keeps ids, so hot and archived rows interleave in id order
+        statement = union_all(statement, _entity_select(entity, columns, format, filters, archived=True))
+    return columns, statement.order_by(*[statement.selected_columns[name] for name in ORDER_BY[entity]])
+
+
+# =============================================================================
+# ENCODERS
+# =============================================================================
+
+def _csv_chunks(columns: Sequence[ExportColumn], partitions: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.name for column in columns])
+    for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _ndjson_chunks(columns: Sequence[ExportColumn], partitions: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+    names = [column.name for column in columns]
+    dumps = json.JSONEncoder(default=_json_default, separators=(",", ":"), ensure_ascii=False).encode
+    for rows in partitions:
+        yield ("\n".join([dumps(dict(zip(names, row))) for row in rows]) + "\n").encode()
+
+
+class _ChunkSink:
+    """Write-only file for ParquetWriter that hands written bytes back out
+
+    tell() keeps counting after a drain, so the offsets recorded in the
+    Parquet footer stay correct.
+    """
+
+    def __init__(self):
+        self.closed = False
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_type(pa, column: ExportColumn):
+    sql_type = column.expression.type
+    if column.json:
+        return pa.string()
+    if isinstance(sql_type, Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, Integer):
+        return pa.int64()
+    if isinstance(sql_type, Float):
+        return pa.float64()
+    if isinstance(sql_type, DateTime):
+        return pa.timestamp("us", tz="UTC" if sql_type.timezone else None)
+    return pa.string()
+
+
+def _parquet_chunks(columns: Sequence[ExportColumn], partitions: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column.name, _arrow_type(pa, column)) for column in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    # Each partition becomes columnar right away; batches are grouped into
+    # row groups of PARQUET_ROW_GROUP_SIZE so the file stays scan-friendly
+    batches, pending = [], 0
+    for rows in partitions:
+        arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+        batches.append(pa.RecordBatch.from_arrays(arrays, schema=schema))
+        pending += len(rows)
+        if pending >= PARQUET_ROW_GROUP_SIZE:
+            writer.write_table(pa.Table.from_batches(batches, schema=schema), row_group_size=pending)
+            batches, pending = [], 0
+            yield sink.drain()
+    if batches:
+        writer.write_table(pa.Table.from_batches(batches, schema=schema), row_group_size=pending)
+    writer.close()
+    yield sink.drain()
+
+
+ENCODERS = {"csv": _csv_chunks, "ndjson": _ndjson_chunks, "parquet": _parquet_chunks}
+
+
+def require_format(format: str) -> None:
+    """Fail before streaming starts if the format's optional dependency is missing"""
+    if format == "parquet":
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise ExportError("Parquet export requires pyarrow (pip install pyarrow)")
+
+
+def stream_export(engine, columns: Sequence[ExportColumn], statement, format: str, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Encoded chunks of an export, read with a server-side cursor
+
+    Synchronous; wrap it in iterate_in_threadpool for an async response. The
+    connection is held until the generator finishes or is closed.
+    """
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(statement)
+        yield from ENCODERS[format](columns, result.partitions())
+
+
+def export_filename(entity: str, format: str) -> str:
+    return f"printcraft-{entity}-{datetime.now():%Y%m%d-%H%M%S}.{format}"
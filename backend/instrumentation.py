@@ -0,0 +1,260 @@
+# backend/instrumentation.py
+# Per-request SQL instrumentation - query counts, DB time, N+1 detection
+
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger("printcraft.queries")
+
+# =============================================================================
+# SETTINGS
+# =============================================================================
+# The sampling rate and N+1 threshold come from Settings
+# (query_stats_sample_rate, n_plus_one_threshold), passed in by create_app
+
+# Same statement shape repeated more than this many times in one request is flagged as N+1
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+
+SLOWEST_STATEMENT_CHARS = 300  # of the slowest statement's shape kept per route
+
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+DB_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+_IN_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)|\((?:\s*%\(\w+\)s\s*,)+\s*%\(\w+\)s\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize SQL so the same query with different IN-list sizes groups together"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    return _IN_LIST.sub("(?)", shape)
+
+
+class RequestQueryStats:
+    """SQL activity recorded for a single sampled request"""
+
+    __slots__ = ("query_count", "db_time", "rows", "slowest_statement", "slowest_time", "shapes")
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.slowest_statement: Optional[str] = None
+        self.slowest_time = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float, rowcount: int) -> None:
+        self.query_count += 1
+        self.db_time += elapsed
+        if rowcount > 0:
+            self.rows += rowcount
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+        self.shapes[statement_shape(statement)] += 1
+
+    def n_plus_one_suspects(self, threshold: int = DEFAULT_N_PLUS_ONE_THRESHOLD) -> Dict[str, int]:
+        return {shape: count for shape, count in self.shapes.items() if count > threshold}
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("printcraft_query_stats", default=None)
+
+# =============================================================================
+# METRICS REGISTRY (Prometheus text exposition)
+# =============================================================================
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.total += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class QueryMetrics:
+    """Per-route aggregates, exported in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Counter = Counter()
+        self.queries: Counter = Counter()
+        self.db_seconds: Dict[str, float] = {}
+        self.rows: Counter = Counter()
+        self.n_plus_one: Counter = Counter()
+        self.slowest: Dict[str, float] = {}
+        self.slowest_statement: Dict[str, str] = {}  # shape of the statement behind `slowest`
+        self.query_count_hist: Dict[str, _Histogram] = {}
+        self.db_time_hist: Dict[str, _Histogram] = {}
+
+    def observe(self, route: str, stats: RequestQueryStats, suspects: Dict[str, int]) -> None:
+        with self._lock:
+            self.requests[route] += 1
+            self.queries[route] += stats.query_count
+            self.db_seconds[route] = self.db_seconds.get(route, 0.0) + stats.db_time
+            self.rows[route] += stats.rows
+            self.n_plus_one[route] += 1 if suspects else 0
+            if stats.slowest_statement and stats.slowest_time >= self.slowest.get(route, 0.0):
+                self.slowest_statement[route] = statement_shape(stats.slowest_statement)[:SLOWEST_STATEMENT_CHARS]
+            self.slowest[route] = max(self.slowest.get(route, 0.0), stats.slowest_time)
+            self.query_count_hist.setdefault(route, _Histogram(QUERY_COUNT_BUCKETS)).observe(stats.query_count)
+            self.db_time_hist.setdefault(route, _Histogram(DB_TIME_BUCKETS)).observe(stats.db_time)
+
+    def render(self) -> str:
+        lines = []
+
+        def family(name: str, kind: str, help_text: str, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for route, value in samples:
+                lines.append(f'{name}{{route="{_escape(route)}"}} {value}')
+
+        def statements(name: str, help_text: str, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for route, statement in samples:
+                lines.append(f'{name}{{route="{_escape(route)}",statement="{_escape(statement)}"}} 1')
+
+        def histogram(name: str, help_text: str, hists: Dict[str, _Histogram]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for route, hist in hists.items():
+                label = _escape(route)
+                for bound, count in zip(hist.buckets, hist.counts):
+                    lines.append(f'{name}_bucket{{route="{label}",le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{route="{label}",le="+Inf"}} {hist.count}')
+                lines.append(f'{name}_sum{{route="{label}"}} {hist.total}')
+                lines.append(f'{name}_count{{route="{label}"}} {hist.count}')
+
+        with self._lock:
+            family("printcraft_sampled_requests_total", "counter",
+                   "Requests with SQL instrumentation enabled", self.requests.items())
+            family("printcraft_db_queries_total", "counter",
+                   "SQL statements executed by sampled requests", self.queries.items())
+            family("printcraft_db_seconds_total", "counter",
+                   "Time spent in SQL statements by sampled requests", self.db_seconds.items())
+            family("printcraft_db_rows_total", "counter",
+                   "Rows returned or affected by sampled requests", self.rows.items())
+            family("printcraft_n_plus_one_suspects_total", "counter",
+                   "Sampled requests that repeated a statement shape above the threshold", self.n_plus_one.items())
+            family("printcraft_db_slowest_query_seconds", "gauge",
+                   "Slowest single SQL statement seen per route", self.slowest.items())
+            statements("printcraft_db_slowest_query_info",
+                       "Shape of the slowest SQL statement seen per route", self.slowest_statement.items())
+            histogram("printcraft_db_queries_per_request", "SQL statements per sampled request", self.query_count_hist)
+            histogram("printcraft_db_seconds_per_request", "SQL time per sampled request", self.db_time_hist)
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# =============================================================================
+# SQLALCHEMY HOOKS
+# =============================================================================
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("printcraft_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("printcraft_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats.record(statement, elapsed, cursor.rowcount)
+
+
+def _on_load(target, context):
+    # SELECT rowcount is -1 on most drivers, so count materialized ORM rows instead
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.rows += 1
+
+
+def install_query_hooks(engine, base) -> None:
+    """Attach the cursor and ORM load listeners (only done when sampling is on)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    if not event.contains(base, "load", _on_load):
+        event.listen(base, "load", _on_load, propagate=True)
+
+# =============================================================================
+# ASGI MIDDLEWARE
+# =============================================================================
+
+class QueryStatsMiddleware:
+    """Samples requests, records their SQL activity and adds a Server-Timing header
+
+    Implemented as plain ASGI (not BaseHTTPMiddleware) so unsampled requests
+    pass straight through and streaming responses are left untouched. The
+    header carries timings only; statement text goes to `metrics`.
+    """
+
+    def __init__(
+        self, app, metrics: QueryMetrics, sample_rate: float = 0.0, threshold: int = DEFAULT_N_PLUS_ONE_THRESHOLD
+    ):
+        self.app = app
+        self.metrics = metrics
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.sample_rate <= 0 or (
+            self.sample_rate < 1 and random.random() >= self.sample_rate
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.db_time * 1000:.2f};desc="{stats.query_count} queries", '
+                    f'db-slowest;dur={stats.slowest_time * 1000:.2f};desc="slowest statement", '
+                    f"app;dur={total_ms:.2f}"
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            route = scope.get("route")
+            route_name = f"{scope['method']} {route.path}" if route is not None and hasattr(route, "path") else "unmatched"
+            suspects = stats.n_plus_one_suspects(self.threshold)
+            if suspects:
+                for shape, count in suspects.items():
+                    logger.warning("N+1 suspect on %s: %d x %s", route_name, count, shape[:300])
+            if stats.slowest_statement:
+                logger.debug("Slowest statement on %s (%.2fms): %s",
+                             route_name, stats.slowest_time * 1000, stats.slowest_statement[:300])
+            self.metrics.observe(route_name, stats, suspects)
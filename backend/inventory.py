@@ -0,0 +1,202 @@
+# backend/inventory.py
+# Stock reservations - TTL holds on ProductVariant.stock
+#
+# A hold takes stock immediately with a conditional UPDATE
+# (stock = stock - q WHERE stock >= q), so concurrent checkouts on the same
+# SKU can never drive stock negative. Creating the order commits the holds
+# and the decrement becomes permanent. A release or an expired hold puts the
+# quantity back. ProductVariant.stock therefore means "available to sell".
+
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import update
+
+from models import ProductVariant, ReservationStatus, StockReservation
+
+logger = logging.getLogger("printcraft.inventory")
+
+DEFAULT_HOLD_TTL = 600  # seconds
+SWEEP_BATCH_SIZE = 500
+
+
+class InsufficientStock(Exception):
+    def __init__(self, variant_id: int, requested: int):
+        self.variant_id = variant_id
+        self.requested = requested
+        super().__init__(f"Insufficient stock for variant {variant_id} (requested {requested})")
+
+
+class VariantNotFound(Exception):
+    def __init__(self, variant_id: int):
+        self.variant_id = variant_id
+        super().__init__(f"Variant {variant_id} not found")
+
+
+class HoldNotFound(Exception):
+    """The reservation token is unknown, expired, released or doesn't cover the order"""
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _aggregate(items: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sum quantities per variant, sorted by id so lock order is consistent"""
+    totals: Dict[int, int] = defaultdict(int)
+    for variant_id, quantity in items:
+        if quantity <= 0:
+            raise ValueError("Quantity must be positive")
+        totals[variant_id] += quantity
+    return sorted(totals.items())
+
+
+def place_holds(db, items: Iterable[Tuple[int, int]], ttl_seconds: int = DEFAULT_HOLD_TTL) -> Tuple[str, datetime, Set[int]]:
+    """Take stock for every (variant_id, quantity) or none of it
+
+    Flushes but does not commit, so the caller can make the holds part of a
+    larger transaction (as create_order does); on InsufficientStock the
+    caller must roll back (VariantNotFound too, for an id that doesn't exist).
+    Returns (token, expires_at, affected product ids).
+    """
+    token = uuid.uuid4().hex
+    expires_at = _utcnow() + timedelta(seconds=ttl_seconds)
+    product_ids = set()
+    for variant_id, quantity in _aggregate(items):
+        row = db.execute(
+            update(ProductVariant)
+            .where(ProductVariant.id == variant_id, ProductVariant.stock >= quantity)
+            .values(stock=ProductVariant.stock - quantity)
+            .returning(ProductVariant.product_id)
+        ).first()
+        if row is None:
+            if db.query(ProductVariant.id).filter(ProductVariant.id == variant_id).first() is None:
+                raise VariantNotFound(variant_id)
+            raise InsufficientStock(variant_id, quantity)
+        product_ids.add(row[0])
+        db.add(StockReservation(
+            token=token,
+            variant_id=variant_id,
+            product_id=row[0],
+            quantity=quantity,
+            status=ReservationStatus.HELD,
+            expires_at=expires_at,
+        ))
+    db.flush()
+    return token, expires_at, product_ids
+
+
+def commit_holds(db, token: str, order_id: int, items: Iterable[Tuple[int, int]]) -> None:
+    """Attach live holds to an order; they must cover every requested variant
+
+    Holds are flipped with a conditional UPDATE so a sweeper expiring the same
+    rows concurrently can't return their stock after we've claimed them.
+    """
+    needed = dict(_aggregate(items))
+    holds = db.query(StockReservation).filter(
+        StockReservation.token == token,
+        StockReservation.status == ReservationStatus.HELD,
+    ).all()
+    held: Dict[int, int] = defaultdict(int)
+    for hold in holds:
+        held[hold.variant_id] += hold.quantity
+    if not holds or any(held.get(variant_id, 0) < quantity for variant_id, quantity in needed.items()):
+        raise HoldNotFound("Reservation expired or does not cover the order items")
+
+    claimed = db.execute(
+        update(StockReservation)
+        .where(
+            StockReservation.token == token,
+            StockReservation.status == ReservationStatus.HELD,
+            StockReservation.expires_at > _utcnow(),
+        )
+        .values(status=ReservationStatus.COMMITTED, order_id=order_id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if claimed != len(holds):
+        raise HoldNotFound("Reservation expired before the order was placed")
+
+    # Return any over-reservation (held more than ordered) to stock
+    for variant_id, quantity in held.items():
+        surplus = quantity - needed.get(variant_id, 0)
+        if surplus > 0:
+            db.execute(
+                update(ProductVariant)
+                .where(ProductVariant.id == variant_id)
+                .values(stock=ProductVariant.stock + surplus)
+            )
+
+
+def _return_holds(db, holds: List[StockReservation], status: ReservationStatus) -> Set[int]:
+    """Flip HELD rows to status and give their stock back (each row at most once)"""
+    product_ids = set()
+    for hold in holds:
+        flipped = db.execute(
+            update(StockReservation)
+            .where(StockReservation.id == hold.id, StockReservation.status == ReservationStatus.HELD)
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if flipped:
+            db.execute(
+                update(ProductVariant)
+                .where(ProductVariant.id == hold.variant_id)
+                .values(stock=ProductVariant.stock + hold.quantity)
+            )
+            product_ids.add(hold.product_id)
+    return product_ids
+
+
+def release_holds(db, token: str) -> Set[int]:
+    """Cancel a checkout's holds; commits. Returns affected product ids"""
+    holds = db.query(StockReservation).filter(
+        StockReservation.token == token,
+        StockReservation.status == ReservationStatus.HELD,
+    ).all()
+    product_ids = _return_holds(db, holds, ReservationStatus.RELEASED)
+    db.commit()
+    return product_ids
+
+
+def expire_holds(db, batch_size: int = SWEEP_BATCH_SIZE) -> Set[int]:
+    """Return stock for holds past their TTL, one batch per transaction"""
+    product_ids = set()
+    while True:
+        holds = db.query(StockReservation).filter(
+            StockReservation.status == ReservationStatus.HELD,
+            StockReservation.expires_at <= _utcnow(),
+        ).order_by(StockReservation.id).limit(batch_size).all()
+        if not holds:
+            return product_ids
+        product_ids |= _return_holds(db, holds, ReservationStatus.EXPIRED)
+        db.commit()
+        if len(holds) < batch_size:
+            return product_ids
+
+
+async def run_sweeper(database, interval: float, on_expired=None) -> None:
+    """Background task: expire stale holds every `interval` seconds
+
+    Safe to run in every worker - each hold is flipped by exactly one of them.
+    """
+    from fastapi.concurrency import run_in_threadpool
+
+    def sweep():
+        db = database.session()
+        try:
+            return expire_holds(db)
+        finally:
+            db.close()
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            product_ids = await run_in_threadpool(sweep)
+            if product_ids and on_expired is not None:
+                on_expired(product_ids)
+        except Exception:
+            logger.exception("Reservation sweep failed")
@@ -0,0 +1,348 @@
+# backend/jobs.py
+# Durable background jobs - a queue table in the main database plus workers
+#
+# Handlers enqueue() a job inside their own transaction (so it exists if and
+# only if the request's writes commit) and return; `python worker.py` runs a
+# pool of worker processes that claim and run jobs.
+#
+# Claiming: PostgreSQL selects candidates with FOR UPDATE SKIP LOCKED so
+# workers never wait on each other's rows; every claim is then a conditional
+# UPDATE (... WHERE status = 'queued'), which is also what keeps SQLite
+# correct. A claimed job carries a lease; if its worker dies, the job is
+# requeued when the lease runs out. Delivery is therefore at-least-once -
+# tasks must be safe to run twice.
+#
+# Failures are retried with exponential backoff until max_attempts, then the
+# job is dead-lettered (status DEAD) with its last error for inspection and
+# `python worker.py requeue-dead`.
+#
+# Periodic tasks (@task(..., every=seconds)) are kept scheduled by the workers'
+# maintenance pass: whenever one has no queued or running job, the next run is
+# enqueued `every` seconds after the last successful one.
+
+import logging
+import os
+import random
+import socket
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, func, or_, update
+
+from models import Job, JobStatus
+
+logger = logging.getLogger("printcraft.jobs")
+
+PRIORITY_HIGH = 10
+PRIORITY_NORMAL = 50
+PRIORITY_LOW = 90
+
+RETRY_BASE_SECONDS = 5.0
+RETRY_MAX_SECONDS = 3600.0
+MAX_ERROR_LENGTH = 4000
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# =============================================================================
+# TASK REGISTRY
+# =============================================================================
+
+@dataclass(frozen=True)
+class TaskSpec:
+    name: str
+    func: Callable[..., Any]
+    queue: str
+    priority: int
+    max_attempts: int
+    lease_seconds: int  # longer than the task can run; an expired lease means a dead worker
+    every: Optional[float] = None  # seconds between runs of a periodic task
+
+
+TASKS: Dict[str, TaskSpec] = {}
+
+
+def task(
+    name: str,
+    queue: str = "default",
+    priority: int = PRIORITY_NORMAL,
+    max_attempts: int = 5,
+    lease_seconds: int = 300,
+    every: Optional[float] = None,
+):
+    """Register func(ctx, **payload) as a job task (see tasks.py)"""
+    def register(func):
+        TASKS[name] = TaskSpec(name, func, queue, priority, max_attempts, lease_seconds, every)
+        return func
+    return register
+
+
+@dataclass
+class JobContext:
+    """What a task gets besides its payload"""
+    job_id: int
+    attempt: int
+    database: Any
+    settings: Any
+
+
+# =============================================================================
+# PRODUCING
+# =============================================================================
+
+def enqueue(
+    db,
+    task_name: str,
+    payload: Optional[Dict[str, Any]] = None,
+    *,
+    priority: Optional[int] = None,
+    delay: float = 0,
+    run_at: Optional[datetime] = None,
+    queue: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+) -> Job:
+    """Add a job to the caller's session; it is committed with the caller's transaction
+
+    Scheduled jobs pass delay (seconds) or run_at (naive UTC).
+    """
+    spec = TASKS.get(task_name)
+    if spec is None:
+        raise ValueError(f"Unknown task '{task_name}'")
+    job = Job(
+        queue=queue or spec.queue,
+        task=task_name,
+        payload=payload or {},
+        priority=spec.priority if priority is None else priority,
+        status=JobStatus.QUEUED,
+        attempts=0,
+        max_attempts=max_attempts or spec.max_attempts,
+        run_at=run_at or _utcnow() + timedelta(seconds=delay),
+    )
+    db.add(job)
+    return job
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter: ~5s, 10s, 20s, ... capped at an hour"""
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(0.75, 1.25)
+
+
+def requeue_dead(db, task_name: Optional[str] = None) -> int:
+    """Give dead-lettered jobs a fresh set of attempts; commits"""
+    query = update(Job).where(Job.status == JobStatus.DEAD)
+    if task_name:
+        query = query.where(Job.task == task_name)
+    count = db.execute(
+        query.values(status=JobStatus.QUEUED, attempts=0, run_at=_utcnow(), finished_at=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return count
+
+
+def schedule_periodic(db) -> int:
+    """Enqueue the next run of every periodic task that has none pending; commits
+
+    Two workers may both schedule a run; the extra one is harmless and the
+    schedule converges again after it.
+    """
+    scheduled = 0
+    for spec in TASKS.values():
+        if spec.every is None:
+            continue
+        pending = db.query(Job.id).filter(
+            Job.task == spec.name, Job.status.in_((JobStatus.QUEUED, JobStatus.RUNNING))
+        ).first()
+        if pending:
+            continue
+        last = db.query(func.max(Job.finished_at)).filter(
+            Job.task == spec.name, Job.status == JobStatus.SUCCEEDED
+        ).scalar()
+        enqueue(db, spec.name, run_at=max(_utcnow(), last + timedelta(seconds=spec.every)) if last else None)
+        scheduled += 1
+    db.commit()
+    return scheduled
+
+
+def queue_stats(db) -> List[tuple]:
+    """(queue, task, status, count) for every combination present"""
+    return db.query(Job.queue, Job.task, Job.status, func.count(Job.id)).group_by(
+        Job.queue, Job.task, Job.status
+    ).order_by(Job.queue, Job.task).all()
+
+
+# =============================================================================
+# CONSUMING
+# =============================================================================
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(db, worker: str, queues: Iterable[str], limit: int = 1) -> List[Job]:
+    """Lease up to `limit` due jobs, highest priority first; commits"""
+    now = _utcnow()
+    candidates = db.query(Job.id, Job.task).filter(
+        Job.status == JobStatus.QUEUED,
+        Job.queue.in_(list(queues)),
+        Job.run_at <= now,
+    ).order_by(Job.priority, Job.run_at, Job.id).limit(limit)
+    if db.get_bind().dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+
+    claimed = []
+    for job_id, task_name in candidates.all():
+        spec = TASKS.get(task_name)
+        lease = spec.lease_seconds if spec else 60
+        won = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+            .values(
+                status=JobStatus.RUNNING,
+                attempts=Job.attempts + 1,
+                locked_by=worker,
+                locked_until=now + timedelta(seconds=lease),
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if won:
+            claimed.append(job_id)
+    db.commit()
+    if not claimed:
+        return []
+    return db.query(Job).filter(Job.id.in_(claimed)).order_by(Job.priority, Job.run_at, Job.id).all()
+
+
+def _finish(db, job: Job, worker: str, **values) -> bool:
+    """Record a job's outcome if we still hold its lease; commits"""
+    done = db.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status == JobStatus.RUNNING, Job.locked_by == worker)
+        .values(locked_by=None, locked_until=None, **values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    if not done:
+        logger.warning("Lost the lease on job %s (%s) before it finished", job.id, job.task)
+    return bool(done)
+
+
+def run_job(db, job: Job, worker: str, database, settings) -> JobStatus:
+    """Run one claimed job and record success, retry or dead letter"""
+    spec = TASKS.get(job.task)
+    if spec is None:
+        _finish(db, job, worker, status=JobStatus.DEAD, last_error=f"Unknown task '{job.task}'", finished_at=_utcnow())
+        return JobStatus.DEAD
+
+    job_id, attempts, max_attempts, payload = job.id, job.attempts, job.max_attempts, job.payload or {}
+    db.expunge(job)  # the task gets its own sessions; don't hold this one's connection
+    started = time.perf_counter()
+    try:
+        spec.func(JobContext(job_id, attempts, database, settings), **payload)
+    except Exception:
+        error = traceback.format_exc()[-MAX_ERROR_LENGTH:]
+        if attempts >= max_attempts:
+            logger.error("Job %s (%s) failed for good after %d attempts", job_id, job.task, attempts)
+            _finish(db, job, worker, status=JobStatus.DEAD, last_error=error, finished_at=_utcnow())
+            return JobStatus.DEAD
+        delay = retry_delay(attempts)
+        logger.warning("Job %s (%s) failed (attempt %d/%d), retrying in %.0fs", job_id, job.task, attempts, max_attempts, delay)
+        _finish(db, job, worker, status=JobStatus.QUEUED, last_error=error, run_at=_utcnow() + timedelta(seconds=delay))
+        return JobStatus.QUEUED
+    logger.info("Job %s (%s) done in %.3fs", job_id, job.task, time.perf_counter() - started)
+    _finish(db, job, worker, status=JobStatus.SUCCEEDED, finished_at=_utcnow())
+    return JobStatus.SUCCEEDED
+
+
+def recover_expired_leases(db) -> int:
+    """Requeue (or dead-letter) jobs whose worker stopped renewing them; commits"""
+    now = _utcnow()
+    expired = or_(Job.locked_until.is_(None), Job.locked_until < now)
+    dead = db.execute(
+        update(Job)
+        .where(Job.status == JobStatus.RUNNING, expired, Job.attempts >= Job.max_attempts)
+        .values(status=JobStatus.DEAD, locked_by=None, locked_until=None, finished_at=now,
+                last_error="Worker lease expired on the final attempt")
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    requeued = db.execute(
+        update(Job)
+        .where(Job.status == JobStatus.RUNNING, expired)
+        .values(status=JobStatus.QUEUED, locked_by=None, locked_until=None, run_at=now,
+                last_error="Worker lease expired")
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    if dead or requeued:
+        logger.warning("Recovered %d jobs from expired leases (%d dead-lettered)", dead + requeued, dead)
+    return dead + requeued
+
+
+def prune_succeeded(db, older_than_days: float) -> int:
+    """Delete finished jobs past retention; commits"""
+    cutoff = _utcnow() - timedelta(days=older_than_days)
+    count = db.execute(
+        delete(Job).where(Job.status == JobStatus.SUCCEEDED, Job.finished_at < cutoff)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return count
+
+
+class Worker:
+    """One worker process: claim, run, repeat; sleeps poll_interval when idle"""
+
+    MAINTENANCE_INTERVAL = 30.0  # seconds between lease recovery / pruning / scheduling passes
+
+    def __init__(self, database, settings, queues: Iterable[str] = ("default",), poll_interval: float = 1.0):
+        self.database = database
+        self.settings = settings
+        self.queues = tuple(queues)
+        self.poll_interval = poll_interval
+        self.id = worker_id()
+        self.stopping = False
+        self._maintained = float("-inf")
+
+    def stop(self, *_) -> None:
+        """Finish the current job, then return from run()"""
+        self.stopping = True
+
+    def maintain(self) -> None:
+        db = self.database.session()
+        try:
+            recover_expired_leases(db)
+            prune_succeeded(db, self.settings.job_retention_days)
+            schedule_periodic(db)
+        finally:
+            db.close()
+
+    def run_once(self) -> int:
+        """Claim and run at most one job; returns how many ran"""
+        if time.monotonic() - self._maintained > self.MAINTENANCE_INTERVAL:
+            self._maintained = time.monotonic()
+            self.maintain()
+        db = self.database.session()
+        try:
+            jobs = claim(db, self.id, self.queues)
+            for job in jobs:
+                run_job(db, job, self.id, self.database, self.settings)
+            return len(jobs)
+        finally:
+            db.close()
+
+    def run(self) -> None:
+        logger.info("Worker %s polling %s", self.id, ", ".join(self.queues))
+        while not self.stopping:
+            try:
+                ran = self.run_once()
+            except Exception:
+                logger.exception("Worker %s poll failed", self.id)
+                ran = 0
+            if not ran:
+                time.sleep(self.poll_interval)
@@ -0,0 +1,91 @@
+# backend/manage.py
+# Deploy-time management commands - run once, outside the web workers
+#
+#   python manage.py init-db            create missing tables
+#   python manage.py check-db           verify the database is reachable
+#   python manage.py sync-replica       refresh a local SQLite replica copy
+#   python manage.py archive            move cold rows to the archive tables now
+#   python manage.py archive-stats      hot vs archived row counts
+
+import argparse
+import sqlite3
+import sys
+
+from sqlalchemy.engine import make_url
+
+from database import Database
+from settings import Settings
+
+
+def init_db(settings: Settings) -> None:
+    database = Database(settings.database_url)
+    database.create_schema()
+    database.dispose()
+    print(f"Schema ready on {database.engine.url.render_as_string(hide_password=True)}")
+
+
+def check_db(settings: Settings) -> None:
+    database = Database(settings.database_url)
+    database.ping()
+    database.dispose()
+    print("Database reachable")
+
+
+def sync_replica(settings: Settings) -> None:
+    """Copy the SQLite primary onto REPLICA_DATABASE_URL (local stand-in for streaming replication)"""
+    if not settings.replica_database_url:
+        sys.exit("REPLICA_DATABASE_URL is not set")
+    primary, replica = make_url(settings.database_url), make_url(settings.replica_database_url)
+    if primary.get_backend_name() != "sqlite" or replica.get_backend_name() != "sqlite":
+        sys.exit("sync-replica only copies SQLite files; use your database's replication otherwise")
+    # The backup API takes a consistent snapshot even while workers are writing
+    with sqlite3.connect(primary.database) as source, sqlite3.connect(replica.database) as target:
+        source.backup(target)
+    print(f"Replica {replica.database} now matches {primary.database}")
+
+
+def archive(settings: Settings) -> None:
+    """Run an archiving pass now (workers also run one hourly, see tasks.archive_cold_rows)"""
+    from archive import run_archival
+    database = Database(settings.database_url)
+    counts = run_archival(database, settings.archive_after_days, settings.archive_batch_size)
+    database.dispose()
+    print("Archived " + ", ".join(f"{count} {kind}" for kind, count in counts.items()))
+
+
+def archive_stats(settings: Settings) -> None:
+    from archive import archive_counts
+    database = Database(settings.database_url)
+    db = database.session()
+    try:
+        for table, (hot, archived) in archive_counts(db).items():
+            print(f"{table:<20} {hot:>10} hot {archived:>10} archived")
+    finally:
+        db.close()
+        database.dispose()
+
+
+COMMANDS = {
+    "init-db": init_db,
+    "check-db": check_db,
+    "sync-replica": sync_replica,
+    "archive": archive,
+    "archive-stats": archive_stats,
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python manage.py", description="PrintCraft management commands")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--database-url", help="override DATABASE_URL")
+    args = parser.parse_args(argv)
+
+    settings = Settings.from_env()
+    if args.database_url:
+        settings.database_url = args.database_url
+    COMMANDS[args.command](settings)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,99 +1,95 @@
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, JSON, Enum
-from sqlalchemy.ext.declarative import declarative_base
+# backend/models.py
+# PrintCraft ORM models
+
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, JSON, Enum, Index, Table
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 
-Base = declarative_base()
+from database import Base
 
-class OrderStatus(enum.Enum):
-    PENDING = "pending"
-    PROCESSING = "processing"
-    PRINTING = "printing"
-    SHIPPING = "shipping"
-    DELIVERED = "delivered"
-    CANCELLED = "cancelled"
+# =============================================================================
+# DATABASE MODELS
+# =============================================================================
+
+class Category(Base):
+    __tablename__ = "categories"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, index=True, nullable=False)
+    slug = Column(String(100), unique=True, index=True, nullable=False)
+    description = Column(Text)
+    image_url = Column(String(500))
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    products = relationship("Product", back_populates="category")
 
 class Product(Base):
     __tablename__ = "products"
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(200), nullable=False)
-    slug = Column(String(200), unique=True, index=True)
+    name = Column(String(200), nullable=False, index=True)
+    slug = Column(String(200), unique=True, index=True, nullable=False)
     description = Column(Text)
+    
+    # Pricing
     base_price = Column(Float, nullable=False)
     min_order_quantity = Column(Integer, default=1)
-    max_order_quantity = Column(Integer, default=1000)
     
-    # Enhanced product data
-    category_id = Column(Integer, ForeignKey("categories.id"))
-    brand = Column(String(100))
-    weight = Column(Float)  # in grams
-    dimensions = Column(JSON)  # {"length": 10, "width": 8, "height": 0.5}
-    material_info = Column(JSON)  # detailed material specifications
-    care_instructions = Column(Text)
+    # Product details
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    sizes = Column(JSON)  # Store as JSON: ["S", "M", "L"]
+    colors = Column(JSON)  # Store as JSON: ["Red", "Blue", "Green"]
+    materials = Column(JSON)  # Store as JSON: ["Cotton", "Polyester"]
     
-    # Print specifications
-    print_areas = Column(JSON)  # Multiple print areas with coordinates
-    print_methods = Column(JSON)  # ["screen_print", "digital", "embroidery"]
-    color_limitations = Column(JSON)  # max colors per print method
+    # Images and templates
+    main_image_url = Column(String(500))
+    gallery_images = Column(JSON)  # Store multiple image URLs
+    design_template_url = Column(String(500))  # SVG template for design area
+    mockup_templates = Column(JSON)  # Store mockup URLs: {"front": "url", "back": "url"}
     
-    # Design templates and mockups
-    design_template_url = Column(String(500))
-    mockup_templates = Column(JSON)  # front, back, side views
-    size_chart_url = Column(String(500))
+    # Design specifications
+    print_areas = Column(JSON)  # Define printable areas with coordinates
+    customization_options = Column(JSON)  # Available customization options
     
-    # SEO and marketing
-    meta_title = Column(String(200))
-    meta_description = Column(Text)
-    tags = Column(JSON)  # ["trendy", "unisex", "eco-friendly"]
-    
-    # Inventory and logistics
-    production_time = Column(Integer, default=3)  # days
-    shipping_time = Column(Integer, default=7)  # days
-    
-    # Status flags
+    # Status
     is_active = Column(Boolean, default=True)
     is_featured = Column(Boolean, default=False)
-    is_customizable = Column(Boolean, default=True)
     
     # Timestamps
-    created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
     category = relationship("Category", back_populates="products")
-    variants = relationship("ProductVariant", back_populates="product")
-    order_items = relationship("OrderItem", back_populates="product")
-    reviews = relationship("ProductReview", back_populates="product")
+    variants = relationship("ProductVariant", back_populates="product", cascade="all, delete-orphan")
 
 class ProductVariant(Base):
     __tablename__ = "product_variants"
-    
+
     id = Column(Integer, primary_key=True, index=True)
-    product_id = Column(Integer, ForeignKey("products.id"))
-    
-    # Variant attributes
-    color = Column(String(50))
-    size = Column(String(20))
-    material = Column(String(100))
-    
-    # Pricing and inventory
-    price_modifier = Column(Float, default=0.0)  # additional cost
-    stock_quantity = Column(Integer, default=0)
-    sku = Column(String(100), unique=True, index=True)
-    
-    # Variant specific data
-    image_url = Column(String(500))
-    weight_modifier = Column(Float, default=0.0)
-    
-    # Timestamps
-    created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
-    
-    # Relationships
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    color = Column(String(50), nullable=True)
+    size = Column(String(50), nullable=True)
+    material = Column(String(50), nullable=True)
+    price = Column(Float, nullable=False)
+    stock = Column(Integer, default=0)
+    sku = Column(String(100), nullable=True, index=True)  # batch lookups by SKU
+    image_url = Column(String(500), nullable=True)
+
+    # Relationship
     product = relationship("Product", back_populates="variants")
 
+class OrderStatus(enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    PRINTING = "printing"
+    SHIPPING = "shipping"
+    DELIVERED = "delivered"
+    CANCELLED = "cancelled"
+
 class Order(Base):
     __tablename__ = "orders"
     
@@ -121,19 +117,19 @@ class Order(Base):
     estimated_delivery = Column(DateTime)
     
     # Timestamps
-    created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    order_items = relationship("OrderItem", back_populates="order")
+    order_items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
 
 class OrderItem(Base):
     __tablename__ = "order_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
-    product_id = Column(Integer, ForeignKey("products.id"))
-    variant_id = Column(Integer, ForeignKey("product_variants.id"))
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    variant_id = Column(Integer, ForeignKey("product_variants.id"), nullable=True)
     
     quantity = Column(Integer, nullable=False)
     unit_price = Column(Float, nullable=False)
@@ -150,145 +146,76 @@ class OrderItem(Base):
     
     # Relationships
     order = relationship("Order", back_populates="order_items")
-    product = relationship("Product", back_populates="order_items")
+    product = relationship("Product")
     variant = relationship("ProductVariant")
 
-class ProductReview(Base):
-    __tablename__ = "product_reviews"
+class ReservationStatus(enum.Enum):
+    HELD = "held"
+    COMMITTED = "committed"
+    RELEASED = "released"
+    EXPIRED = "expired"
+
+class StockReservation(Base):
+    __tablename__ = "stock_reservations"
     
     id = Column(Integer, primary_key=True, index=True)
-    product_id = Column(Integer, ForeignKey("products.id"))
-    customer_email = Column(String(255))
-    customer_name = Column(String(200))
-    
-    rating = Column(Integer, nullable=False)  # 1-5 stars
-    title = Column(String(200))
-    review_text = Column(Text)
-    
-    # Review validation
-    verified_purchase = Column(Boolean, default=False)
-    is_approved = Column(Boolean, default=False)
-    
-    # Timestamps
-    created_at = Column(DateTime, server_default=func.now())
-    
-    # Relationships
-    product = relationship("Product", back_populates="reviews")
+    token = Column(String(64), index=True, nullable=False)  # groups the holds of one checkout
+    variant_id = Column(Integer, ForeignKey("product_variants.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    status = Column(Enum(ReservationStatus), default=ReservationStatus.HELD, index=True, nullable=False)
+    expires_at = Column(DateTime, index=True, nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-# Enhanced API endpoints
-from fastapi import FastAPI, HTTPException, Depends, File, UploadFile, Form
-from pydantic import BaseModel
-from typing import List, Optional
-import uuid
-import os
-from datetime import datetime, timedelta
+class JobStatus(enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    DEAD = "dead"  # out of attempts (or unknown task); kept for inspection and requeue
 
-class OrderCreate(BaseModel):
-    customer_email: str
-    customer_name: str
-    shipping_address: dict
-    billing_address: dict
-    items: List[dict]
+class Job(Base):
+    __tablename__ = "jobs"
+    # Workers claim with: status = queued AND queue IN (...) AND run_at <= now ORDER BY priority, run_at
+    __table_args__ = (Index("ix_jobs_claim", "status", "queue", "priority", "run_at"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    queue = Column(String(50), nullable=False, default="default")
+    task = Column(String(100), nullable=False)
+    payload = Column(JSON)  # keyword arguments for the task
+    priority = Column(Integer, nullable=False, default=50)  # lower runs first
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(DateTime, nullable=False)  # not before (UTC); also the retry backoff
+    locked_by = Column(String(100))  # worker holding the lease
+    locked_until = Column(DateTime)  # lease expiry; an expired lease is requeued
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime)
 
-class DesignData(BaseModel):
-    canvas_data: dict
-    preview_url: str
-    print_areas: List[dict]
+# =============================================================================
+# ARCHIVE TABLES
+# =============================================================================
+# Cold rows (see archive.py) move out of the hot tables into copies of them
+# with the same columns and ids, no foreign keys or unique constraints, and
+# the time each row was archived.
 
-@app.post("/api/orders/", response_model=dict)
-async def create_order(order_data: OrderCreate, db: Session = Depends(get_db)):
-    """Create a new order with custom designs"""
-    
-    # Generate unique order number
-    order_number = f"PC{datetime.now().strftime('%Y%m%d')}{uuid.uuid4().hex[:6].upper()}"
-    
-    # Calculate totals
-    subtotal = sum(item['quantity'] * item['unit_price'] for item in order_data.items)
-    tax_amount = subtotal * 0.08  # 8% tax
-    shipping_cost = 15.0 if subtotal < 50 else 0.0  # Free shipping over $50
-    total_amount = subtotal + tax_amount + shipping_cost
-    
-    # Create order
-    db_order = Order(
-        order_number=order_number,
-        customer_email=order_data.customer_email,
-        customer_name=order_data.customer_name,
-        subtotal=subtotal,
-        tax_amount=tax_amount,
-        shipping_cost=shipping_cost,
-        total_amount=total_amount,
-        shipping_address=order_data.shipping_address,
-        billing_address=order_data.billing_address,
-        estimated_delivery=datetime.now() + timedelta(days=10)
-    )
-    
-    db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
-    
-    # Create order items
-    for item in order_data.items:
-        db_item = OrderItem(
-            order_id=db_order.id,
-            product_id=item['product_id'],
-            variant_id=item.get('variant_id'),
-            quantity=item['quantity'],
-            unit_price=item['unit_price'],
-            total_price=item['quantity'] * item['unit_price'],
-            design_data=item.get('design_data'),
-            design_preview_url=item.get('design_preview_url')
+def archive_table(table: Table) -> Table:
+    """archived_<name>: same columns as `table`, plus archived_at"""
+    columns = [
+        Column(
+            column.name,
+            column.type.copy(),
+            primary_key=column.primary_key,
+            nullable=column.nullable,
+            index=bool(column.foreign_keys) and not column.primary_key,  # parent lookups
         )
-        db.add(db_item)
-    
-    db.commit()
-    
-    # Send confirmation email (implement email service)
-    # await send_order_confirmation(order_data.customer_email, db_order)
-    
-    return {
-        "order_id": db_order.id,
-        "order_number": order_number,
-        "total_amount": total_amount,
-        "estimated_delivery": db_order.estimated_delivery
-    }
+        for column in table.columns
+    ]
+    return Table(f"archived_{table.name}", Base.metadata, *columns, Column("archived_at", DateTime, nullable=False, index=True))
 
-@app.post("/api/orders/{order_id}/approve-design")
-async def approve_design(order_id: int, approved: bool, db: Session = Depends(get_db)):
-    """Approve or reject order design"""
-    
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    order.design_approved = approved
-    if approved:
-        order.status = OrderStatus.PROCESSING
-        order.production_started = datetime.now()
-    
-    db.commit()
-    
-    return {"message": "Design approval status updated"}
-
-@app.get("/api/orders/{order_id}/tracking")
-async def get_order_tracking(order_id: int, db: Session = Depends(get_db)):
-    """Get order tracking information"""
-    
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    tracking_info = {
-        "order_number": order.order_number,
-        "status": order.status.value,
-        "estimated_delivery": order.estimated_delivery,
-        "tracking_number": order.tracking_number,
-        "timeline": [
-            {"stage": "Order Placed", "date": order.created_at, "completed": True},
-            {"stage": "Design Approved", "date": order.created_at, "completed": order.design_approved},
-            {"stage": "Production Started", "date": order.production_started, "completed": order.production_started is not None},
-            {"stage": "Shipped", "date": None, "completed": order.status in [OrderStatus.SHIPPING, OrderStatus.DELIVERED]},
-            {"stage": "Delivered", "date": None, "completed": order.status == OrderStatus.DELIVERED}
-        ]
-    }
-    
-    return tracking_info 
\ No newline at end of file
+ARCHIVE_TABLES = {
+    model.__table__.name: archive_table(model.__table__)
+    for model in (Category, Product, ProductVariant, Order, OrderItem, StockReservation)
+}
@@ -0,0 +1,424 @@
+# backend/preflight.py
+# Print-readiness preflight for uploaded artwork
+#
+# Uploads are checked in two steps. sniff() only looks at the first chunk of a
+# file - magic bytes and the image header - so wrong types, unreadable headers,
+# decompression bombs and undersized images are rejected before the rest of
+# the body is read. check() then inspects the complete file in a worker pool:
+# rasters are decoded (JPEGs in draft mode, at 1/8 scale), colour mode, ICC
+# profile and DPI metadata are read, and SVGs are sanitized. Inspections are
+# cached by SHA-256 of the content, so re-uploading the same artwork only
+# costs a hash.
+
+import asyncio
+import hashlib
+import io
+import math
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from xml.etree import ElementTree
+
+HEAD_BYTES = 64 * 1024  # enough for the header (and EXIF) of almost any image
+DEFAULT_MAX_PIXELS = 80_000_000
+DEFAULT_PRINT_DPI = 150
+MAX_CACHED_CONTENT = 1024 * 1024  # sanitized SVGs larger than this aren't kept in the cache
+
+# Magic bytes per extension; WebP is checked separately (RIFF....WEBP)
+SIGNATURES = {
+    ".jpg": (b"\xff\xd8\xff",),
+    ".jpeg": (b"\xff\xd8\xff",),
+    ".png": (b"\x89PNG\r\n\x1a\n",),
+    ".gif": (b"GIF87a", b"GIF89a"),
+}
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+
+# Allow-lists for static artwork: anything else is dropped, including scripts,
+# foreign content and animation (<set>/<animate> can rewrite href or on* at runtime)
+SAFE_SVG_TAGS = frozenset({
+    "svg", "g", "defs", "symbol", "use", "title", "desc", "metadata", "style", "switch",
+    "path", "rect", "circle", "ellipse", "line", "polyline", "polygon",
+    "text", "tspan", "textPath", "image",
+    "clipPath", "mask", "pattern", "marker", "linearGradient", "radialGradient", "stop",
+    "filter", "feBlend", "feColorMatrix", "feComponentTransfer", "feComposite", "feConvolveMatrix",
+    "feDiffuseLighting", "feDisplacementMap", "feDistantLight", "feDropShadow", "feFlood",
+    "feFuncA", "feFuncB", "feFuncG", "feFuncR", "feGaussianBlur", "feImage", "feMerge", "feMergeNode",
+    "feMorphology", "feOffset", "fePointLight", "feSpecularLighting", "feSpotLight", "feTile", "feTurbulence",
+})
+SAFE_SVG_ATTRIBUTES = frozenset({
+    # structure and geometry
+    "id", "class", "style", "version", "baseProfile", "viewBox", "preserveAspectRatio", "transform",
+    "transform-origin", "x", "y", "x1", "y1", "x2", "y2", "cx", "cy", "r", "rx", "ry", "fx", "fy", "fr",
+    "width", "height", "d", "points", "pathLength", "href",
+    # text
+    "dx", "dy", "rotate", "textLength", "lengthAdjust", "startOffset", "method", "spacing", "side",
+    # paint servers, clipping, masking, markers
+    "offset", "gradientUnits", "gradientTransform", "spreadMethod", "patternUnits", "patternContentUnits",
+    "patternTransform", "clipPathUnits", "maskUnits", "maskContentUnits", "markerUnits", "markerWidth",
+    "markerHeight", "refX", "refY", "orient",
+    # filters
+    "filterUnits", "primitiveUnits", "in", "in2", "result", "stdDeviation", "mode", "type", "values",
+    "tableValues", "slope", "intercept", "amplitude", "exponent", "operator", "k1", "k2", "k3", "k4",
+    "order", "kernelMatrix", "divisor", "bias", "targetX", "targetY", "edgeMode", "preserveAlpha",
+    "surfaceScale", "diffuseConstant", "specularConstant", "specularExponent", "kernelUnitLength", "scale",
+    "xChannelSelector", "yChannelSelector", "azimuth", "elevation", "z", "pointsAtX", "pointsAtY",
+    "pointsAtZ", "limitingConeAngle", "radius", "baseFrequency", "numOctaves", "seed", "stitchTiles",
+    # presentation
+    "fill", "fill-opacity", "fill-rule", "stroke", "stroke-width", "stroke-opacity", "stroke-linecap",
+    "stroke-linejoin", "stroke-miterlimit", "stroke-dasharray", "stroke-dashoffset", "opacity", "color",
+    "display", "visibility", "overflow", "clip", "clip-path", "clip-rule", "mask", "filter",
+    "marker-start", "marker-mid", "marker-end", "stop-color", "stop-opacity", "flood-color",
+    "flood-opacity", "lighting-color", "font-family", "font-size", "font-size-adjust", "font-weight",
+    "font-style", "font-variant", "font-stretch", "text-anchor", "dominant-baseline", "alignment-baseline",
+    "baseline-shift", "letter-spacing", "word-spacing", "text-decoration", "writing-mode", "direction",
+    "unicode-bidi", "paint-order", "vector-effect", "shape-rendering", "text-rendering", "image-rendering",
+    "color-interpolation", "color-interpolation-filters", "color-rendering", "mix-blend-mode", "isolation",
+})
+SAFE_HREF = re.compile(r"^\s*(#|data:image/(png|jpe?g|gif|webp);)", re.IGNORECASE)
+UNSAFE_CSS = re.compile(r"@import|expression\s*\(|javascript:|url\s*\(\s*['\"]?\s*(?!#|data:image/)", re.IGNORECASE)
+_DTD = re.compile(rb"<!(DOCTYPE|ENTITY)", re.IGNORECASE)
+_URL_IGNORED = re.compile(r"[\x00-\x20]")  # browsers skip these inside URLs ("java\tscript:")
+
+ElementTree.register_namespace("", SVG_NS)
+ElementTree.register_namespace("xlink", XLINK_NS)
+
+
+class PreflightError(Exception):
+    """An upload that can be rejected from its header alone"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        self.status_code = status_code
+        super().__init__(message)
+
+
+@dataclass(frozen=True)
+class ArtworkRequirements:
+    """What an upload is for and the pixel size it needs"""
+    purpose: str = "web"  # "web" (storefront images), "print" (design templates) or "mockup"
+    min_width: int = 0
+    min_height: int = 0
+    reason: str = ""  # appended to the "too small" error
+
+
+def _size(value: Any) -> float:
+    """A non-negative finite number from client JSON, or 0"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return number if math.isfinite(number) and number >= 0 else 0.0
+
+
+def requirements_for(subfolder: str, print_areas: Optional[Iterable[Dict[str, Any]]] = None) -> ArtworkRequirements:
+    """Pixel requirements for an upload folder, derived from the product's print areas
+
+    Templates are printed at the areas' physical size (width_in/height_in at
+    min_dpi); mockups are the editor canvas, so every area must fit on them.
+    Malformed sizes and offsets are read as 0, so such areas add no requirement.
+    """
+    areas = [area for area in print_areas if isinstance(area, dict)] if isinstance(print_areas, list) else []
+    if subfolder == "templates":
+        sizes = [
+            (_size(area.get("width_in")) * (_size(area.get("min_dpi")) or DEFAULT_PRINT_DPI),
+             _size(area.get("height_in")) * (_size(area.get("min_dpi")) or DEFAULT_PRINT_DPI))
+            for area in areas
+        ]
+        sizes = [(width, height) for width, height in sizes if width and height and math.isfinite(width * height)]
+        if not sizes:
+            return ArtworkRequirements(purpose="print")
+        return ArtworkRequirements(
+            purpose="print",
+            min_width=int(max(width for width, _ in sizes)),
+            min_height=int(max(height for _, height in sizes)),
+            reason="to print the largest print area at its minimum DPI",
+        )
+    if subfolder == "mockups":
+        corners = [
+            (_size(area.get("x")) + _size(area.get("width")), _size(area.get("y")) + _size(area.get("height")))
+            for area in areas
+        ]
+        corners = [(right, bottom) for right, bottom in corners if math.isfinite(right + bottom)]
+        return ArtworkRequirements(
+            purpose="mockup",
+            min_width=int(max((right for right, _ in corners), default=0)),
+            min_height=int(max((bottom for _, bottom in corners), default=0)),
+            reason="to contain every print area",
+        )
+    return ArtworkRequirements()
+
+
+# =============================================================================
+# INSPECTION (runs in the worker pool)
+# =============================================================================
+
+def _matches_signature(head: bytes, extension: str) -> bool:
+    if extension == ".webp":
+        return head[:4] == b"RIFF" and head[8:12] == b"WEBP"
+    return any(head.startswith(signature) for signature in SIGNATURES.get(extension, (b"",)))
+
+
+def _icc_description(icc: bytes) -> Optional[str]:
+    try:
+        from PIL import ImageCms
+        return ImageCms.getProfileDescription(ImageCms.ImageCmsProfile(io.BytesIO(icc))).strip() or "embedded"
+    except Exception:  # ImageCms missing (no littlecms) or an unparseable profile
+        return "embedded"
+
+
+def inspect_raster(data: bytes, max_pixels: int = DEFAULT_MAX_PIXELS) -> Dict[str, Any]:
+    """Facts about a raster image; "error" is set when it can't be used at all"""
+    from PIL import Image
+
+    facts: Dict[str, Any] = {"kind": "raster", "error": None}
+    try:
+        with Image.open(io.BytesIO(data)) as image:  # parses the header only
+            width, height = image.size
+            facts.update({
+                "format": image.format,
+                "width": width,
+                "height": height,
+                "mode": image.mode,
+                "icc_profile": _icc_description(image.info["icc_profile"]) if image.info.get("icc_profile") else None,
+                "dpi": [round(float(value), 1) for value in image.info["dpi"]] if image.info.get("dpi") else None,
+                "frames": getattr(image, "n_frames", 1),
+            })
+            if width * height > max_pixels:
+                facts["error"] = f"Image is {width}x{height} px, over the {max_pixels:,} pixel limit"
+                return facts
+            if image.format == "JPEG":
+                # Decoding at 1/8 scale still reads every entropy-coded block,
+                # so truncation and corruption surface at a fraction of the cost
+                image.draft(image.mode, (max(1, width // 8), max(1, height // 8)))
+                image.load()
+            elif image.format == "PNG":
+                image.verify()  # chunk CRCs through IEND, without inflating the pixels
+            else:
+                image.load()
+    except Image.DecompressionBombError as e:
+        facts["error"] = f"Image rejected as a decompression bomb: {e}"
+    except Exception as e:
+        facts["error"] = f"Image could not be decoded: {e}"
+    return facts
+
+
+def _local_name(name: str) -> str:
+    return name.rsplit("}", 1)[-1]
+
+
+def _namespace(name: str) -> Optional[str]:
+    return name[1:].split("}", 1)[0] if name.startswith("{") else None
+
+
+def _safe_element(element) -> bool:
+    if not isinstance(element.tag, str):
+        return True  # comments and processing instructions are inert
+    if _namespace(element.tag) not in (None, SVG_NS):
+        return False
+    name = _local_name(element.tag)
+    return name in SAFE_SVG_TAGS and not (name == "style" and UNSAFE_CSS.search(element.text or ""))
+
+
+def _safe_attribute(attribute: str, value: str) -> bool:
+    namespace, name = _namespace(attribute), _local_name(attribute)
+    if namespace == XML_NS:
+        return name in ("space", "lang")
+    if namespace not in (None, XLINK_NS) or (namespace == XLINK_NS and name != "href"):
+        return False
+    if name not in SAFE_SVG_ATTRIBUTES:
+        return False
+    compact = _URL_IGNORED.sub("", value)
+    if name == "href":
+        return bool(SAFE_HREF.match(compact))
+    return not (UNSAFE_CSS.search(value) or UNSAFE_CSS.search(compact))
+
+
+def sanitize_svg(data: bytes) -> Tuple[Optional[bytes], List[str], Optional[str]]:
+    """Reduce an SVG to allow-listed elements and attributes (static artwork only)
+
+    Returns (sanitized bytes, what was removed, error). Documents with a DTD
+    are refused outright rather than parsed (entity expansion, XXE).
+    """
+    if _DTD.search(data):
+        return None, [], "SVG files with a DOCTYPE or entity declarations are not allowed"
+    try:
+        root = ElementTree.fromstring(data)
+    except ElementTree.ParseError as e:
+        return None, [], f"SVG could not be parsed: {e}"
+    if _local_name(root.tag) != "svg" or _namespace(root.tag) not in (None, SVG_NS):
+        return None, [], "File is not an SVG document"
+
+    removed = set()
+    unsafe_children = [
+        (parent, child) for parent in root.iter() for child in parent if not _safe_element(child)
+    ]
+    for parent, child in unsafe_children:
+        parent.remove(child)
+        removed.add(f"<{_local_name(child.tag)}>")
+    for element in root.iter():
+        for attribute, value in list(element.attrib.items()):
+            if not _safe_attribute(attribute, value):
+                del element.attrib[attribute]
+                name = _local_name(attribute)
+                removed.add("event handlers" if name.lower().startswith("on") else name)
+    return ElementTree.tostring(root, encoding="utf-8"), sorted(removed), None
+
+
+def inspect_svg(data: bytes) -> Dict[str, Any]:
+    sanitized, removed, error = sanitize_svg(data)
+    return {"kind": "svg", "format": "SVG", "error": error, "removed": removed, "content": sanitized}
+
+
+def evaluate(facts: Dict[str, Any], requirements: ArtworkRequirements) -> Tuple[List[str], List[str]]:
+    """(errors, warnings) for inspected facts against what the upload is for"""
+    if facts["error"]:
+        return [facts["error"]], []
+    errors, warnings = [], []
+    if facts["kind"] == "svg":
+        if facts["removed"]:
+            warnings.append(f"Removed unsafe SVG content: {', '.join(facts['removed'])}")
+        return errors, warnings
+
+    width, height, mode = facts["width"], facts["height"], facts["mode"]
+    if width < requirements.min_width or height < requirements.min_height:
+        errors.append(
+            f"Image is {width}x{height} px; at least {requirements.min_width}x{requirements.min_height} px "
+            f"is needed {requirements.reason}".rstrip()
+        )
+    if mode == "CMYK":
+        if requirements.purpose != "print":
+            warnings.append("CMYK image; browsers convert it to RGB and colours may shift")
+        elif not facts["icc_profile"]:
+            warnings.append("CMYK image without an embedded ICC profile; colours will be printed unmanaged")
+    elif mode not in ("RGB", "RGBA", "L", "LA", "P", "1"):
+        warnings.append(f"Unusual colour mode {mode}")
+    if requirements.purpose == "print":
+        if facts["dpi"] and min(facts["dpi"]) < DEFAULT_PRINT_DPI:
+            warnings.append(f"Embedded DPI metadata is {min(facts['dpi']):g}; print size is checked in pixels")
+        if facts["frames"] > 1:
+            warnings.append("Animated image; only the first frame will be printed")
+    return errors, warnings
+
+
+# =============================================================================
+# PREFLIGHT SERVICE
+# =============================================================================
+
+class Preflight:
+    """Header sniffing, pooled inspection and a digest-keyed inspection cache"""
+
+    def __init__(self, workers: int = 2, max_entries: int = 1024, max_pixels: int = DEFAULT_MAX_PIXELS):
+        self.workers = workers
+        self.max_entries = max_entries
+        self.max_pixels = max_pixels
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Created on first upload; Pillow releases the GIL while decoding
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="preflight")
+            return self._executor
+
+    def sniff(self, head: bytes, extension: str, requirements: ArtworkRequirements = ArtworkRequirements()) -> None:
+        """Reject from the first chunk of a file; raises PreflightError"""
+        if extension == ".svg":
+            if _DTD.search(head):
+                self.rejected += 1
+                raise PreflightError("SVG files with a DOCTYPE or entity declarations are not allowed")
+            if b"<svg" not in head and not head.lstrip().startswith((b"<?xml", b"<!--")):
+                self.rejected += 1
+                raise PreflightError("File content is not an SVG document")
+            return
+        if not _matches_signature(head, extension):
+            self.rejected += 1
+            raise PreflightError(f"File content does not match its {extension} extension")
+
+        from PIL import Image
+        try:
+            with Image.open(io.BytesIO(head)) as image:
+                width, height = image.size
+        except Image.DecompressionBombError as e:
+            self.rejected += 1
+            raise PreflightError(f"Image rejected as a decompression bomb: {e}")
+        except Exception:
+            return  # header runs past the first chunk; check() decides on the full file
+        if width * height > self.max_pixels:
+            self.rejected += 1
+            raise PreflightError(f"Image is {width}x{height} px, over the {self.max_pixels:,} pixel limit")
+        if width < requirements.min_width or height < requirements.min_height:
+            self.rejected += 1
+            raise PreflightError(
+                f"Image is {width}x{height} px; at least {requirements.min_width}x{requirements.min_height} px "
+                f"is needed {requirements.reason}".rstrip()
+            )
+
+    def _inspect(self, data: bytes, extension: str) -> Dict[str, Any]:
+        return inspect_svg(data) if extension == ".svg" else inspect_raster(data, self.max_pixels)
+
+    async def check(self, data: bytes, extension: str, requirements: ArtworkRequirements = ArtworkRequirements()) -> Tuple[Dict[str, Any], bytes]:
+        """Full inspection of a complete file: (report, bytes to store)
+
+        The bytes to store are the sanitized document for SVGs and the
+        original content otherwise.
+        """
+        loop = asyncio.get_running_loop()
+        if len(data) <= HEAD_BYTES:
+            digest = hashlib.sha256(data).hexdigest()
+        else:
+            digest = await loop.run_in_executor(self._pool(), lambda: hashlib.sha256(data).hexdigest())
+        key = f"{extension}:{digest}"
+        with self._lock:
+            facts = self._entries.get(key)
+            if facts is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if facts is None:
+            facts = await loop.run_in_executor(self._pool(), self._inspect, data, extension)
+            with self._lock:
+                self.misses += 1
+                if len(facts.get("content") or b"") <= MAX_CACHED_CONTENT:
+                    self._entries[key] = facts
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        errors, warnings = evaluate(facts, requirements)
+        if errors:
+            self.rejected += 1
+        report = {key: value for key, value in facts.items() if key not in ("content", "error")}
+        report.update({"ok": not errors, "sha256": digest, "size": len(data), "errors": errors, "warnings": warnings})
+        return report, facts.get("content") or data
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def render_metrics(self) -> str:
+        with self._lock:
+            size = len(self._entries)
+        return (
+            "# HELP printcraft_preflight_cache_hits_total Uploads whose content digest was already inspected\n"
+            "# TYPE printcraft_preflight_cache_hits_total counter\n"
+            f"printcraft_preflight_cache_hits_total {self.hits}\n"
+            "# HELP printcraft_preflight_inspections_total Uploads inspected in the preflight pool\n"
+            "# TYPE printcraft_preflight_inspections_total counter\n"
+            f"printcraft_preflight_inspections_total {self.misses}\n"
+            "# HELP printcraft_preflight_rejected_total Uploads rejected by preflight\n"
+            "# TYPE printcraft_preflight_rejected_total counter\n"
+            f"printcraft_preflight_rejected_total {self.rejected}\n"
+            "# HELP printcraft_preflight_cache_entries Inspections cached in this worker\n"
+            "# TYPE printcraft_preflight_cache_entries gauge\n"
+            f"printcraft_preflight_cache_entries {size}\n"
+        )
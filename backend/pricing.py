@@ -0,0 +1,281 @@
+# backend/pricing.py
+# Quote engine - quantity breaks, print surcharges, tax and shipping
+#
+# Each product is compiled once into a PriceTable (cached per product version
+# in the catalog cache): its variant prices, quantity breaks padded to
+# MAX_TIERS columns, the print methods it offers and its shipping weight.
+# A quote stacks the tables of the products in the cart and prices every
+# line at every tier with a few NumPy operations, so a 200-line corporate
+# order costs about as much as a 2-line cart.
+#
+# Quantity breaks apply to the total quantity of a product across all its
+# lines (50 shirts in mixed sizes and colours get the 50+ price).
+#
+# Products can override the defaults in customization_options:
+#   "print_methods": ["screen_print", "embroidery"]   methods offered (all if absent)
+#   "max_colors": 6                                    colours per design
+#   "pricing": {
+#       "quantity_breaks": [[12, 0.05], [50, 0.1]],   [min quantity, discount]
+#       "weight_kg": 0.2,                              per unit, packed
+#       "dimensions_cm": [30, 25, 3],                  per unit, packed
+#   }
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Sequence, Tuple
+
+TAX_RATE = 0.08
+MAX_TIERS = 8
+UNREACHABLE_QUANTITY = 2 ** 63 - 1  # pads unused tiers (fits NumPy's int64)
+MAX_LINE_QUANTITY = 1_000_000  # units per line; keeps tier sums and totals far from int64 limits
+
+# (minimum quantity, discount off the unit price)
+DEFAULT_QUANTITY_BREAKS = ((1, 0.0), (12, 0.05), (50, 0.10), (100, 0.15), (250, 0.20), (500, 0.25))
+
+
+@dataclass(frozen=True)
+class PrintMethod:
+    per_unit: float  # added to every unit
+    per_extra_color: float  # per unit, for each colour after the first
+    setup_per_color: float  # once per line (screens, digitizing)
+
+
+PRINT_METHODS = {
+    "digital": PrintMethod(per_unit=0.0, per_extra_color=0.0, setup_per_color=0.0),
+    "sublimation": PrintMethod(per_unit=1.25, per_extra_color=0.0, setup_per_color=0.0),
+    "screen_print": PrintMethod(per_unit=0.50, per_extra_color=0.40, setup_per_color=15.0),
+    "embroidery": PrintMethod(per_unit=2.50, per_extra_color=0.25, setup_per_color=20.0),
+}
+DEFAULT_PRINT_METHOD = "digital"
+
+# Shipping: base fee plus a rate per billable kg, where billable weight is the
+# larger of the actual and the dimensional (volumetric) weight
+DEFAULT_UNIT_WEIGHT_KG = 0.25
+DIMENSIONAL_DIVISOR = 5000.0  # cm^3 per kg
+SHIPPING_BASE = 12.0
+SHIPPING_PER_KG = 3.0
+FREE_SHIPPING_THRESHOLD = 50.0  # subtotal from which the base fee and ...
+FREE_SHIPPING_KG = 2.0  # ... this much billable weight ship free
+
+
+def _float(value: Any, default: float) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default
+    return number if math.isfinite(number) and number >= 0 else default
+
+
+def _quantity_breaks(spec: Any) -> Tuple[Tuple[int, float], ...]:
+    """Validated, sorted breaks that always start at quantity 1"""
+    breaks = {1: 0.0}
+    if isinstance(spec, list):
+        for entry in spec:
+            if isinstance(entry, (list, tuple)) and len(entry) == 2:
+                quantity, discount = int(_float(entry[0], 0)), _float(entry[1], -1)
+                if quantity >= 1 and 0 <= discount < 1:
+                    breaks[quantity] = discount
+    else:
+        breaks.update(DEFAULT_QUANTITY_BREAKS)
+    return tuple(sorted(breaks.items()))[:MAX_TIERS]
+
+
+@dataclass(frozen=True)
+class PriceTable:
+    """Everything needed to price one product, precomputed"""
+    product_id: int
+    name: str
+    base_price: float
+    min_order_quantity: int
+    variant_prices: Dict[int, float]
+    break_quantities: Tuple[int, ...]  # padded to MAX_TIERS with a quantity nobody reaches
+    break_multipliers: Tuple[float, ...]  # padded by repeating the last tier
+    tier_count: int
+    print_methods: FrozenSet[str]
+    default_print_method: str  # used when a line doesn't name one
+    max_colors: int
+    unit_weight_kg: float
+    unit_volumetric_kg: float
+
+
+def build_price_table(product) -> PriceTable:
+    """Compile a Product (with variants loaded) into a PriceTable"""
+    options = product.customization_options if isinstance(product.customization_options, dict) else {}
+    pricing = options.get("pricing") if isinstance(options.get("pricing"), dict) else {}
+
+    breaks = _quantity_breaks(pricing.get("quantity_breaks"))
+    padding = MAX_TIERS - len(breaks)
+    quantities = tuple(quantity for quantity, _ in breaks) + (UNREACHABLE_QUANTITY,) * padding
+    multipliers = tuple(1.0 - discount for _, discount in breaks)
+    multipliers += (multipliers[-1],) * padding
+
+    offered = options.get("print_methods")
+    methods = frozenset(m for m in offered if m in PRINT_METHODS) if isinstance(offered, list) else frozenset(PRINT_METHODS)
+    methods = methods or frozenset({DEFAULT_PRINT_METHOD})
+    default_method = DEFAULT_PRINT_METHOD if DEFAULT_PRINT_METHOD in methods else min(
+        methods, key=lambda name: (PRINT_METHODS[name].per_unit, name)
+    )
+
+    dimensions = pricing.get("dimensions_cm")
+    volumetric = 0.0
+    if isinstance(dimensions, list) and len(dimensions) == 3:
+        volumetric = math.prod(_float(d, 0.0) for d in dimensions) / DIMENSIONAL_DIVISOR
+
+    return PriceTable(
+        product_id=product.id,
+        name=product.name,
+        base_price=product.base_price,
+        min_order_quantity=product.min_order_quantity or 1,
+        variant_prices={variant.id: variant.price for variant in product.variants},
+        break_quantities=quantities,
+        break_multipliers=multipliers,
+        tier_count=len(breaks),
+        print_methods=methods,
+        default_print_method=default_method,
+        max_colors=max(1, int(_float(options.get("max_colors"), 12))),
+        unit_weight_kg=_float(pricing.get("weight_kg"), DEFAULT_UNIT_WEIGHT_KG),
+        unit_volumetric_kg=volumetric,
+    )
+
+
+def shipping_cost(subtotal: float, billable_kg: float) -> float:
+    if billable_kg <= 0:
+        return 0.0
+    if subtotal >= FREE_SHIPPING_THRESHOLD:
+        return round(SHIPPING_PER_KG * max(0.0, billable_kg - FREE_SHIPPING_KG), 2)
+    return round(SHIPPING_BASE + SHIPPING_PER_KG * billable_kg, 2)
+
+
+def billable_weight(tables: Sequence[PriceTable], quantities: Sequence[int]) -> float:
+    """Billable kg for quantities[i] units of tables[i]"""
+    actual = sum(table.unit_weight_kg * quantity for table, quantity in zip(tables, quantities))
+    volumetric = sum(table.unit_volumetric_kg * quantity for table, quantity in zip(tables, quantities))
+    return max(actual, volumetric)
+
+
+def order_totals(subtotal: float, billable_kg: float) -> Dict[str, float]:
+    tax = round(subtotal * TAX_RATE, 2)
+    shipping = shipping_cost(subtotal, billable_kg)
+    return {"subtotal": round(subtotal, 2), "tax": tax, "shipping": shipping, "total": round(subtotal + tax + shipping, 2)}
+
+
+# =============================================================================
+# QUOTING
+# =============================================================================
+
+def quote(lines: Sequence[Dict[str, Any]], tables: Dict[int, PriceTable], include_tiers: bool = False) -> Dict[str, Any]:
+    """Price cart lines ({"product_id", "variant_id", "quantity", "print_method", "colors"})
+
+    Lines that can't be priced (unknown product, method not offered, ...) are
+    returned with issues and left out of the totals rather than failing the
+    whole quote, so a cart can re-quote on every edit.
+    """
+    # Imported here so NumPy is only loaded by workers that price carts
+    import numpy as np
+
+    issues: List[List[Dict[str, str]]] = [[] for _ in lines]
+    priceable = []
+    for index, line in enumerate(lines):
+        quantity = line.get("quantity")
+        if isinstance(quantity, bool) or not isinstance(quantity, int) or not 1 <= quantity <= MAX_LINE_QUANTITY:
+            issues[index].append({"code": "invalid_quantity", "message": f"Quantity must be a whole number from 1 to {MAX_LINE_QUANTITY}"})
+            continue
+        table = tables.get(line["product_id"])
+        if table is None:
+            issues[index].append({"code": "unknown_product", "message": f"Product {line['product_id']} not found"})
+            continue
+        variant_id = line.get("variant_id")
+        if variant_id is not None and variant_id not in table.variant_prices:
+            issues[index].append({"code": "unknown_variant", "message": f"Variant {variant_id} is not part of product {table.product_id}"})
+            continue
+        method = line.get("print_method") or table.default_print_method
+        if method not in table.print_methods:
+            issues[index].append({
+                "code": "print_method_unavailable",
+                "message": f"{table.name} can't be printed with {method} (offered: {', '.join(sorted(table.print_methods))})",
+            })
+            continue
+        if line.get("colors", 1) > table.max_colors:
+            issues[index].append({"code": "too_many_colors", "message": f"{table.name} allows at most {table.max_colors} colours"})
+            continue
+        priceable.append((index, method))
+
+    methods = [PRINT_METHODS[method] for _, method in priceable]
+    method_names = [method for _, method in priceable]
+    priceable = [index for index, _ in priceable]
+    results: List[Dict[str, Any]] = [
+        {**line, "unit_price": None, "line_total": None, "issues": issues[index]} for index, line in enumerate(lines)
+    ]
+    if not priceable:
+        return {"ok": False, "lines": results, **order_totals(0.0, 0.0), "billable_weight_kg": 0.0}
+
+    # One row per distinct product, one column per tier
+    product_ids = list(dict.fromkeys(lines[i]["product_id"] for i in priceable))
+    product_index = {product_id: row for row, product_id in enumerate(product_ids)}
+    product_tables = [tables[product_id] for product_id in product_ids]
+    break_quantities = np.array([t.break_quantities for t in product_tables], dtype=np.int64)
+    break_multipliers = np.array([t.break_multipliers for t in product_tables])
+
+    rows = np.array([product_index[lines[i]["product_id"]] for i in priceable])
+    quantity = np.array([lines[i]["quantity"] for i in priceable], dtype=np.int64)
+    colors = np.array([lines[i].get("colors", 1) for i in priceable], dtype=np.int64)
+    base = np.array([
+        product_tables[row].variant_prices[lines[i]["variant_id"]] if lines[i].get("variant_id") is not None
+        else product_tables[row].base_price
+        for i, row in zip(priceable, rows)
+    ])
+    per_unit = np.array([m.per_unit for m in methods])
+    per_extra_color = np.array([m.per_extra_color for m in methods])
+    setup_per_color = np.array([m.setup_per_color for m in methods])
+
+    # Tier by each product's total quantity across its lines
+    product_quantity = np.bincount(rows, weights=quantity, minlength=len(product_ids)).astype(np.int64)
+    product_tier = (product_quantity[:, None] >= break_quantities).sum(axis=1) - 1
+    tier = product_tier[rows]
+
+    surcharge = per_unit + per_extra_color * np.maximum(colors - 1, 0)
+    tier_prices = np.round(base[:, None] * break_multipliers[rows] + surcharge[:, None], 2)  # lines x tiers
+    unit_price = tier_prices[np.arange(len(rows)), tier]
+    setup = setup_per_color * colors
+    line_total = np.round(unit_price * quantity + setup, 2)
+    subtotal = float(line_total.sum())
+
+    weight = billable_weight(product_tables, product_quantity.tolist())
+    below_minimum = product_quantity < np.array([t.min_order_quantity for t in product_tables])
+
+    for position, index in enumerate(priceable):
+        row = rows[position]
+        table = product_tables[row]
+        current = int(tier[position])
+        result = results[index]
+        result.update(
+            print_method=method_names[position],
+            unit_price=float(unit_price[position]),
+            line_total=float(line_total[position]),
+            setup_fee=float(setup[position]),
+            tier_quantity=int(product_quantity[row]),
+            discount_pct=round((1.0 - float(break_multipliers[row, current])) * 100, 2),
+            next_tier=None,
+        )
+        if current + 1 < table.tier_count:
+            result["next_tier"] = {
+                "min_quantity": int(break_quantities[row, current + 1]),
+                "unit_price": float(tier_prices[position, current + 1]),
+            }
+        if include_tiers:
+            result["tiers"] = [
+                {"min_quantity": int(break_quantities[row, t]), "unit_price": float(tier_prices[position, t])}
+                for t in range(table.tier_count)
+            ]
+        if below_minimum[row]:
+            result["issues"].append({
+                "code": "below_minimum_quantity",
+                "message": f"{table.name} has a minimum order of {table.min_order_quantity}",
+            })
+
+    return {
+        "ok": not any(result["issues"] for result in results),
+        "lines": results,
+        **order_totals(subtotal, weight),
+        "billable_weight_kg": round(weight, 3),
+    }
@@ -0,0 +1,289 @@
+# backend/profiling.py
+# On-demand sampling profiler - worker-wide sessions and per-request profiles
+
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# =============================================================================
+# SETTINGS
+# =============================================================================
+# The master switch and request sample rate come from Settings
+# (profiling_enabled, profile_request_sample_rate); nothing here runs unless
+# profiling is enabled
+
+PROFILE_HEADER = b"x-profile"
+
+DEFAULT_INTERVAL = 0.005  # seconds between samples
+MIN_INTERVAL = 0.001
+MAX_SESSION_SECONDS = 60.0
+MAX_STACK_DEPTH = 128
+MAX_UNIQUE_STACKS = 50000
+PROFILER_THREAD_NAME = "printcraft-profiler"
+
+# Innermost frames that mean a thread is parked, not working
+_IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+}
+
+Frame = Tuple[str, str, int]  # (function, filename, first line)
+
+
+class ProfileStore:
+    """Aggregated stack samples, grouped by a root label (thread kind or route)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stacks: Dict[str, Counter] = {}
+        self.samples = 0
+        self.dropped = 0
+        self.unique_stacks = 0
+        self.interval = DEFAULT_INTERVAL
+
+    def add(self, root: str, stack: Tuple[Frame, ...]) -> None:
+        with self._lock:
+            counter = self.stacks.setdefault(root, Counter())
+            if stack not in counter:
+                if self.unique_stacks >= MAX_UNIQUE_STACKS:
+                    self.dropped += 1
+                    return
+                self.unique_stacks += 1
+            counter[stack] += 1
+            self.samples += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.stacks.clear()
+            self.samples = 0
+            self.dropped = 0
+            self.unique_stacks = 0
+
+    def to_collapsed(self) -> str:
+        """Brendan Gregg collapsed-stack format (flamegraph.pl, speedscope, inferno)"""
+        lines = []
+        with self._lock:
+            for root, counter in self.stacks.items():
+                for stack, count in counter.items():
+                    frames = [root] + [f"{name} ({os.path.basename(filename)}:{line})" for name, filename, line in stack]
+                    lines.append(f"{';'.join(frames)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self, name: str = "PrintCraft profile") -> dict:
+        """speedscope.app file format, one sampled profile per root label"""
+        frames: List[dict] = []
+        frame_index: Dict[Frame, int] = {}
+        profiles = []
+        with self._lock:
+            for root, counter in self.stacks.items():
+                samples, weights = [], []
+                for stack, count in counter.items():
+                    indices = []
+                    for frame in stack:
+                        if frame not in frame_index:
+                            frame_index[frame] = len(frames)
+                            frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                        indices.append(frame_index[frame])
+                    samples.append(indices)
+                    weights.append(count * self.interval)
+                profiles.append({
+                    "type": "sampled",
+                    "name": root,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+            "name": name,
+            "exporter": "printcraft-profiler",
+        }
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "samples": self.samples,
+                "dropped": self.dropped,
+                "interval_ms": self.interval * 1000,
+                "roots": {root: sum(counter.values()) for root, counter in self.stacks.items()},
+            }
+
+
+# =============================================================================
+# SAMPLER
+# =============================================================================
+
+_loop_thread_id: Optional[int] = None
+
+
+def _thread_label(thread_id: int, names: Dict[int, str]) -> str:
+    if thread_id == _loop_thread_id:
+        return "event-loop"
+    name = names.get(thread_id, "")
+    if name.startswith("AnyIO worker thread"):
+        return "threadpool"
+    return name or f"thread-{thread_id}"
+
+
+def sample_threads(skip: Tuple[int, ...] = ()) -> List[Tuple[str, Tuple[Frame, ...]]]:
+    """One snapshot of every busy thread's Python stack, outermost frame first
+
+    Idle threads (parked in select/Condition.wait/Queue.get) are skipped, so an
+    event-loop sample means the loop was running code - including sync DB
+    calls that block it.
+    """
+    names = {t.ident: t.name for t in threading.enumerate()}
+    result = []
+    for thread_id, frame in sys._current_frames().items():
+        if thread_id in skip or names.get(thread_id) == PROFILER_THREAD_NAME:
+            continue
+        code = frame.f_code
+        if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+            continue
+        stack = []
+        depth = 0
+        while frame is not None and depth < MAX_STACK_DEPTH:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+            depth += 1
+        stack.reverse()
+        result.append((_thread_label(thread_id, names), tuple(stack)))
+    return result
+
+
+class SamplingSession:
+    """Sample the whole worker for a fixed duration (one session at a time)"""
+
+    _running = threading.Lock()
+
+    def __init__(self, seconds: float, interval: float = DEFAULT_INTERVAL):
+        self.seconds = min(max(seconds, 0.1), MAX_SESSION_SECONDS)
+        self.interval = max(interval, MIN_INTERVAL)
+        self.store = ProfileStore()
+        self.store.interval = self.interval
+
+    def run(self) -> ProfileStore:
+        """Blocking; call from a worker thread, never on the event loop"""
+        if not SamplingSession._running.acquire(blocking=False):
+            raise RuntimeError("A profiling session is already running in this worker")
+        try:
+            me = threading.get_ident()
+            deadline = time.perf_counter() + self.seconds
+            while time.perf_counter() < deadline:
+                for root, stack in sample_threads(skip=(me,)):
+                    self.store.add(root, stack)
+                time.sleep(self.interval)
+        finally:
+            SamplingSession._running.release()
+        return self.store
+
+
+class RequestProfiler:
+    """Background sampler that runs only while profiled requests are in flight
+
+    Samples taken while requests are in flight are attributed to the route
+    that was in flight; with several distinct routes in flight at once they
+    are grouped under "(concurrent)".
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = max(interval, MIN_INTERVAL)
+        self.store = ProfileStore()
+        self.store.interval = self.interval
+        self._lock = threading.Lock()
+        self._in_flight: Counter = Counter()
+        self._thread: Optional[threading.Thread] = None
+
+    def enter(self, route: str) -> None:
+        with self._lock:
+            self._in_flight[route] += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=PROFILER_THREAD_NAME, daemon=True)
+                self._thread.start()
+
+    def exit(self, route: str) -> None:
+        with self._lock:
+            self._in_flight[route] -= 1
+            if self._in_flight[route] <= 0:
+                del self._in_flight[route]
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                routes = list(self._in_flight)
+                if not routes:
+                    self._thread = None
+                    return
+            prefix = routes[0] if len(routes) == 1 else "(concurrent)"
+            for root, stack in sample_threads(skip=(me,)):
+                self.store.add(f"{prefix} [{root}]", stack)
+            time.sleep(self.interval)
+
+
+request_profiler = RequestProfiler()
+
+# =============================================================================
+# ASGI MIDDLEWARE
+# =============================================================================
+
+class RequestProfilingMiddleware:
+    """Profiles requests selected by sample rate or by the X-Profile header
+
+    The header only takes effect together with a valid admin token (see
+    `authorize`), so clients cannot switch profiling on by themselves.
+    """
+
+    def __init__(self, app, routes=None, authorize=None, enabled: bool = False, sample_rate: float = 0.0):
+        self.app = app
+        self.routes = routes or []
+        self.authorize = authorize
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+
+    def _selected(self, scope) -> bool:
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return True
+        headers = dict(scope.get("headers") or [])
+        if headers.get(PROFILE_HEADER) and self.authorize is not None:
+            return self.authorize(headers)
+        return False
+
+    def _route_label(self, scope) -> str:
+        from starlette.routing import Match
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        global _loop_thread_id
+        if not self.enabled or scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        _loop_thread_id = threading.get_ident()
+        route = self._route_label(scope)
+        request_profiler.enter(route)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_profiler.exit(route)
+
+
+def mark_event_loop_thread() -> None:
+    """Remember which thread runs the event loop so its samples are labelled"""
+    global _loop_thread_id
+    _loop_thread_id = threading.get_ident()
@@ -0,0 +1,101 @@
+# backend/tasks.py
+# Background job tasks - run by `python worker.py`, enqueued with jobs.enqueue
+#
+# Every task may run more than once (see jobs.py), so each is written to be
+# harmless when repeated.
+
+import logging
+import smtplib
+from email.message import EmailMessage
+from pathlib import Path
+
+from archive import run_archival
+from cache_bus import create_version_source, entity_key
+from jobs import PRIORITY_HIGH, PRIORITY_LOW, task
+from models import Order, OrderItem, Product
+
+logger = logging.getLogger("printcraft.tasks")
+
+
+@task("send_order_confirmation", queue="email", priority=PRIORITY_HIGH, max_attempts=8, lease_seconds=120)
+def send_order_confirmation(ctx, order_id: int) -> None:
+    """Email the customer their order summary"""
+    db = ctx.database.session()
+    try:
+        order = db.query(Order).filter(Order.id == order_id).first()
+        if order is None:
+            logger.warning("Order %s no longer exists, skipping confirmation", order_id)
+            return
+        items = db.query(OrderItem.quantity, OrderItem.unit_price, OrderItem.total_price, Product.name).join(
+            Product, OrderItem.product_id == Product.id
+        ).filter(OrderItem.order_id == order_id).order_by(OrderItem.id).all()
+
+        message = EmailMessage()
+        message["Subject"] = f"PrintCraft order {order.order_number} confirmed"
+        message["From"] = ctx.settings.mail_from
+        message["To"] = order.customer_email
+        lines = [
+            f"Hi {order.customer_name or 'there'},",
+            "",
+            f"Thanks for your order {order.order_number}. Here is what we'll print for you:",
+            "",
+        ]
+        lines += [f"  {quantity} x {name} @ ${unit_price:.2f} = ${total:.2f}" for quantity, unit_price, total, name in items]
+        lines += [
+            "",
+            f"Subtotal: ${order.subtotal:.2f}",
+            f"Tax:      ${order.tax_amount:.2f}",
+            f"Shipping: ${order.shipping_cost:.2f}",
+            f"Total:    ${order.total_amount:.2f}",
+        ]
+        if order.estimated_delivery:
+            lines += ["", f"Estimated delivery: {order.estimated_delivery:%d %B %Y}"]
+        message.set_content("\n".join(lines))
+    finally:
+        db.close()
+
+    settings = ctx.settings
+    if not settings.smtp_host:
+        logger.info("SMTP_HOST not set; would have sent:\n%s", message)
+        return
+    with smtplib.SMTP(settings.smtp_host, settings.smtp_port, timeout=30) as smtp:
+        if settings.smtp_username:
+            smtp.starttls()
+            smtp.login(settings.smtp_username, settings.smtp_password or "")
+        smtp.send_message(message)
+
+
+@task("delete_upload", queue="default", priority=PRIORITY_LOW)
+def delete_upload(ctx, subfolder: str, filename: str) -> None:
+    """Remove a stored upload that nothing references any more"""
+    upload_dir = Path(ctx.settings.upload_dir).resolve()
+    path = (upload_dir / subfolder / Path(filename).name).resolve()
+    if path.parent.parent != upload_dir:
+        raise ValueError(f"Refusing to delete outside the upload folder: {path}")
+    path.unlink(missing_ok=True)
+
+
+# Collections whose cached listings may include rows of each archived kind
+# (entries for a single id stay valid: reads by id find archived rows too)
+ARCHIVE_INVALIDATES = {
+    "orders": (),
+    "products": ("products", "catalog"),
+    "categories": ("categories", "catalog"),
+}
+
+
+@task("archive_cold_rows", queue="maintenance", priority=PRIORITY_LOW, max_attempts=3, lease_seconds=3600, every=3600)
+def archive_cold_rows(ctx) -> None:
+    """Move finished orders and retired catalog rows to the archive tables (see archive.py)"""
+    settings = ctx.settings
+    versions = create_version_source(settings.cache_bus, settings.database_url, settings.cache_bus_path)
+
+    def invalidate(kind, ids):
+        if ARCHIVE_INVALIDATES[kind]:
+            versions.bump(*map(entity_key, ARCHIVE_INVALIDATES[kind]))
+
+    try:
+        counts = run_archival(ctx.database, settings.archive_after_days, settings.archive_batch_size, invalidate)
+    finally:
+        versions.close()
+    logger.info("Archived %s", ", ".join(f"{count} {kind}" for kind, count in counts.items()))
@@ -0,0 +1,65 @@
+# backend/tests/conftest.py
+# Shared fixtures - the real app against a throwaway SQLite database
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import create_app
+from models import Category, Product, ProductVariant
+from settings import Settings
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return Settings(
+        database_url=f"sqlite:///{tmp_path / 'test.db'}",
+        upload_dir=str(tmp_path / "uploads"),
+        cache_bus_path=str(tmp_path / "versions"),
+    )
+
+
+@pytest.fixture
+def app(settings):
+    app = create_app(settings)
+    app.state.database.create_schema()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def db(app):
+    session = app.state.database.session()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def make_product(db):
+    """make_product(**columns) -> (product id, [variant ids]); one category shared by all"""
+    category = Category(name="Shirts", slug="shirts", is_active=True)
+    db.add(category)
+    db.commit()
+    count = 0
+
+    def make(variants=({"price": 12.0, "stock": 10},), **columns):
+        nonlocal count
+        count += 1
+        product = Product(
+            name=f"Product {count}",
+            slug=f"product-{count}",
+            base_price=10.0,
+            category_id=category.id,
+            is_active=True,
+            **columns,
+        )
+        product.variants = [ProductVariant(**variant) for variant in variants]
+        db.add(product)
+        db.commit()
+        return product.id, [variant.id for variant in product.variants]
+
+    return make
@@ -0,0 +1,112 @@
+# backend/tests/test_archive.py
+
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from archive import archive_counts, run_archival
+from models import Order, OrderItem, OrderStatus, Product
+
+
+def make_order(db, product_id, variant_id, status=OrderStatus.DELIVERED):
+    order = Order(
+        order_number=f"PC-TEST-{db.query(Order).count() + 1}", customer_email="a@example.com", customer_name="A",
+        status=status, subtotal=12.0, total_amount=12.0,
+    )
+    order.order_items = [OrderItem(
+        product_id=product_id, variant_id=variant_id, quantity=1, unit_price=12.0, total_price=12.0,
+        design_data={"objects": [{"type": "textbox", "text": "Hi"}]},
+    )]
+    db.add(order)
+    db.commit()
+    return order.id
+
+
+def age_everything(db, days=60):
+    old = datetime.utcnow() - timedelta(days=days)
+    db.execute(update(Order).values(updated_at=old))
+    db.execute(update(Product).values(updated_at=old))
+    db.commit()
+
+
+def test_archive_read_restore_round_trip(app, client, db, make_product):
+    product_id, (variant_id,) = make_product()
+    order_id = make_order(db, product_id, variant_id)
+    open_order_id = make_order(db, product_id, variant_id, status=OrderStatus.PROCESSING)
+    client.put(f"/api/products/{product_id}/toggle-active")
+    age_everything(db)
+
+    product = client.get(f"/api/products/{product_id}").json()
+    tracking = client.get(f"/api/orders/{order_id}/tracking").json()
+    design_check = client.get(f"/api/orders/{order_id}/design-check").json()
+
+    # The open order pins the product; the delivered one goes
+    assert run_archival(app.state.database, older_than_days=30) == {"orders": 1, "products": 0, "categories": 0}
+    db.execute(update(Order).where(Order.id == open_order_id).values(status=OrderStatus.CANCELLED))
+    db.commit()
+    age_everything(db)
+    assert run_archival(app.state.database, older_than_days=30) == {"orders": 1, "products": 1, "categories": 0}
+    counts = archive_counts(db)
+    assert counts["products"] == (0, 1)
+    assert counts["product_variants"] == (0, 1)
+    assert counts["order_items"] == (0, 2)
+
+    # Reads by id look the same from the archive
+    app.state.catalog_cache.clear()
+    assert client.get(f"/api/products/{product_id}").json() == product
+    assert client.get(f"/api/orders/{order_id}/tracking").json() == tracking
+    assert client.get(f"/api/orders/{order_id}/design-check").json() == design_check
+
+    # Reactivating moves the product back and makes it sellable again
+    response = client.put(f"/api/products/{product_id}/toggle-active")
+    assert response.status_code == 200
+    restored = client.get(f"/api/products/{product_id}").json()
+    assert restored["is_active"] is True
+    assert restored["variants"] == product["variants"]
+    assert archive_counts(db)["products"] == (1, 0)
+
+
+def test_exports_include_archived_rows(app, settings, client, db, make_product):
+    settings.admin_token = "secret"
+    product_id, (variant_id,) = make_product()
+    archived_order_id = make_order(db, product_id, variant_id)
+    client.put(f"/api/products/{product_id}/toggle-active")
+    age_everything(db)
+    live_product_id, (live_variant_id,) = make_product()
+    live_order_id = make_order(db, live_product_id, live_variant_id)
+    assert run_archival(app.state.database, older_than_days=30) == {"orders": 1, "products": 1, "categories": 0}
+
+    def export(entity, format="csv", **params):
+        response = client.get(f"/api/admin/export/{entity}", params={"format": format, **params}, headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        if format == "ndjson":
+            return [json.loads(line) for line in response.text.splitlines()]
+        return list(csv.DictReader(io.StringIO(response.text)))
+
+    orders = export("orders", "ndjson", include="design_data")
+    assert [row["order_id"] for row in orders] == [archived_order_id, live_order_id]
+    assert orders[0]["status"] == "delivered"
+    assert orders[0]["design_data"] == {"objects": [{"type": "textbox", "text": "Hi"}]}
+    assert [row["product_id"] for row in export("products")] == [str(product_id), str(live_product_id)]
+    assert [row["order_id"] for row in export("orders", status="delivered")] == [str(archived_order_id), str(live_order_id)]
+    assert [row["product_id"] for row in export("products", is_active="false")] == [str(product_id)]
+
+    assert [row["order_id"] for row in export("orders", include_archived="false")] == [str(live_order_id)]
+    assert [row["product_id"] for row in export("products", include_archived="false")] == [str(live_product_id)]
+
+
+def test_variant_batch_finds_archived_skus(app, client, db, make_product):
+    product_id, (variant_id,) = make_product(variants=({"sku": "OLD-TEE-M", "price": 12.0, "stock": 3},))
+    live_product_id, (live_variant_id,) = make_product(variants=({"sku": "TEE-M", "price": 14.0, "stock": 5},))
+    client.put(f"/api/products/{product_id}/toggle-active")
+    age_everything(db)
+    assert run_archival(app.state.database, older_than_days=30)["products"] == 1
+    app.state.catalog_cache.clear()
+
+    body = client.get("/api/variants/batch", params={"skus": "TEE-M,OLD-TEE-M,NOPE"}).json()
+    assert [(v["id"], v["product_id"]) for v in body["variants"][:2]] == [(live_variant_id, live_product_id), (variant_id, product_id)]
+    assert body["variants"][1]["sku"] == "OLD-TEE-M"
+    assert body["missing"] == ["NOPE"]
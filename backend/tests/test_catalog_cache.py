@@ -0,0 +1,54 @@
+# backend/tests/test_catalog_cache.py
+
+import time
+
+from fastapi.testclient import TestClient
+
+
+def test_deleting_a_category_refreshes_cached_products(client, db, make_product):
+    product_id, _ = make_product()
+    client.put(f"/api/products/{product_id}/toggle-active")  # categories with active products can't be deleted
+    assert client.get(f"/api/products/{product_id}").json()["category"]["is_active"] is True
+
+    category_id = client.get(f"/api/products/{product_id}").json()["category_id"]
+    assert client.delete(f"/api/categories/{category_id}").status_code == 200
+    assert client.get(f"/api/products/{product_id}").json()["category"]["is_active"] is False
+
+
+def test_listing_snapshot_follows_stock(client, make_product):
+    product_id, (variant_id,) = make_product(variants=({"price": 12.0, "stock": 5},))
+
+    def listed_stock():
+        (product,) = [p for p in client.get("/api/products/").json() if p["id"] == product_id]
+        return product["variants"][0]["stock"]
+
+    assert listed_stock() == 5
+    token = client.post("/api/reservations/", json={"items": [{"variant_id": variant_id, "quantity": 2}]}).json()["reservation_token"]
+    assert listed_stock() == 3
+    client.delete(f"/api/reservations/{token}")
+    assert listed_stock() == 5
+
+    address = {"line1": "1 Test St"}
+    order = {
+        "customer_email": "a@example.com", "customer_name": "A", "shipping_address": address, "billing_address": address,
+        "items": [{"product_id": product_id, "variant_id": variant_id, "quantity": 1}],
+    }
+    assert client.post("/api/orders/", json=order).status_code == 200
+    assert listed_stock() == 4
+
+
+def test_listing_snapshot_follows_expired_holds(app, settings, make_product):
+    settings.reservation_sweep_interval = 0.05
+    product_id, (variant_id,) = make_product(variants=({"price": 12.0, "stock": 5},))
+
+    with TestClient(app) as client:
+        def listed_stock():
+            (product,) = [p for p in client.get("/api/products/").json() if p["id"] == product_id]
+            return product["variants"][0]["stock"]
+
+        client.post("/api/reservations/", json={"items": [{"variant_id": variant_id, "quantity": 2}], "ttl_seconds": 1})
+        assert listed_stock() == 3
+        deadline = time.monotonic() + 5
+        while listed_stock() != 5 and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert listed_stock() == 5
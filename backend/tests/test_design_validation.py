@@ -0,0 +1,113 @@
+# backend/tests/test_design_validation.py
+
+import json
+
+import numpy as np
+import pytest
+
+from design_validation import bounding_boxes, parse_objects, validate_designs
+
+# Canvas px; the front prints 10 x 15 in, so 20 canvas px per inch
+AREAS = [
+    {"name": "front", "x": 100, "y": 100, "width": 200, "height": 300, "width_in": 10, "height_in": 15, "min_dpi": 150},
+    {"name": "back", "x": 400, "y": 100, "width": 200, "height": 300},
+]
+
+
+def text(**geometry):
+    return {"type": "textbox", "left": 120, "top": 120, "width": 50, "height": 20, **geometry}
+
+
+def image(scale, **geometry):
+    return {"type": "image", "left": 110, "top": 110, "width": 600, "height": 400, "scaleX": scale, "scaleY": scale, **geometry}
+
+
+def codes(report):
+    return [issue["code"] for issue in report["issues"]]
+
+
+def test_bounding_boxes_follow_scale_rotation_and_origin():
+    geometry, types = parse_objects({"objects": [
+        {"type": "rect", "left": 0, "top": 0, "width": 100, "height": 10, "angle": 90},
+        {"type": "rect", "left": 50, "top": 50, "width": 20, "height": 10, "scaleX": 2, "originX": "center", "originY": "center"},
+        {"type": "rect", "left": 0, "top": 0, "width": 10, "height": 10, "visible": False},
+    ]})
+    assert types == ["rect", "rect"]
+    np.testing.assert_allclose(bounding_boxes(geometry), [[-10, 0, 0, 100], [30, 45, 70, 55]], atol=1e-9)
+
+
+def test_designs_inside_their_area_pass():
+    (report,) = validate_designs([({"objects": [text(), image(0.1)]}, AREAS)])
+    assert report["ok"]
+    assert report["objects"] == 2
+    assert report["issues"] == []
+    assert report["min_effective_dpi"] == 200.0  # 600 source px over 60 canvas px = 3 in
+
+
+def test_out_of_bounds_placement():
+    (report,) = validate_designs([({"objects": [text(), text(left=270)]}, AREAS)])
+    assert not report["ok"]
+    (issue,) = report["issues"]
+    assert (issue["code"], issue["object"], issue["print_area"]) == ("out_of_bounds", 1, "front")
+    assert issue["bounds"] == [270.0, 120.0, 320.0, 140.0]
+    assert "20.0px outside print area 'front'" in issue["message"]
+
+
+def test_low_effective_dpi():
+    (report,) = validate_designs([({"objects": [image(0.2)]}, AREAS)])
+    (issue,) = report["issues"]
+    assert (issue["code"], issue["level"], issue["effective_dpi"]) == ("low_resolution", "error", 100.0)
+    assert report["min_effective_dpi"] == 100.0
+
+    # Areas without a physical size get no DPI check
+    (report,) = validate_designs([({"objects": [image(0.2, left=410)]}, AREAS)])
+    assert report["ok"] and report["min_effective_dpi"] is None
+
+
+def test_named_print_areas():
+    # The design targets the back, so a front placement is out of bounds
+    (report,) = validate_designs([({"print_area": "back", "objects": [text()]}, AREAS)])
+    assert codes(report) == ["out_of_bounds"]
+    assert report["issues"][0]["print_area"] == "back"
+
+    # An unknown target is reported and every area is allowed instead
+    (report,) = validate_designs([({"print_area": "sleeve", "objects": [text()]}, AREAS)])
+    assert report["ok"]
+    assert codes(report) == ["unknown_print_area"]
+
+    (report,) = validate_designs([({"objects": [text()]}, [])])
+    assert report["ok"] and codes(report) == ["no_print_areas"]
+
+
+MIXED_BATCH = [
+    ({"objects": [text(), image(0.1)]}, AREAS),
+    (json.dumps({"objects": [text(left=270), image(0.2), text(left=420, angle=45)]}), AREAS),
+    ({"print_area": "back", "objects": [text(), text(left=420)]}, AREAS),
+    ({"objects": []}, AREAS),
+    ([text(left=-20)], AREAS[:1]),
+    ({"print_area": "sleeve", "objects": [image(0.3, left=420)]}, AREAS),
+    ({"objects": [text()]}, None),
+    ("not json", AREAS),
+    ({"objects": [text(left=50, top=20, width="wide", scaleX=None)]}, [AREAS[1], {"name": "tiny", "x": 0, "y": 0, "width": 60, "height": 60}]),
+]
+
+
+def test_batch_matches_item_by_item():
+    batch = validate_designs(MIXED_BATCH)
+    assert batch == [validate_designs([item])[0] for item in MIXED_BATCH]
+    assert [report["ok"] for report in batch] == [True, False, False, True, False, True, True, True, True]
+
+
+def test_validate_endpoint(client, make_product):
+    product_id, _ = make_product(print_areas=AREAS)
+    response = client.post("/api/designs/validate", json={"items": [
+        {"product_id": product_id, "design_data": {"objects": [image(0.2)]}},
+        {"product_id": product_id, "design_data": {"objects": [text()]}},
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    assert not body["ok"]
+    assert [codes(item) for item in body["items"]] == [["low_resolution"], []]
+
+    response = client.post("/api/designs/validate", json={"items": [{"product_id": 999, "design_data": {"objects": []}}]})
+    assert response.status_code == 404
@@ -0,0 +1,94 @@
+# backend/tests/test_instrumentation.py
+
+import dataclasses
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import instrumentation
+from instrumentation import RequestQueryStats, statement_shape
+from main import create_app
+
+
+def test_statement_shape_groups_in_lists():
+    assert statement_shape("SELECT id\n  FROM products WHERE id IN (?, ?, ?)") == "SELECT id FROM products WHERE id IN (?)"
+    assert statement_shape("SELECT id FROM products WHERE id IN (?)") == "SELECT id FROM products WHERE id IN (?)"
+    assert statement_shape("SELECT id FROM products WHERE id IN (%(id_1)s, %(id_2)s)") == "SELECT id FROM products WHERE id IN (?)"
+    # Only placeholder lists collapse; other parentheses are kept
+    assert statement_shape("SELECT count(*) FROM (SELECT 1)") == "SELECT count(*) FROM (SELECT 1)"
+
+
+def test_n_plus_one_threshold():
+    stats = RequestQueryStats()
+    for _ in range(3):
+        stats.record("SELECT * FROM variants WHERE product_id = ?", 0.001, -1)
+    stats.record("SELECT * FROM products WHERE id IN (?, ?)", 0.004, -1)
+    stats.record("SELECT * FROM products WHERE id IN (?, ?, ?)", 0.002, -1)
+
+    assert stats.n_plus_one_suspects(threshold=3) == {}
+    assert stats.n_plus_one_suspects(threshold=2) == {"SELECT * FROM variants WHERE product_id = ?": 3}
+    assert stats.n_plus_one_suspects(threshold=1) == {
+        "SELECT * FROM variants WHERE product_id = ?": 3, "SELECT * FROM products WHERE id IN (?)": 2,
+    }
+    assert stats.query_count == 5
+    assert stats.slowest_statement == "SELECT * FROM products WHERE id IN (?, ?)"
+
+
+def instrumented_app(settings, **overrides):
+    app = create_app(dataclasses.replace(settings, **overrides))
+    app.state.database.create_schema()
+
+    def lookups(count: int = 1):
+        db = app.state.database.session()
+        try:
+            for product_id in range(count):
+                db.execute(text("SELECT id FROM products WHERE id = :id"), {"id": product_id})
+        finally:
+            db.close()
+        return {"ok": True}
+
+    app.add_api_route("/test/lookups", lookups)
+    return app
+
+
+def test_repeated_statement_shapes_are_flagged(settings):
+    app = instrumented_app(settings, query_stats_sample_rate=1.0, n_plus_one_threshold=3)
+    with TestClient(app) as client:
+        client.get("/test/lookups", params={"count": 3})
+        response = client.get("/test/lookups", params={"count": 4})
+        metrics = client.get("/metrics").text
+
+    timing = response.headers["server-timing"]
+    assert 'desc="4 queries"' in timing
+    assert "db-slowest;dur=" in timing
+    assert "SELECT" not in timing  # statement text stays out of responses
+
+    route = 'route="GET /test/lookups"'
+    assert f"printcraft_sampled_requests_total{{{route}}} 2" in metrics
+    assert f"printcraft_db_queries_total{{{route}}} 7" in metrics
+    assert f"printcraft_n_plus_one_suspects_total{{{route}}} 1" in metrics  # 4 > 3, 3 is not
+    assert f'printcraft_db_slowest_query_info{{{route},statement="SELECT id FROM products WHERE id = ?"}} 1' in metrics
+
+
+@pytest.mark.parametrize("draw, sampled", [(0.2, True), (0.7, False)])
+def test_server_timing_only_on_sampled_requests(settings, monkeypatch, draw, sampled):
+    monkeypatch.setattr(instrumentation.random, "random", lambda: draw)
+    app = instrumented_app(settings, query_stats_sample_rate=0.5)
+    with TestClient(app) as client:
+        response = client.get("/test/lookups")
+        metrics = client.get("/metrics").text
+
+    assert ("server-timing" in response.headers) is sampled
+    assert ('printcraft_sampled_requests_total{route="GET /test/lookups"} 1' in metrics) is sampled
+
+
+def test_sampling_off_leaves_requests_alone(settings):
+    app = instrumented_app(settings)
+    with TestClient(app) as client:
+        response = client.get("/test/lookups", params={"count": 10})
+        metrics = client.get("/metrics").text
+
+    assert "server-timing" not in response.headers
+    assert "GET /test/lookups" not in metrics
+    assert not app.state.database.instrument_queries
@@ -0,0 +1,75 @@
+# backend/tests/test_inventory.py
+
+import threading
+
+from inventory import InsufficientStock, place_holds, release_holds
+from models import ProductVariant
+
+
+def test_concurrent_holds_never_oversell(app, make_product):
+    _, (variant_id,) = make_product(variants=({"price": 12.0, "stock": 10},))
+    start = threading.Barrier(20)
+    outcomes = []
+
+    def checkout():
+        db = app.state.database.session()
+        try:
+            start.wait()
+            place_holds(db, [(variant_id, 1)])
+            db.commit()
+            outcomes.append("held")
+        except InsufficientStock:
+            db.rollback()
+            outcomes.append("sold out")
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=checkout) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db = app.state.database.session()
+    try:
+        assert outcomes.count("held") == 10
+        assert outcomes.count("sold out") == 10
+        assert db.get(ProductVariant, variant_id).stock == 0
+    finally:
+        db.close()
+
+
+def test_release_returns_stock(db, make_product):
+    _, (variant_id,) = make_product(variants=({"price": 12.0, "stock": 5},))
+    token, _, _ = place_holds(db, [(variant_id, 3), (variant_id, 2)])
+    db.commit()
+    assert db.get(ProductVariant, variant_id).stock == 0
+
+    release_holds(db, token)
+    db.commit()
+    db.expire_all()
+    assert db.get(ProductVariant, variant_id).stock == 5
+
+
+def test_reservation_requests_are_validated(client, db, make_product):
+    _, (variant_id,) = make_product(variants=({"price": 12.0, "stock": 5},))
+
+    def reserve(items, **body):
+        return client.post("/api/reservations/", json={"items": items, **body})
+
+    assert reserve([{"variant_id": variant_id, "quantity": 1}], ttl_seconds=-60).status_code == 422
+    assert reserve([{"variant_id": variant_id, "quantity": 1}], ttl_seconds=0).status_code == 422
+    assert reserve([{"variant_id": variant_id, "quantity": 0}]).status_code == 422
+    assert reserve([{"variant_id": variant_id, "quantity": -2}]).status_code == 422
+
+    # An unknown id is not the same as sold out
+    response = reserve([{"variant_id": variant_id, "quantity": 1}, {"variant_id": 999, "quantity": 1}])
+    assert response.status_code == 404
+    assert reserve([{"variant_id": variant_id, "quantity": 6}]).status_code == 409
+
+    db.expire_all()
+    assert db.get(ProductVariant, variant_id).stock == 5
+    response = reserve([{"variant_id": variant_id, "quantity": 2}], ttl_seconds=30)
+    assert response.status_code == 200
+    db.expire_all()
+    assert db.get(ProductVariant, variant_id).stock == 3
@@ -0,0 +1,132 @@
+# backend/tests/test_jobs.py
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+import jobs
+from jobs import TASKS, Worker, claim, enqueue, recover_expired_leases, requeue_dead, retry_delay, run_job, schedule_periodic
+from models import Job, JobStatus
+
+calls = []
+
+
+@pytest.fixture(autouse=True)
+def test_tasks(monkeypatch):
+    """Tasks on their own queues, registered for one test only"""
+    calls.clear()
+    registered = dict(TASKS)
+    jobs.task("test_flaky", queue="test", max_attempts=3, lease_seconds=60)(flaky)
+    jobs.task("test_tick", queue="test_periodic", every=60)(tick)
+    yield
+    TASKS.clear()
+    TASKS.update(registered)
+
+
+def flaky(ctx, fail: bool = True):
+    calls.append(ctx.attempt)
+    if fail:
+        raise RuntimeError(f"boom on attempt {ctx.attempt}")
+
+
+def tick(ctx):
+    calls.append("tick")
+
+
+@pytest.fixture
+def worker(app, settings):
+    return Worker(app.state.database, settings, queues=("test",))
+
+
+def make_due(db, job_id):
+    db.execute(update(Job).where(Job.id == job_id).values(run_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+
+
+def test_retry_backoff_grows_and_is_capped():
+    assert 3.75 <= retry_delay(1) <= 6.25
+    assert 15.0 <= retry_delay(3) <= 25.0
+    assert retry_delay(40) <= 3600 * 1.25
+
+
+def test_failing_job_is_retried_then_dead_lettered(db, worker):
+    job = enqueue(db, "test_flaky")
+    db.commit()
+
+    assert worker.run_once() == 1
+    db.expire_all()
+    assert (job.status, job.attempts) == (JobStatus.QUEUED, 1)
+    assert "boom on attempt 1" in job.last_error
+    assert job.run_at > datetime.utcnow()  # backing off
+    assert worker.run_once() == 0
+
+    for attempt in (2, 3):
+        make_due(db, job.id)
+        assert worker.run_once() == 1
+    db.expire_all()
+    assert calls == [1, 2, 3]
+    assert (job.status, job.attempts) == (JobStatus.DEAD, 3)
+    assert "boom on attempt 3" in job.last_error
+    assert job.finished_at is not None
+
+    # Dead letters stay put until requeued with fresh attempts
+    assert worker.run_once() == 0
+    assert requeue_dead(db, "test_flaky") == 1
+    db.expire_all()
+    assert (job.status, job.attempts) == (JobStatus.QUEUED, 0)
+
+
+def test_expired_lease_is_reclaimed(app, db, settings):
+    job = enqueue(db, "test_flaky", {"fail": False})
+    db.commit()
+    (claimed,) = claim(db, "worker-a", ["test"])
+    assert (claimed.status, claimed.locked_by) == (JobStatus.RUNNING, "worker-a")
+
+    # worker-a dies; nothing happens while its lease is live
+    assert recover_expired_leases(db) == 0
+    db.execute(update(Job).where(Job.id == job.id).values(locked_until=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+    assert recover_expired_leases(db) == 1
+    db.expire_all()
+    assert (job.status, job.locked_by, job.last_error) == (JobStatus.QUEUED, None, "Worker lease expired")
+
+    (reclaimed,) = claim(db, "worker-b", ["test"])
+    assert reclaimed.attempts == 2
+    assert run_job(db, reclaimed, "worker-b", app.state.database, settings) == JobStatus.SUCCEEDED
+    assert calls == [2]
+
+    # A lease that runs out on the final attempt dead-letters the job
+    job = enqueue(db, "test_flaky", max_attempts=1)
+    db.commit()
+    claim(db, "worker-a", ["test"])
+    db.execute(update(Job).where(Job.id == job.id).values(locked_until=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+    assert recover_expired_leases(db) == 1
+    db.expire_all()
+    assert job.status == JobStatus.DEAD
+
+
+def test_periodic_task_is_scheduled_once(app, db, settings):
+    def pending():
+        db.expire_all()
+        return db.query(Job).filter(Job.task == "test_tick", Job.status == JobStatus.QUEUED).all()
+
+    schedule_periodic(db)
+    schedule_periodic(db)  # a second worker's maintenance pass
+    (job,) = pending()
+    assert job.run_at <= datetime.utcnow()
+
+    worker = Worker(app.state.database, settings, queues=("test_periodic",))
+    worker.run_once()  # maintenance schedules nothing new, then the tick runs
+    assert calls == ["tick"]
+    assert pending() == []
+
+    # The next run follows the last success, whichever worker schedules it
+    schedule_periodic(db)
+    schedule_periodic(db)
+    (next_run,) = pending()
+    assert next_run.id != job.id
+    db.refresh(job)
+    assert job.status == JobStatus.SUCCEEDED
+    assert next_run.run_at >= job.finished_at + timedelta(seconds=60)
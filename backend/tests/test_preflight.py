@@ -0,0 +1,119 @@
+# backend/tests/test_preflight.py
+
+import io
+import json
+
+import pytest
+from PIL import Image
+
+from preflight import ArtworkRequirements, requirements_for, sanitize_svg
+
+SVG = '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" viewBox="0 0 10 10">{}</svg>'
+
+PAYLOADS = [
+    '<a><set attributeName="href" to="javascript:alert(1)"/><text>x</text></a>',
+    '<a xlink:href="#"><animate attributeName="href" values="javascript:alert(1)"/></a>',
+    '<rect><set attributeName="onclick" to="alert(1)"/></rect>',
+    '<animateMotion><mpath xlink:href="javascript:alert(1)"/></animateMotion>',
+    '<animateTransform attributeName="transform" from="0" to="javascript:alert(1)"/>',
+    '<script>alert(1)</script>',
+    '<foreignObject><iframe xmlns="http://www.w3.org/1999/xhtml" src="javascript:alert(1)"/></foreignObject>',
+    '<html:script xmlns:html="http://www.w3.org/1999/xhtml">alert(1)</html:script>',
+    '<rect onload="alert(1)" width="1" height="1"/>',
+    '<image href="java&#x09;script:alert(1)"/>',
+    '<use xlink:href="https://evil.example/sprite.svg#icon"/>',
+    '<rect style="fill: url(https://evil.example/track)"/>',
+    '<style>@import url(https://evil.example/x.css);</style>',
+    '<feColorMatrix values="javascript:alert(1)"/>',
+]
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_sanitizer_removes_active_content(payload):
+    sanitized, removed, error = sanitize_svg(SVG.format(payload).encode())
+    assert error is None
+    assert removed
+    text = sanitized.decode().lower()
+    for needle in ("javascript", "alert", "<set", "<animate", "onclick", "onload", "evil.example", "script"):
+        assert needle not in text
+
+
+def test_sanitizer_keeps_static_artwork():
+    artwork = SVG.format(
+        '<defs><linearGradient id="g"><stop offset="0" stop-color="#f00"/></linearGradient></defs>'
+        '<rect width="10" height="10" fill="url(#g)" style="stroke: #000"/>'
+        '<text x="1" y="5" font-family="Inter" xml:space="preserve">Hi</text>'
+        '<use xlink:href="#g"/>'
+    )
+    sanitized, removed, error = sanitize_svg(artwork.encode())
+    assert (removed, error) == ([], None)
+    assert b'fill="url(#g)"' in sanitized and b">Hi</text>" in sanitized
+
+
+def test_sanitizer_refuses_dtd():
+    _, _, error = sanitize_svg(b'<!DOCTYPE svg [<!ENTITY x "y">]><svg xmlns="http://www.w3.org/2000/svg"/>')
+    assert error
+
+
+def png(width=40, height=40):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "white").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+MALFORMED_AREAS = [
+    {"width_in": "abc", "height_in": 2},
+    {"x": None, "y": "top", "width": [], "height": {}},
+    {"width_in": float("inf"), "height_in": -3, "min_dpi": "high"},
+    {"width_in": 1e308, "height_in": 1e308, "min_dpi": 1e308},
+    "front",
+]
+
+
+def test_requirements_skip_malformed_print_areas():
+    assert requirements_for("templates", MALFORMED_AREAS) == ArtworkRequirements(purpose="print")
+    assert requirements_for("mockups", MALFORMED_AREAS) == ArtworkRequirements(purpose="mockup", reason="to contain every print area")
+    assert requirements_for("templates", {"width_in": 2}) == ArtworkRequirements(purpose="print")
+
+    # Well-formed areas still count alongside malformed ones
+    areas = MALFORMED_AREAS + [{"width_in": "2", "height_in": 1, "x": 10, "y": 5, "width": 100, "height": "50"}]
+    templates, mockups = requirements_for("templates", areas), requirements_for("mockups", areas)
+    assert (templates.min_width, templates.min_height) == (300, 150)
+    assert (mockups.min_width, mockups.min_height) == (110, 55)
+
+
+def test_preflight_endpoint_with_malformed_print_areas(client):
+    for areas in ([{"width_in": "abc", "height_in": 2}], [{"x": None, "width": 10}]):
+        response = client.post(
+            "/api/uploads/preflight",
+            data={"purpose": "mockups", "print_areas": json.dumps(areas)},
+            files={"file": ("art.png", png(), "image/png")},
+        )
+        assert response.status_code == 200
+        assert response.json()["ok"] is True
+
+    for print_areas in ('{"width_in": 2}', '[1, 2]', "[{"):
+        response = client.post(
+            "/api/uploads/preflight",
+            data={"purpose": "templates", "print_areas": print_areas},
+            files={"file": ("art.png", png(), "image/png")},
+        )
+        assert response.status_code == 400
+
+
+def test_product_upload_with_malformed_print_areas(client, make_product):
+    product_id, _ = make_product()
+    category_id = client.get(f"/api/products/{product_id}").json()["category_id"]
+    areas = [{"name": "front", "width_in": "abc", "height_in": 2, "x": None}]
+
+    response = client.post(
+        "/api/products/upload",
+        data={"name": "Tote", "base_price": "9.5", "category_id": str(category_id), "print_areas": json.dumps(areas)},
+        files={
+            "main_image": ("main.png", png(), "image/png"),
+            "design_template": ("template.png", png(), "image/png"),
+            "mockup_front": ("front.png", png(), "image/png"),
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["print_areas"] == areas
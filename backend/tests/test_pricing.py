@@ -0,0 +1,122 @@
+# backend/tests/test_pricing.py
+
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from models import Order, OrderItem
+from pricing import build_price_table, quote
+
+
+def price_table(product_id, base_price=10.0, variants=(), **options):
+    product = SimpleNamespace(
+        id=product_id, name=f"Product {product_id}", base_price=base_price, min_order_quantity=1,
+        variants=[SimpleNamespace(id=variant_id, price=price) for variant_id, price in variants],
+        customization_options=options,
+    )
+    return build_price_table(product)
+
+
+def test_quote_totals():
+    tables = {1: price_table(1, variants=((11, 12.0),)), 2: price_table(2, base_price=20.0)}
+    result = quote([
+        # 12 + 40 = 52 shirts of product 1: the 50+ tier (10% off) for both lines
+        {"product_id": 1, "variant_id": 11, "quantity": 12},
+        {"product_id": 1, "quantity": 40, "print_method": "screen_print", "colors": 3},
+        {"product_id": 2, "quantity": 1},
+    ], tables)
+
+    first, second, third = result["lines"]
+    assert first["unit_price"] == 10.8  # 12.00 * 0.9
+    assert first["line_total"] == 129.6
+    assert second["unit_price"] == 10.3  # 10.00 * 0.9 + 0.50 + 2 extra colours * 0.40
+    assert second["line_total"] == 457.0  # 40 * 10.30 + 3 colours * 15.00 setup
+    assert third["unit_price"] == 20.0
+    assert result["subtotal"] == 606.6
+    assert result["tax"] == 48.53
+    # 53 units * 0.25kg = 13.25kg, first 2kg free over $50
+    assert result["shipping"] == 33.75
+    assert result["total"] == pytest.approx(606.6 + 48.53 + 33.75)
+    assert result["ok"]
+
+
+def test_quote_reports_unpriceable_lines():
+    tables = {1: price_table(1, variants=((11, 12.0),), print_methods=["embroidery"], max_colors=2)}
+    result = quote([
+        {"product_id": 9, "quantity": 1},
+        {"product_id": 1, "variant_id": 99, "quantity": 1},
+        {"product_id": 1, "quantity": 1, "print_method": "digital"},
+        {"product_id": 1, "quantity": 1, "colors": 3},
+        {"product_id": 1, "quantity": 1},
+    ], tables)
+
+    codes = [[issue["code"] for issue in line["issues"]] for line in result["lines"]]
+    assert codes == [["unknown_product"], ["unknown_variant"], ["print_method_unavailable"], ["too_many_colors"], []]
+    assert result["lines"][4]["print_method"] == "embroidery"  # the only method offered
+    assert result["subtotal"] == 32.5  # 10 + 2.50 per unit + 20 setup
+    assert not result["ok"]
+
+
+def test_importing_the_app_does_not_load_numpy():
+    # Cold start: NumPy is only imported by workers that quote or validate designs
+    check = "import sys, main; sys.exit('numpy' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", check], cwd=Path(__file__).resolve().parents[1]).returncode == 0
+
+
+def order_payload(*items):
+    address = {"line1": "1 Test St", "city": "Nairobi"}
+    return {
+        "customer_email": "buyer@example.com", "customer_name": "Buyer",
+        "shipping_address": address, "billing_address": address, "items": list(items),
+    }
+
+
+def test_orders_are_charged_the_quoted_price(client, db, make_product):
+    product_id, (variant_id,) = make_product()
+    line = {"product_id": product_id, "variant_id": variant_id, "quantity": 2}
+    quoted = client.post("/api/quote", json={"lines": [line]}).json()
+
+    response = client.post("/api/orders/", json=order_payload({**line, "unit_price": 0.01}))
+    assert response.status_code == 200
+    assert response.json()["total_amount"] == quoted["total"]
+
+    order = db.get(Order, response.json()["order_id"])
+    assert order.subtotal == quoted["subtotal"] == 24.0
+    (item,) = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
+    assert item.unit_price == 12.0
+    assert item.total_price == 24.0
+
+
+@pytest.mark.parametrize("item, status", [
+    ({"product_id": 999, "quantity": 1}, 400),
+    ({"product_id": None, "variant_id": 999, "quantity": 1}, 400),  # variant of another product
+    ({"product_id": None, "quantity": 0}, 422),
+    ({"product_id": None, "quantity": 1, "colors": 0}, 422),
+    ({"product_id": None}, 422),
+])
+def test_orders_reject_unpriceable_lines(client, db, make_product, item, status):
+    product_id, _ = make_product()
+    item = {**item, "product_id": item["product_id"] or product_id, "unit_price": 1.0}
+
+    response = client.post("/api/orders/", json=order_payload(item))
+    assert response.status_code == status
+    assert db.query(Order).count() == 0
+
+
+def test_oversized_quantities_are_rejected(client, db, make_product):
+    product_id, (variant_id,) = make_product()
+    line = {"product_id": product_id, "variant_id": variant_id, "quantity": 10 ** 20}
+
+    assert client.post("/api/quote", json={"lines": [line]}).status_code == 422
+    assert client.post("/api/orders/", json=order_payload(line)).status_code == 422
+    assert db.query(Order).count() == 0
+
+    # Called directly, the engine flags the line instead of overflowing int64
+    tables = {1: price_table(1)}
+    result = quote([{"product_id": 1, "quantity": 10 ** 20}, {"product_id": 1, "quantity": -1}, {"product_id": 1, "quantity": 2}], tables)
+    codes = [[issue["code"] for issue in line["issues"]] for line in result["lines"]]
+    assert codes == [["invalid_quantity"], ["invalid_quantity"], []]
+    assert result["subtotal"] == 20.0
@@ -0,0 +1,26 @@
+# backend/tests/test_profiling.py
+
+import dataclasses
+
+from fastapi.testclient import TestClient
+
+from main import create_app
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+def test_profiling_is_configured_per_app(settings):
+    settings.admin_token = "secret"
+    enabled = create_app(dataclasses.replace(settings, profiling_enabled=True))
+    disabled = create_app(settings)
+
+    with TestClient(enabled) as client:
+        response = client.post("/api/admin/profile/sample", params={"seconds": 0.1, "format": "summary"}, headers=ADMIN)
+        assert response.status_code == 200
+        assert response.json()["interval_ms"] == 5.0
+        assert client.get("/api/admin/profile/requests", params={"format": "summary"}, headers=ADMIN).status_code == 200
+        assert client.delete("/api/admin/profile/requests", headers=ADMIN).status_code == 200
+
+    with TestClient(disabled) as client:
+        assert client.get("/api/admin/profile/requests", headers=ADMIN).status_code == 404
+        assert client.post("/api/admin/profile/sample", params={"seconds": 0.1}, headers=ADMIN).status_code == 404
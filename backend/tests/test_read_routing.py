@@ -0,0 +1,55 @@
+# backend/tests/test_read_routing.py
+# Replica reads and read-your-writes, with a SQLite copy standing in for the replica
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from database import LAST_WRITE_COOKIE
+
+
+@pytest.fixture
+def settings(settings, tmp_path):
+    settings.replica_database_url = f"sqlite:///{tmp_path / 'replica.db'}"
+    settings.replica_max_lag_seconds = 3600.0  # never fall back for lag; these tests control the copy
+    return settings
+
+
+@pytest.fixture
+def sync_replica(app, settings):
+    """Copy the primary over the replica, as replication eventually would"""
+    def sync():
+        primary = settings.database_url[len("sqlite:///"):]
+        replica = settings.replica_database_url[len("sqlite:///"):]
+        with sqlite3.connect(primary) as source, sqlite3.connect(Path(replica)) as target:
+            source.backup(target)
+    return sync
+
+
+def test_design_validation_does_not_pin_reads_to_the_primary(client, make_product, sync_replica):
+    product_id, _ = make_product()
+    sync_replica()
+    response = client.post("/api/designs/validate", json={"items": [{"product_id": product_id, "design_data": {}}]})
+    assert response.status_code == 200
+    assert LAST_WRITE_COOKIE not in response.cookies
+
+
+def test_writer_reads_its_write_after_a_replica_read_was_cached(app, client, make_product, sync_replica):
+    product_id, _ = make_product()
+    sync_replica()
+    other_client = TestClient(app)  # no read-your-writes cookie
+
+    response = client.put(f"/api/products/{product_id}/toggle-featured")
+    assert LAST_WRITE_COOKIE in response.cookies
+
+    # Another client reads before the write reaches the replica, caching the old value
+    assert other_client.get(f"/api/products/{product_id}").json()["is_featured"] is False
+    assert other_client.get(f"/api/products/batch?ids={product_id}").json()["products"][0]["is_featured"] is False
+    assert other_client.get("/api/products/").json()[0]["is_featured"] is False
+
+    # The writer is sticky to the primary and must not be served those entries
+    assert client.get(f"/api/products/{product_id}").json()["is_featured"] is True
+    assert client.get(f"/api/products/batch?ids={product_id}").json()["products"][0]["is_featured"] is True
+    assert client.get("/api/products/").json()[0]["is_featured"] is True
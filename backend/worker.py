@@ -0,0 +1,112 @@
+# backend/worker.py
+# Background job workers - run alongside the web workers, as many hosts as you like
+#
+#   python worker.py                      run WORKER_PROCESSES workers on all queues
+#   python worker.py run -p 4 -q email    four workers on the email queue only
+#   python worker.py stats                job counts by queue, task and status
+#   python worker.py requeue-dead         retry dead-lettered jobs
+
+import argparse
+import logging
+import multiprocessing
+import signal
+import sys
+import time
+
+from database import Database
+from settings import Settings
+
+import tasks  # noqa: F401 - registers the task functions
+from jobs import TASKS, Worker, queue_stats, requeue_dead
+
+logger = logging.getLogger("printcraft.worker")
+
+RESTART_DELAY = 5.0  # seconds before replacing a worker that crashed
+
+
+def _all_queues():
+    return sorted({spec.queue for spec in TASKS.values()})
+
+
+def _work(settings: Settings, queues) -> None:
+    """Entry point of one worker process"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(name)s %(levelname)s %(message)s")
+    worker = Worker(Database(settings.database_url), settings, queues, settings.job_poll_interval)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    try:
+        worker.run()
+    finally:
+        worker.database.dispose()
+
+
+def run(settings: Settings, processes: int, queues) -> None:
+    """Supervise `processes` workers; replace any that die, stop all on SIGTERM/SIGINT"""
+    context = multiprocessing.get_context("spawn")  # no inherited engine or sockets
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    def start(index):
+        process = context.Process(target=_work, args=(settings, queues), name=f"job-worker-{index}")
+        process.start()
+        return process
+
+    pool = [start(index) for index in range(processes)]
+    print(f"Started {processes} job workers on {', '.join(queues)}")
+    while not stopping:
+        time.sleep(1.0)
+        for index, process in enumerate(pool):
+            if not process.is_alive() and not stopping:
+                logger.error("Worker %s exited with %s; restarting in %.0fs", process.name, process.exitcode, RESTART_DELAY)
+                time.sleep(RESTART_DELAY)
+                pool[index] = start(index)
+
+    # Let each worker finish the job it is running
+    for process in pool:
+        if process.is_alive():
+            process.terminate()  # SIGTERM -> Worker.stop
+    for process in pool:
+        process.join()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python worker.py", description="PrintCraft background job workers")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "stats", "requeue-dead"])
+    parser.add_argument("-p", "--processes", type=int, help="worker processes (default WORKER_PROCESSES)")
+    parser.add_argument("-q", "--queues", help="comma-separated queues to work (default: all)")
+    parser.add_argument("--task", help="requeue-dead: only this task")
+    parser.add_argument("--database-url", help="override DATABASE_URL")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    settings = Settings.from_env()
+    if args.database_url:
+        settings.database_url = args.database_url
+
+    if args.command == "run":
+        queues = [q.strip() for q in args.queues.split(",") if q.strip()] if args.queues else _all_queues()
+        run(settings, args.processes or settings.worker_processes, queues)
+        return 0
+
+    database = Database(settings.database_url)
+    db = database.session()
+    try:
+        if args.command == "stats":
+            for queue, task_name, status, count in queue_stats(db):
+                print(f"{queue:<12} {task_name:<28} {status.value:<10} {count}")
+        else:
+            print(f"Requeued {requeue_dead(db, args.task)} dead jobs")
+    finally:
+        db.close()
+        database.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())